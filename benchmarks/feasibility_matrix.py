@@ -0,0 +1,69 @@
+"""
+Feasibility benchmark: can_cook_indexed (per recipe) vs can_cook_matrix (NumPy).
+
+    python benchmarks/feasibility_matrix.py [--recipes 50000]
+
+The matrix is compiled once per catalog and the inventory indexed once, so
+only the per-inventory check is timed. The target is 50k recipes in under 0.5s.
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+from dwbs.core.recipe.domain.feasibility import FeasibilityChecker, InventoryIndex
+from dwbs.core.recipe.domain.recipe import Recipe
+from dwbs.core.recipe.domain.ingredient import IngredientRef
+from dwbs.core.recipe.graph.substitution import SubstitutionGraph
+from dwbs.core.contracts.inventory import InventoryState, InventoryItem, ItemIdentity, Quantity, Unit
+
+NAMES = [f"Mx{i}" for i in range(60)]
+UNITS = [Unit.GRAM, Unit.KILOGRAM, Unit.MILLILITER, Unit.PIECE]
+
+def make_catalog(count: int, rng: random.Random):
+    return [
+        Recipe(id=f"m{i}", name=f"M{i}", instructions=[], ingredients=[
+            IngredientRef(item=ItemIdentity(name=name), quantity=Quantity(value=Decimal(rng.randint(1, 800)) / 4, unit=rng.choice(UNITS)))
+            for name in rng.sample(NAMES, rng.randint(1, 5))
+        ])
+        for i in range(count)
+    ]
+
+def make_inventory(rng: random.Random) -> InventoryState:
+    return InventoryState(items=[
+        InventoryItem(item=ItemIdentity(name=name), quantity=Quantity(value=rng.randint(0, 300), unit=rng.choice(UNITS)))
+        for name in rng.sample(NAMES, 45)
+        for _ in range(rng.randint(1, 2))
+    ])
+
+def make_graph() -> SubstitutionGraph:
+    graph = SubstitutionGraph()
+    for i in range(0, 56, 5):
+        graph.add_substitution(ItemIdentity(name=NAMES[i]), ItemIdentity(name=NAMES[i + 1]), 0.1)
+        graph.add_substitution(ItemIdentity(name=NAMES[i + 1]), ItemIdentity(name=NAMES[i + 2]), 0.1)
+    return graph
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = random.Random(4)
+    checker = FeasibilityChecker(substitution_graph=make_graph())
+    catalog = make_catalog(args.recipes, rng)
+    matrix, compile_s = timed(checker.compile_matrix, catalog)
+    index = InventoryIndex.build(make_inventory(rng))
+    index.stock
+
+    expected, scalar_s = timed(lambda: [checker.can_cook_indexed(r, index) for r in catalog])
+    actual, matrix_s = timed(checker.can_cook_matrix, matrix, index)
+    assert actual == expected, "checks disagree"
+    print(f"{'recipes':>10} {'compile s':>10} {'scalar s':>10} {'matrix s':>10} {'speedup':>8}")
+    print(f"{args.recipes:>10} {compile_s:>10.2f} {scalar_s:>10.3f} {matrix_s:>10.3f} {scalar_s / matrix_s:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Append throughput of FileLedgerStore with fsync on (sync=True).
+
+    python benchmarks/file_ledger_append.py [--events 20000] [--dir PATH]
+
+Measures single appends from 1..64 concurrent threads (group commit shares
+fsyncs between them), append_many batches from one thread, and single
+appends with sync=False for reference. Run it on the disk the ledger will
+live on: --dir defaults to a temporary directory.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from dwbs.core.ledger.events.types import PurchaseEvent, PurchasePayload
+from dwbs.core.ledger.store.file import FileLedgerStore
+from dwbs.core.contracts.mutation import MutationSource
+from dwbs.core.contracts.explanation import Explanation
+from dwbs.core.contracts.inventory import ItemIdentity, Quantity, Unit
+
+EXPLANATION = Explanation(reason="benchmark", source_fact="benchmark", confidence=1.0)
+
+def make_events(count: int):
+    return [
+        PurchaseEvent(actor="bench", payload=PurchasePayload(
+            item=ItemIdentity(name=f"item-{i % 500}"), quantity=Quantity(value=Decimal(1), unit=Unit.PIECE),
+            source=MutationSource.USER_MANUAL, explanation=EXPLANATION))
+        for i in range(count)
+    ]
+
+class CountingFsync:
+    """
+    Wraps os.fsync to count calls, so the run can report appends per fsync.
+    """
+    def __init__(self):
+        self.calls = 0
+        self._fsync = os.fsync
+
+    def __enter__(self):
+        os.fsync = self
+        return self
+
+    def __exit__(self, *exc):
+        os.fsync = self._fsync
+
+    def __call__(self, fd):
+        self.calls += 1
+        self._fsync(fd)
+
+def threaded_appends(directory: str, events, threads: int, sync: bool = True):
+    share = len(events) // threads
+    parts = [events[t * share:(t + 1) * share] for t in range(threads)]
+    with FileLedgerStore(directory, sync=sync) as store, CountingFsync() as fsyncs:
+        def worker(part):
+            for event in part:
+                store.append(event)
+        workers = [threading.Thread(target=worker, args=(part,)) for part in parts]
+        start = time.perf_counter()
+        for worker_thread in workers:
+            worker_thread.start()
+        for worker_thread in workers:
+            worker_thread.join()
+        elapsed = time.perf_counter() - start
+    return share * threads / elapsed, fsyncs.calls
+
+def batched_appends(directory: str, events, batch: int):
+    with FileLedgerStore(directory) as store, CountingFsync() as fsyncs:
+        start = time.perf_counter()
+        for offset in range(0, len(events), batch):
+            store.append_many(events[offset:offset + batch])
+        elapsed = time.perf_counter() - start
+    return len(events) / elapsed, fsyncs.calls
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--dir", default=None, help="Parent directory for the ledgers.")
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    rows = []
+    for threads in (1, 4, 16, 64):
+        with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+            count = args.events // 4 if threads == 1 else args.events
+            rows.append((f"append, {threads} threads", count) + threaded_appends(directory, events[:count], threads))
+    for batch in (16, 256):
+        with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+            rows.append((f"append_many({batch})", args.events) + batched_appends(directory, events, batch))
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        rows.append(("append, sync=False", args.events) + threaded_appends(directory, events, 1, sync=False))
+
+    print(f"{'mode':<22} {'events':>8} {'appends/s':>10} {'per fsync':>10}")
+    for mode, count, rate, fsyncs in rows:
+        per_fsync = f"{count / fsyncs:.1f}" if fsyncs else "-"
+        print(f"{mode:<22} {count:>8} {rate:>10.0f} {per_fsync:>10}")
+
+if __name__ == "__main__":
+    main()
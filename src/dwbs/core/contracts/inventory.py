@@ -130,6 +130,12 @@ class ItemIdentity(SystemContract):
             parts.append(f"[{self.brand}]")
         return " ".join(parts)
 
+    def key(self) -> str:
+        """
+        Stable lookup key. Ignores confidence, matching __eq__/__hash__.
+        """
+        return f"{self.name}|{self.variant}|{self.brand}"
+
     def __eq__(self, other):
         if not isinstance(other, ItemIdentity):
             return False
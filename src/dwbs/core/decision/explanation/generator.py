@@ -1,9 +1,10 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import date, timedelta
 from ...contracts.explanation import Explanation
 from ...recipe.domain.recipe import Recipe
-from ...contracts.inventory import InventoryState
-from ..scoring.scorer import RecipeScorer
+from ...contracts.inventory import InventoryState, InventoryItem
+from ..scoring.scorer import RecipeScorer, ScoreTrace
+from ..scoring.cache import ScoringCache
 
 class ExplanationGenerator:
     """
@@ -13,27 +14,53 @@ class ExplanationGenerator:
     def __init__(self, scorer: RecipeScorer):
         self.scorer = scorer
 
-    def generate_suggestion_explanation(self, recipe: Recipe, inventory: InventoryState, score: float, today: Optional[date] = None) -> Explanation:
+    def generate_suggestion_explanation(
+        self,
+        recipe: Recipe,
+        inventory: InventoryState,
+        score: float,
+        today: Optional[date] = None,
+        inventory_map: Optional[Dict[int, List[InventoryItem]]] = None,
+        trace: Optional[ScoreTrace] = None,
+    ) -> Explanation:
+        """
+        :param inventory_map: Prebuilt scorer.build_inventory_map(inventory), to skip re-indexing.
+        :param trace: The scorer's ScoreTrace for this recipe (same inventory and date);
+            when given, the ingredients are not walked again.
+        Cached in the scorer's ScoringCache, when it has one.
+        """
         if today is None:
             today = date.today()
 
-        # Check for expiry first (Highest Priority for explanation)
-        inventory_map = self.scorer.build_inventory_map(inventory)
-        expiry_threshold = today + timedelta(days=2)
+        cache = getattr(self.scorer, "cache", None)
+        if not isinstance(cache, ScoringCache):
+            return self._suggestion_explanation(recipe, inventory, score, today, inventory_map, trace)
 
-        earliest_expiry_item = None
-        earliest_expiry_date = None
+        key = ("explanation", recipe.id, today, score)
+        explanation = cache.get(inventory.version, key)
+        if explanation is None:
+            explanation = self._suggestion_explanation(recipe, inventory, score, today, inventory_map, trace)
+            cache.put(inventory.version, key, explanation)
+        return explanation
 
-        for ingredient in recipe.ingredients:
-            candidates = self.scorer.get_candidates(ingredient, inventory_map)
-            for cand in candidates:
-                if cand.expiry_date and cand.expiry_date < expiry_threshold:
-                    if earliest_expiry_date is None or cand.expiry_date < earliest_expiry_date:
-                        earliest_expiry_date = cand.expiry_date
-                        earliest_expiry_item = cand
+    def _suggestion_explanation(
+        self,
+        recipe: Recipe,
+        inventory: InventoryState,
+        score: float,
+        today: date,
+        inventory_map: Optional[Dict[int, List[InventoryItem]]],
+        trace: Optional[ScoreTrace],
+    ) -> Explanation:
+
+        # Check for expiry first (Highest Priority for explanation)
+        if trace is not None:
+            earliest_expiry_item = trace.earliest_expiring
+        else:
+            earliest_expiry_item = self._earliest_expiring(recipe, inventory, today, inventory_map)
 
         if earliest_expiry_item:
-            days = (earliest_expiry_date - today).days
+            days = (earliest_expiry_item.expiry_date - today).days
             if days <= 0:
                 time_str = "today"
             elif days == 1:
@@ -67,6 +94,26 @@ class ExplanationGenerator:
                  confidence=1.0
             )
 
+    def _earliest_expiring(
+        self,
+        recipe: Recipe,
+        inventory: InventoryState,
+        today: date,
+        inventory_map: Optional[Dict[int, List[InventoryItem]]],
+    ) -> Optional[InventoryItem]:
+        if inventory_map is None:
+            inventory_map = self.scorer.build_inventory_map(inventory)
+        expiry_threshold = today + timedelta(days=2)
+
+        earliest_expiry_item = None
+        for ingredient in recipe.ingredients:
+            candidates = self.scorer.get_candidates(ingredient, inventory_map)
+            for cand in candidates:
+                if cand.expiry_date and cand.expiry_date < expiry_threshold:
+                    if earliest_expiry_item is None or cand.expiry_date < earliest_expiry_item.expiry_date:
+                        earliest_expiry_item = cand
+        return earliest_expiry_item
+
     def generate_ask_user_explanation(self, recipe: Recipe, score: float) -> Explanation:
         return Explanation(
             reason=f"Confidence score {score:.1f} is too low.",
@@ -0,0 +1,156 @@
+import bisect
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from ...contracts.inventory import InventoryState, InventoryItem
+from ...ledger.events.types import LedgerEvent, PurchaseEvent, ConsumeEvent, WasteEvent
+from ...ledger.store.interface import LedgerStore
+from ...identity.registry import ITEM_REGISTRY
+from ...recipe.domain.recipe import Recipe
+from ...recipe.domain.feasibility import InventoryIndex
+from ...recipe.index.catalog import RecipeCatalogIndex
+from ...units.fixed import FixedQuantity
+from ..scoring.scorer import RecipeScorer
+
+# Sort key of a ranked recipe: best score first, then recipe id, then catalog position.
+RankKey = Tuple[float, str, int]
+
+class LiveRecommendationView:
+    """
+    D3.1 Feasibility Scoring
+    Ranked recipes kept up to date as ledger events arrive.
+
+    The whole catalog is scored once. After that, an event for item X only
+    re-scores the recipes that use X or something X can substitute for
+    (RecipeCatalogIndex.dependents), and moves their entries in a sorted
+    ranking of all feasible recipes; top() reads its first k entries.
+
+    Inventory is tracked per item as lots (InventoryItem): a purchase adds a
+    lot, consumption and waste take from the lots expiring first. Corrections
+    and snapshots are ignored, as in InventoryProjector. Scores use the date
+    given at construction until refresh() is called.
+    """
+
+    def __init__(self, scorer: RecipeScorer, recipes: Iterable[Recipe], inventory: InventoryState, k: int = 20, today: Optional[date] = None):
+        self.scorer = scorer
+        self.k = k
+        self.catalog = RecipeCatalogIndex(recipes, scorer.feasibility_checker.substitution_graph)
+        self._lock = threading.Lock()
+        self._today = today or date.today()
+
+        self._lots: Dict[int, List[InventoryItem]] = {}
+        for inv_item in inventory.items:
+            self._lots.setdefault(ITEM_REGISTRY.intern(inv_item.item), []).append(inv_item)
+        self._index = InventoryIndex.build(inventory)
+
+        self._scores: Dict[int, float] = {}
+        self._ranking: List[RankKey] = []
+        self._ledger: Optional[LedgerStore] = None
+        self._version = 0
+        self._rescore(range(len(self.catalog.recipes)))
+
+    @property
+    def version(self) -> int:
+        """Ledger version the view reflects (0 when not following a ledger)."""
+        return self._version
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[Recipe, float]]:
+        """
+        The k (default: the view's k) best feasible recipes, best first; ties by recipe id.
+        """
+        k = self.k if k is None else k
+        recipes = self.catalog.recipes
+        with self._lock:
+            return [(recipes[position], -negated) for negated, _, position in self._ranking[:k]]
+
+    def apply(self, event: LedgerEvent) -> int:
+        """
+        Applies one ledger event and re-ranks the affected recipes. Returns how many were re-scored.
+        """
+        with self._lock:
+            return self._apply(event)
+
+    def refresh(self, today: Optional[date] = None) -> None:
+        """
+        Re-scores the whole catalog, e.g. when the day changes and expiry boosts move.
+        """
+        with self._lock:
+            self._today = today or date.today()
+            self._index = InventoryIndex({})
+            for item_id, inv_items in self._lots.items():
+                self._index.update(item_id, inv_items)
+            self._rescore(range(len(self.catalog.recipes)))
+
+    def follow(self, ledger: LedgerStore, from_version: Optional[int] = None) -> None:
+        """
+        Applies ledger events automatically as they are committed.
+        :param from_version: Version the initial inventory reflects (default: the ledger's current version).
+        """
+        self._ledger = ledger
+        self._version = ledger.version if from_version is None else from_version
+        ledger.subscribe(self._on_commit)
+        self._on_commit(ledger.version)
+
+    def close(self) -> None:
+        if self._ledger is not None:
+            self._ledger.unsubscribe(self._on_commit)
+            self._ledger = None
+
+    def _on_commit(self, version: int) -> None:
+        with self._lock:
+            if version <= self._version:
+                return
+            for event in self._ledger.get_stream(from_version=self._version, to_version=version):
+                self._apply(event)
+                self._version += 1
+
+    def _apply(self, event: LedgerEvent) -> int:
+        if not isinstance(event, (PurchaseEvent, ConsumeEvent, WasteEvent)):
+            return 0
+
+        payload = event.payload
+        item_id = ITEM_REGISTRY.intern(payload.item)
+        lots = self._lots.setdefault(item_id, [])
+        if isinstance(event, PurchaseEvent):
+            lots.append(InventoryItem(item=payload.item, quantity=payload.quantity, expiry_date=payload.expiry_date))
+        else:
+            self._lots[item_id] = lots = _take(lots, FixedQuantity.from_quantity(payload.quantity))
+
+        # Reach changes when the item enters or leaves stock; then the recipes using
+        # anything it substitutes for are affected too, which dependents() covers.
+        self._index.update(item_id, lots)
+        return self._rescore(self.catalog.dependents([item_id]))
+
+    def _rescore(self, positions: Iterable[int]) -> int:
+        positions = sorted(positions)
+        recipes = self.catalog.recipes
+        scores = self.scorer.score_indexed([recipes[p] for p in positions], self._index, self._today)
+        for position, score in zip(positions, scores):
+            old = self._scores.get(position)
+            if old == score:
+                continue
+            if old is not None and old > 0:
+                key = (-old, recipes[position].id, position)
+                del self._ranking[bisect.bisect_left(self._ranking, key)]
+            if score > 0:
+                bisect.insort(self._ranking, (-score, recipes[position].id, position))
+            self._scores[position] = score
+        return len(positions)
+
+def _take(lots: List[InventoryItem], amount: FixedQuantity) -> List[InventoryItem]:
+    # Earliest expiry first, undated lots last. Lots in another base unit are left alone.
+    remaining = amount
+    ordered = sorted(lots, key=lambda lot: (lot.expiry_date is None, lot.expiry_date or date.max))
+    kept: List[InventoryItem] = []
+    for lot in ordered:
+        quantity = FixedQuantity.from_quantity(lot.quantity)
+        if remaining.milli <= 0 or quantity.unit != remaining.unit:
+            kept.append(lot)
+            continue
+        if quantity < remaining or quantity == remaining:
+            remaining = remaining - quantity
+            continue
+        left = quantity - remaining
+        remaining = FixedQuantity(remaining.unit, 0)
+        kept.append(lot.model_copy(update={"quantity": left.to_quantity(lot.quantity.unit)}))
+    return kept
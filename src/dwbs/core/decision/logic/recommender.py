@@ -1,10 +1,13 @@
-from typing import List, Union, Optional, Tuple
+import heapq
+from datetime import date
+from typing import Iterable, List, Union, Optional, Tuple
 from pydantic import Field
 from ...contracts.base import SystemContract
 from ...contracts.explanation import Explanation
 from ...recipe.domain.recipe import Recipe
 from ...contracts.inventory import InventoryState
-from ..scoring.scorer import RecipeScorer
+from ...recipe.index.catalog import RecipeCatalogIndex
+from ..scoring.scorer import RecipeScorer, ScoreTrace
 from ..explanation.generator import ExplanationGenerator
 
 class Action(SystemContract):
@@ -21,22 +24,47 @@ class AskUserAction(Action):
 class NoAction(Action):
     pass
 
+class _Ranked:
+    """Heap entry ordered so that the entry ranking last is the smallest."""
+    __slots__ = ("score", "recipe", "trace")
+
+    def __init__(self, recipe: Recipe, trace: ScoreTrace):
+        self.score = trace.score
+        self.recipe = recipe
+        self.trace = trace
+
+    def __lt__(self, other: "_Ranked") -> bool:
+        if self.score != other.score:
+            return self.score < other.score
+        return self.recipe.id > other.recipe.id
+
 class ActionRecommender:
     """
     D3.4 "Ask User" Branch
     Decides whether to suggest a recipe or ask for clarification.
     """
-    def __init__(self, scorer: RecipeScorer, explanation_generator: ExplanationGenerator):
+    # Recipes scored between early-stop checks in recommend_top_k.
+    TOP_K_CHUNK = 64
+
+    def __init__(self, scorer: RecipeScorer, explanation_generator: ExplanationGenerator, catalog_index: Optional[RecipeCatalogIndex] = None):
+        """
+        :param catalog_index: Optional inverted index of the catalog. When set, only recipes
+            whose ingredients are all reachable from in-stock items are scored.
+        """
         self.scorer = scorer
         self.explanation_generator = explanation_generator
+        self.catalog_index = catalog_index
         self.confidence_threshold = 0.6
 
-    def recommend(self, recipes: List[Recipe], inventory: InventoryState) -> Action:
-        scored_recipes: List[Tuple[Recipe, float]] = []
-        for r in recipes:
-            score = self.scorer.score(r, inventory)
-            if score > 0:
-                scored_recipes.append((r, score))
+    def recommend(self, recipes: Optional[List[Recipe]], inventory: InventoryState) -> Action:
+        """
+        :param recipes: Recipes to choose from; None means the whole catalog_index.
+        """
+        # One inventory index per request, shared by scoring and the explanation.
+        index = self.scorer.build_index(inventory)
+        recipes = self._candidates(recipes, index.items)
+        traces = self.scorer.trace_batch(recipes, inventory, index=index)
+        scored_recipes: List[Tuple[Recipe, ScoreTrace]] = [(r, trace) for r, trace in zip(recipes, traces) if trace.score > 0]
 
         if not scored_recipes:
             return NoAction(
@@ -48,9 +76,10 @@ class ActionRecommender:
             )
 
         # Sort desc
-        scored_recipes.sort(key=lambda x: x[1], reverse=True)
+        scored_recipes.sort(key=lambda x: x[1].score, reverse=True)
 
-        top_recipe, top_score = scored_recipes[0]
+        top_recipe, top_trace = scored_recipes[0]
+        top_score = top_trace.score
 
         if top_score < self.confidence_threshold:
             # Low confidence
@@ -61,9 +90,66 @@ class ActionRecommender:
                 target_recipe=top_recipe
             )
         else:
-            explanation = self.explanation_generator.generate_suggestion_explanation(top_recipe, inventory, top_score)
+            explanation = self.explanation_generator.generate_suggestion_explanation(top_recipe, inventory, top_score, inventory_map=index.items, trace=top_trace)
             return SuggestRecipeAction(
                 explanation=explanation,
                 recipe=top_recipe,
                 score=top_score
             )
+
+    def recommend_top_k(self, recipes: Optional[List[Recipe]], inventory: InventoryState, k: int, today: Optional[date] = None) -> List[SuggestRecipeAction]:
+        """
+        The k best feasible recipes, best first: score descending, ties by recipe id.
+        Only the returned recipes get an explanation.
+
+        Recipes are scored in id order in chunks, keeping the k best in a bounded
+        heap. Scoring stops once the k-th score reaches scorer.max_score: a later
+        recipe could at most tie, and it would lose the tie on id.
+        """
+        if k <= 0:
+            return []
+        if today is None:
+            today = date.today()
+
+        index = self.scorer.build_index(inventory)
+        recipes = sorted(self._candidates(recipes, index.items), key=lambda r: r.id)
+        ceiling = self.scorer.max_score(index, today, recipes)
+        chunk = max(k, self.TOP_K_CHUNK)
+
+        heap: List[_Ranked] = []
+        for start in range(0, len(recipes), chunk):
+            batch = recipes[start:start + chunk]
+            for recipe, trace in zip(batch, self.scorer.trace_batch(batch, inventory, today=today, index=index)):
+                if trace.score <= 0:
+                    continue
+                entry = _Ranked(recipe, trace)
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                elif heap[0] < entry:
+                    heapq.heapreplace(heap, entry)
+            if len(heap) == k and heap[0].score >= ceiling:
+                break
+
+        ranked = sorted(heap, reverse=True)
+        return [
+            SuggestRecipeAction(
+                explanation=self.explanation_generator.generate_suggestion_explanation(
+                    entry.recipe, inventory, entry.score, today=today, inventory_map=index.items, trace=entry.trace
+                ),
+                recipe=entry.recipe,
+                score=entry.score
+            )
+            for entry in ranked
+        ]
+
+    def _candidates(self, recipes: Optional[List[Recipe]], in_stock: Iterable[int]) -> List[Recipe]:
+        if self.catalog_index is None:
+            if recipes is None:
+                raise ValueError("recipes is required without a catalog_index")
+            return recipes
+        # Recipes left out have an ingredient nothing in stock can fill, so they would score 0.
+        candidates = self.catalog_index.candidates(in_stock)
+        if recipes is None:
+            return candidates
+        candidate_ids = {r.id for r in candidates}
+        return [r for r in recipes if r.id in candidate_ids]
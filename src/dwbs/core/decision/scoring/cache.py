@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional, Tuple
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    version: Optional[int]
+
+_MISSING = object()
+
+class ScoringCache:
+    """
+    D3.1 Feasibility Scoring
+    Bounded LRU cache for scores and explanations of one household's inventory.
+
+    Entries are keyed by (kind, recipe id, date, ...) under the inventory
+    version they were computed for (InventoryState.version or the ledger
+    version). Seeing a newer version drops every entry; lookups for an older
+    version miss and are not stored. The version must advance whenever the
+    inventory changes, otherwise stale results are served.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version: int, key: Tuple[Hashable, ...], default: Any = None) -> Any:
+        """
+        Cached value for key at version, or default (counted as a miss).
+        """
+        with self._lock:
+            self._advance(version)
+            value = self._entries.get(key, _MISSING) if version == self._version else _MISSING
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, version: int, key: Tuple[Hashable, ...], value: Any) -> None:
+        with self._lock:
+            self._advance(version)
+            if version != self._version:
+                return # Computed for an outdated inventory
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, version: Optional[int] = None) -> None:
+        """
+        Drops every entry; with a version, also treats it as the current one.
+        """
+        with self._lock:
+            self._entries.clear()
+            if version is not None:
+                self._version = version
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries), self._version)
+
+    def _advance(self, version: int) -> None:
+        if self._version is None or version > self._version:
+            self._entries.clear()
+            self._version = version
@@ -2,7 +2,28 @@ from typing import Optional, List, Dict
 from datetime import date, timedelta
 from ...recipe.domain.recipe import Recipe
 from ...contracts.inventory import InventoryState, InventoryItem
-from ...recipe.domain.feasibility import FeasibilityChecker
+from ...recipe.domain.feasibility import FeasibilityChecker, InventoryIndex
+from ...identity.registry import ITEM_REGISTRY
+from .cache import ScoringCache
+
+class ScoreTrace:
+    """
+    What a score was computed from: the candidate inventory items chosen for
+    each ingredient (in ingredient order), the lowest per-ingredient best
+    confidence and the earliest-expiring candidate that triggered the expiry
+    boost, if any. Lets explanations reuse the scorer's walk.
+    """
+    __slots__ = ("score", "min_confidence", "candidates", "earliest_expiring")
+
+    INFEASIBLE: "ScoreTrace"
+
+    def __init__(self, score: float, min_confidence: float, candidates: List[List[InventoryItem]], earliest_expiring: Optional[InventoryItem] = None):
+        self.score = score
+        self.min_confidence = min_confidence
+        self.candidates = candidates
+        self.earliest_expiring = earliest_expiring
+
+ScoreTrace.INFEASIBLE = ScoreTrace(0.0, 0.0, [])
 
 class RecipeScorer:
     """
@@ -12,8 +33,13 @@ class RecipeScorer:
 
     EXPIRY_BOOST = 1.0
 
-    def __init__(self, feasibility_checker: FeasibilityChecker):
+    def __init__(self, feasibility_checker: FeasibilityChecker, cache: Optional[ScoringCache] = None):
+        """
+        :param cache: Optional result cache keyed by recipe id, InventoryState.version and date.
+            Only use it when the inventory's version advances on every change.
+        """
         self.feasibility_checker = feasibility_checker
+        self.cache = cache
 
     def score(self, recipe: Recipe, inventory_state: InventoryState, today: Optional[date] = None) -> float:
         """
@@ -22,50 +48,148 @@ class RecipeScorer:
         Refined (Task 4.2): Multiply score by lowest ingredient confidence.
         Refined (Task 4.3): Add boost if any ingredient is expiring (< today + 2 days).
         """
-        if not self.feasibility_checker.can_cook(recipe, inventory_state):
-            return 0.0
+        return self.trace(recipe, inventory_state, today).score
+
+    def trace(self, recipe: Recipe, inventory_state: InventoryState, today: Optional[date] = None) -> "ScoreTrace":
+        """
+        score() with the work behind it: see ScoreTrace.
+        """
+        if self.cache is None:
+            return self._trace(recipe, inventory_state, today)
+
+        if today is None:
+            today = date.today()
+        key = ("trace", recipe.id, today)
+        trace = self.cache.get(inventory_state.version, key)
+        if trace is None:
+            trace = self._trace(recipe, inventory_state, today)
+            self.cache.put(inventory_state.version, key, trace)
+        return trace
+
+    def _trace(self, recipe: Recipe, inventory_state: InventoryState, today: Optional[date]) -> "ScoreTrace":
+        index = self.feasibility_checker.index_for(inventory_state)
+        if not self.feasibility_checker.can_cook_indexed(recipe, index):
+            return ScoreTrace.INFEASIBLE
+
+        return self._trace_feasible(recipe, index, today)
+
+    def score_batch(self, recipes: List[Recipe], inventory_state: InventoryState, today: Optional[date] = None, index: Optional[InventoryIndex] = None) -> List[float]:
+        """
+        Scores every recipe against one InventoryIndex built for the whole batch
+        (or the one given). Returns the same values as score(), in recipe order.
+        """
+        return [trace.score for trace in self.trace_batch(recipes, inventory_state, today, index)]
+
+    def trace_batch(self, recipes: List[Recipe], inventory_state: InventoryState, today: Optional[date] = None, index: Optional[InventoryIndex] = None) -> List["ScoreTrace"]:
+        """
+        score_batch returning the ScoreTrace of every recipe.
+        """
+        if self.cache is None:
+            if index is None:
+                index = self.feasibility_checker.index_for(inventory_state)
+            return self.trace_indexed(recipes, index, today)
+
+        # Only the recipes missing from the cache are scored (and the index built for them).
+        if today is None:
+            today = date.today()
+        version = inventory_state.version
+        traces = [self.cache.get(version, ("trace", recipe.id, today)) for recipe in recipes]
+        missing = [i for i, trace in enumerate(traces) if trace is None]
+        if missing:
+            if index is None:
+                index = self.feasibility_checker.index_for(inventory_state)
+            for i, trace in zip(missing, self.trace_indexed([recipes[i] for i in missing], index, today)):
+                traces[i] = trace
+                self.cache.put(version, ("trace", recipes[i].id, today), trace)
+        return traces
+
+    def score_indexed(self, recipes: List[Recipe], index: InventoryIndex, today: Optional[date] = None) -> List[float]:
+        """
+        score_batch against a prebuilt InventoryIndex alone.
+        """
+        return [trace.score for trace in self.trace_indexed(recipes, index, today)]
+
+    def trace_indexed(self, recipes: List[Recipe], index: InventoryIndex, today: Optional[date] = None) -> List["ScoreTrace"]:
+        if today is None:
+            today = date.today()
 
+        return [
+            self._trace_feasible(recipe, index, today) if self.feasibility_checker.can_cook_indexed(recipe, index) else ScoreTrace.INFEASIBLE
+            for recipe in recipes
+        ]
+
+    def _trace_feasible(self, recipe: Recipe, index: InventoryIndex, today: Optional[date]) -> "ScoreTrace":
         if today is None:
             today = date.today()
 
         min_ingredient_confidence = 1.0
-        has_expiring_ingredient = False
+        earliest_expiring: Optional[InventoryItem] = None
         expiry_threshold = today + timedelta(days=2)
-
-        inventory_map = self.build_inventory_map(inventory_state)
+        chosen: List[List[InventoryItem]] = []
 
         for ingredient in recipe.ingredients:
-            candidates = self.get_candidates(ingredient, inventory_map)
+            candidates = self.get_indexed_candidates(ingredient, index)
 
             if not candidates:
                 # Should not happen if can_cook is True
-                return 0.0
+                return ScoreTrace.INFEASIBLE
+            chosen.append(candidates)
 
             # Optimistic: use best confidence available for this ingredient
             best_conf = max(c.item.confidence for c in candidates)
             min_ingredient_confidence = min(min_ingredient_confidence, best_conf)
 
-            # Check for expiring items
-            if not has_expiring_ingredient:
-                for cand in candidates:
-                    if cand.expiry_date and cand.expiry_date < expiry_threshold:
-                        has_expiring_ingredient = True
-                        break
-
-        final_score = min_ingredient_confidence + (self.EXPIRY_BOOST if has_expiring_ingredient else 0.0)
-        return final_score
-
-    def build_inventory_map(self, inventory_state: InventoryState) -> Dict[str, List[InventoryItem]]:
-        inventory_map: Dict[str, List[InventoryItem]] = {}
-        for item in inventory_state.items:
-            if item.is_in_stock():
-                key = self.get_key(item.item)
-                if key not in inventory_map:
-                    inventory_map[key] = []
-                inventory_map[key].append(item)
-        return inventory_map
-
-    def get_candidates(self, ingredient, inventory_map: Dict[str, List[InventoryItem]]) -> List[InventoryItem]:
+            # Check for expiring items; the earliest one is what explanations cite
+            for cand in candidates:
+                if cand.expiry_date and cand.expiry_date < expiry_threshold:
+                    if earliest_expiring is None or cand.expiry_date < earliest_expiring.expiry_date:
+                        earliest_expiring = cand
+
+        final_score = min_ingredient_confidence + (self.EXPIRY_BOOST if earliest_expiring is not None else 0.0)
+        return ScoreTrace(final_score, min_ingredient_confidence, chosen, earliest_expiring)
+
+    def max_score(self, index: InventoryIndex, today: Optional[date] = None, recipes: Optional[List[Recipe]] = None) -> float:
+        """
+        Upper bound on the score of any recipe against this inventory: the best
+        in-stock confidence, plus the expiry boost if anything in stock expires soon.
+        A recipe without ingredients always scores 1.0, so the bound is at least
+        that unless `recipes` is given and every one of them has an ingredient.
+        """
+        if today is None:
+            today = date.today()
+        expiry_threshold = today + timedelta(days=2)
+
+        best_conf = 0.0
+        has_expiring_item = False
+        for inv_items in index.items.values():
+            for inv_item in inv_items:
+                best_conf = max(best_conf, inv_item.item.confidence)
+                if inv_item.expiry_date and inv_item.expiry_date < expiry_threshold:
+                    has_expiring_item = True
+        ceiling = best_conf + (self.EXPIRY_BOOST if has_expiring_item else 0.0)
+        if recipes is None or any(not recipe.ingredients for recipe in recipes):
+            ceiling = max(ceiling, 1.0)
+        return ceiling
+
+    def build_inventory_map(self, inventory_state: InventoryState) -> Dict[int, List[InventoryItem]]:
+        return self.build_index(inventory_state).items
+
+    def build_index(self, inventory_state: InventoryState) -> InventoryIndex:
+        """
+        Indexes the inventory once so a whole batch can be scored against it.
+        """
+        return InventoryIndex.build(inventory_state)
+
+    def get_indexed_candidates(self, ingredient, index: InventoryIndex) -> List[InventoryItem]:
+        """
+        Same items as get_candidates, with one lookup in the index's SubstituteReach.
+        """
+        candidates: List[InventoryItem] = []
+        for filler_key, _ in index.reach(self.feasibility_checker.substitution_graph).fillers(self.get_key(ingredient.item)):
+            candidates.extend(index.items[filler_key])
+        return candidates
+
+    def get_candidates(self, ingredient, inventory_map: Dict[int, List[InventoryItem]]) -> List[InventoryItem]:
         candidates: List[InventoryItem] = []
         # Direct
         key = self.get_key(ingredient.item)
@@ -74,13 +198,12 @@ class RecipeScorer:
 
         # Substitutes
         if self.feasibility_checker.substitution_graph:
-            substitutes = self.feasibility_checker.substitution_graph.get_substitutes(ingredient.item)
-            for sub_item, _ in substitutes:
-                sub_key = self.get_key(sub_item)
+            substitutes = self.feasibility_checker.substitution_graph.get_substitute_ids(key)
+            for sub_key, _ in substitutes:
                 if sub_key in inventory_map:
                     candidates.extend(inventory_map[sub_key])
         return candidates
 
-    def get_key(self, item_identity) -> str:
-        # Match FeasibilityChecker logic
-        return f"{item_identity.name}|{item_identity.variant}|{item_identity.brand}"
+    def get_key(self, item_identity) -> int:
+        # Match FeasibilityChecker logic: registry id of (name, variant, brand)
+        return ITEM_REGISTRY.intern(item_identity)
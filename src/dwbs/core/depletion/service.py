@@ -1,11 +1,13 @@
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 from ..contracts.failure import Result, ErrorCode
 from ..recipe.domain.recipe import Recipe
 from ..ledger.events.types import ConsumeEvent, ConsumePayload
 from ..contracts.mutation import MutationSource
 from ..contracts.explanation import Explanation
-from ..contracts.inventory import Quantity
+from ..units.fixed import FixedQuantity
+from ..ledger.store.interface import LedgerStore
+from ..exceptions import ConcurrencyError
 
 class DepletionService:
     """
@@ -30,13 +32,8 @@ class DepletionService:
         factor_decimal = Decimal(str(factor))
 
         for ingredient in recipe.ingredients:
-            # Apply factor
-            new_quantity_value = ingredient.quantity.value * factor_decimal
-            new_quantity = Quantity(
-                value=new_quantity_value,
-                unit=ingredient.quantity.unit,
-                approx=ingredient.quantity.approx
-            )
+            # Apply factor in milli-base-units; the event keeps the recipe's unit.
+            new_quantity = FixedQuantity.from_quantity(ingredient.quantity).scaled(factor_decimal).to_quantity(ingredient.quantity.unit)
 
             explanation = Explanation(
                 reason=f"Cooking: {recipe.name} (x{factor})",
@@ -58,3 +55,19 @@ class DepletionService:
             events.append(event)
 
         return Result.success(events)
+
+    def commit_recipe(self, ledger: LedgerStore, recipe: Recipe, actor_id: str, factor: float = 1.0, expected_version: Optional[int] = None) -> Result[List[ConsumeEvent]]:
+        """
+        Drafts the ConsumeEvents for a recipe and appends them as one atomic batch.
+        Fails without touching the ledger if the version check does not pass.
+        """
+        result = self.deplete_recipe(recipe, actor_id, factor)
+        if result.is_failure:
+            return result
+
+        try:
+            ledger.append_many(result.value, expected_version=expected_version)
+        except ConcurrencyError as e:
+            return Result.fail(ErrorCode.INVALID_STATE, str(e))
+
+        return result
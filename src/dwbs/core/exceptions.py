@@ -29,3 +29,17 @@ class UncertaintyError(DWBSException):
 class ConcurrencyError(DWBSException):
     """Raised when an optimistic locking check fails."""
     pass
+
+class LedgerCorruptionError(DWBSException):
+    """Raised when a persisted ledger fails integrity checks (e.g. checksum mismatch)."""
+    pass
+
+class DuplicateEventError(DWBSException):
+    """Raised when an appended event reuses an event_id already in the ledger (or in its batch)."""
+    pass
+
+class SubstitutionCycleError(DWBSException, ValueError):
+    """Raised when substitution rules would form a cycle. `edges` lists the offending rules."""
+    def __init__(self, message: str, edges=()):
+        super().__init__(message)
+        self.edges = list(edges)
@@ -0,0 +1,65 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+from ..contracts.inventory import ItemIdentity
+
+IdentityKey = Tuple[str, Optional[str], Optional[str]]
+
+class ItemRegistry:
+    """
+    D1.2 Item Identity Resolution
+    Interns item identities and hands out dense integer ids.
+
+    Two identities get the same id when name, variant and brand match
+    (confidence is ignored, as in ItemIdentity.__eq__). Ids start at 0 and
+    never change, so they can index lists and arrays. Interning is
+    thread-safe; lookups of known identities take no lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[IdentityKey, int] = {}
+        self._identities: List[ItemIdentity] = []
+
+    def intern(self, item: ItemIdentity) -> int:
+        """
+        Id of the identity, registering it on first use.
+        """
+        return self.intern_key(item.name, item.variant, item.brand)
+
+    def intern_key(self, name: str, variant: Optional[str] = None, brand: Optional[str] = None) -> int:
+        key = (name, variant, brand)
+        item_id = self._ids.get(key)
+        if item_id is not None:
+            return item_id
+        with self._lock:
+            item_id = self._ids.get(key)
+            if item_id is None:
+                item_id = len(self._identities)
+                self._identities.append(ItemIdentity(name=name, variant=variant, brand=brand))
+                self._ids[key] = item_id
+            return item_id
+
+    def get(self, item: ItemIdentity) -> Optional[int]:
+        """
+        Id of an already registered identity, or None. Never registers.
+        """
+        return self._ids.get((item.name, item.variant, item.brand))
+
+    def identity(self, item_id: int) -> ItemIdentity:
+        """
+        Canonical (shared) ItemIdentity for an id.
+        """
+        return self._identities[item_id]
+
+    def __len__(self) -> int:
+        return len(self._identities)
+
+# Process-wide registry shared by the ledger, recipes and the substitution graph,
+# so ids from one component are valid in the others.
+ITEM_REGISTRY = ItemRegistry()
+
+def item_id(item: ItemIdentity) -> int:
+    """
+    Id of the identity in the shared registry.
+    """
+    return ITEM_REGISTRY.intern(item)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from ...ledger.store.interface import LedgerStore
 from ...ledger.events.types import PurchaseEvent, PurchasePayload
@@ -14,9 +14,10 @@ class DraftConfirmationService:
     def __init__(self, ledger_store: LedgerStore):
         self.ledger_store = ledger_store
 
-    def finalize_draft(self, draft_items: List[DraftItem], actor: str = "user") -> List[PurchaseEvent]:
+    def finalize_draft(self, draft_items: List[DraftItem], actor: str = "user", expected_version: Optional[int] = None) -> List[PurchaseEvent]:
         """
         Converts a list of confirmed draft items into PurchaseEvents and commits them to the ledger.
+        The whole draft is committed as one batch: either every line lands or none does.
         """
         events = []
         for draft in draft_items:
@@ -37,7 +38,9 @@ class DraftConfirmationService:
                 payload=payload
             )
 
-            self.ledger_store.append(event)
             events.append(event)
 
+        if events:
+            self.ledger_store.append_many(events, expected_version=expected_version)
+
         return events
@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Callable, Optional
+from pydantic import Field, model_validator
+from ...contracts.base import SystemContract
+from ...contracts.failure import Result, ErrorCode
+from ...contracts.mutation import MutationType, MutationSource
+from ...contracts.explanation import Explanation
+from ..events.types import SnapshotEvent, SnapshotPayload
+from ..store.interface import LedgerStore
+from ..projection import IncrementalInventoryProjector
+
+class CheckpointPolicy(SystemContract):
+    """
+    When to write a projection checkpoint. Either trigger is enough.
+    Triggers are evaluated as events are committed; there is no background timer.
+    """
+    every_events: Optional[int] = Field(1000, ge=1, description="Checkpoint after this many new events.")
+    every_seconds: Optional[float] = Field(None, gt=0, description="Checkpoint when this much time passed and new events exist.")
+
+    @model_validator(mode="after")
+    def at_least_one_trigger(self) -> "CheckpointPolicy":
+        if self.every_events is None and self.every_seconds is None:
+            raise ValueError("CheckpointPolicy needs every_events or every_seconds")
+        return self
+
+class CheckpointService:
+    """
+    D1.1 Event-Sourcing Lite
+    Periodically persists the projected inventory as a SNAPSHOT event, so a
+    cold start replays at most one checkpoint interval of events.
+    """
+    ACTOR = "system:checkpoint"
+
+    def __init__(
+        self,
+        ledger: LedgerStore,
+        projector: IncrementalInventoryProjector,
+        policy: Optional[CheckpointPolicy] = None,
+        auto: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param auto: Check the policy after every commit to the ledger.
+        :param clock: Monotonic time source (injectable for tests).
+        """
+        self._ledger = ledger
+        self._projector = projector
+        self._policy = policy or CheckpointPolicy()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_time = clock()
+
+        latest = ledger.latest_of_type(MutationType.SNAPSHOT)
+        self._last_version = ledger.get_event_version(latest.event_id) if latest else 0
+
+        self._auto = auto
+        if auto:
+            ledger.subscribe(self._on_commit)
+
+    def is_due(self) -> bool:
+        pending = self._ledger.version - self._last_version
+        if pending <= 0:
+            return False
+        if self._policy.every_events is not None and pending >= self._policy.every_events:
+            return True
+        if self._policy.every_seconds is not None and self._clock() - self._last_time >= self._policy.every_seconds:
+            return True
+        return False
+
+    def checkpoint(self) -> Result[SnapshotEvent]:
+        """
+        Writes the projector's current state as a SNAPSHOT event, regardless of policy.
+        """
+        with self._lock:
+            return self._checkpoint_locked()
+
+    def close(self) -> None:
+        if self._auto:
+            self._ledger.unsubscribe(self._on_commit)
+            self._auto = False
+
+    def _on_commit(self, version: int) -> None:
+        # Skip when another thread (or this append's own checkpoint) holds the lock;
+        # the policy is checked again under the lock since that thread may have just written one.
+        if not self.is_due() or not self._lock.acquire(blocking=False):
+            return
+        try:
+            if not self.is_due():
+                return
+            failed = True
+            try:
+                failed = self._checkpoint_locked().is_failure
+            finally:
+                if failed:
+                    # Back off for a full interval instead of retrying on every commit.
+                    self._last_time = self._clock()
+                    self._last_version = self._ledger.version
+        finally:
+            self._lock.release()
+
+    def _checkpoint_locked(self) -> Result[SnapshotEvent]:
+        self._projector.catch_up()
+        try:
+            items = self._projector.state()
+        except ValueError as e:
+            return Result.fail(ErrorCode.INVALID_STATE, "Inventory cannot be projected; checkpoint skipped.", str(e))
+
+        event = SnapshotEvent(
+            actor=self.ACTOR,
+            payload=SnapshotPayload(
+                as_of_version=self._projector.version,
+                items=items,
+                source=MutationSource.SYSTEM_LOGIC,
+                explanation=Explanation(
+                    reason="Periodic projection checkpoint.",
+                    source_fact="ledger:checkpoint",
+                    confidence=1.0
+                )
+            )
+        )
+        # Mark before appending: the append notifies _on_commit again.
+        self._last_time = self._clock()
+        self._last_version = self._ledger.version + 1
+        self._ledger.append(event)
+        self._last_version = self._ledger.get_event_version(event.event_id)
+        return Result.success(event)
@@ -14,16 +14,8 @@ class UndoService:
         Creates a CorrectionAddEvent to reverse a ConsumeEvent.
         Blocks if the item has been modified since the target event.
         """
-        # Find event
-        target_event = None
-        stream = list(ledger.get_stream()) # Materialize once
-
-        target_index = -1
-        for i, event in enumerate(stream):
-            if str(event.event_id) == str(event_id):
-                target_event = event
-                target_index = i
-                break
+        # Find event through the store's event-id index
+        target_event = ledger.get_event(event_id)
 
         if not target_event:
              return Result.fail(ErrorCode.MISSING_DATA, "Event not found")
@@ -34,12 +26,11 @@ class UndoService:
         # Check if stock modified since
         target_item = target_event.payload.item
 
-        # Check events AFTER target_index
-        for i in range(target_index + 1, len(stream)):
-            event = stream[i]
-            if hasattr(event, 'payload') and hasattr(event.payload, 'item'):
-                if event.payload.item == target_item:
-                     return Result.fail(ErrorCode.INVALID_STATE, "Item modified since consumption. Undo blocked.")
+        # The item index knows the last event touching this item; anything after the target blocks.
+        target_version = ledger.get_event_version(event_id)
+        last_modified = ledger.last_modified_version(target_item)
+        if last_modified is not None and last_modified > target_version:
+            return Result.fail(ErrorCode.INVALID_STATE, "Item modified since consumption. Undo blocked.")
 
         # Create correction
         correction_payload = CorrectionPayload(
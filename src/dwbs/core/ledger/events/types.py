@@ -1,6 +1,6 @@
 from uuid import UUID, uuid4
 from datetime import datetime, date
-from typing import Optional, Union, Literal
+from typing import Dict, Optional, Union, Literal
 from pydantic import Field, ConfigDict
 
 from ...contracts import SystemContract, MutationType, MutationSource, Explanation
@@ -37,6 +37,15 @@ class CorrectionPayload(BasePayload):
     source: MutationSource
     explanation: Explanation
 
+class SnapshotPayload(BasePayload):
+    """
+    Projected inventory state (Item Name -> normalized Quantity) at a ledger version.
+    """
+    as_of_version: int = Field(..., ge=0, description="Ledger version the state was projected at.")
+    items: Dict[str, Quantity]
+    source: MutationSource = MutationSource.SYSTEM_LOGIC
+    explanation: Explanation
+
 class LedgerEvent(SystemContract):
     """
     D1.1 Event-Sourcing Lite
@@ -68,6 +77,10 @@ class CorrectionRemoveEvent(LedgerEvent):
     mutation_type: Literal[MutationType.CORRECTION_REMOVE] = MutationType.CORRECTION_REMOVE
     payload: CorrectionPayload
 
+class SnapshotEvent(LedgerEvent):
+    mutation_type: Literal[MutationType.SNAPSHOT] = MutationType.SNAPSHOT
+    payload: SnapshotPayload
+
 InventoryEvent = Union[
     PurchaseEvent,
     ConsumeEvent,
@@ -1,7 +1,20 @@
-from typing import List, Dict, Any
-from decimal import Decimal
-from .events.types import LedgerEvent, PurchaseEvent, ConsumeEvent, WasteEvent, CorrectionAddEvent, CorrectionRemoveEvent
+import threading
+from datetime import datetime
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+from .events.types import LedgerEvent, PurchaseEvent, ConsumeEvent, WasteEvent, CorrectionAddEvent, CorrectionRemoveEvent, SnapshotEvent, SnapshotPayload
+from .store.interface import LedgerStore
+from ..contracts.inventory import ItemIdentity
+from ..contracts.mutation import MutationType
 from ..units.converter import Quantity, Unit
+from ..units.fixed import FixedQuantity
+
+def latest_checkpoint(ledger: LedgerStore, max_version: Optional[int] = None) -> Optional[SnapshotPayload]:
+    """
+    Payload of the most recent SNAPSHOT checkpoint among the first `max_version` events.
+    """
+    event = ledger.latest_of_type(MutationType.SNAPSHOT, max_version=max_version)
+    # Bare SNAPSHOT markers without a payload carry no state to start from.
+    return event.payload if isinstance(event, SnapshotEvent) else None
 
 class InventoryProjector:
     """
@@ -9,44 +22,190 @@ class InventoryProjector:
     """
 
     @staticmethod
-    def project_state(events: List[LedgerEvent]) -> Dict[str, Quantity]:
+    def project_state(events: Iterable[LedgerEvent]) -> Dict[str, Quantity]:
         """
         Reconstructs the current inventory state (Item Name -> Quantity).
         Normalizes all quantities to their base unit for aggregation.
         """
-        inventory: Dict[str, Quantity] = {} # name -> Quantity (normalized)
+        balances: Dict[str, FixedQuantity] = {} # name -> running total (normalized)
 
         for event in events:
-            # Skip events without payload or quantity if any (e.g. unknown types)
-            if not hasattr(event, 'payload') or not hasattr(event.payload, 'quantity'):
-                continue
-
-            qty = event.payload.quantity.normalize()
-            item_name = event.payload.item.name
-
-            # Helper to get current value or 0
-            current_qty = inventory.get(item_name)
-
-            if isinstance(event, (PurchaseEvent, CorrectionAddEvent)):
-                if current_qty is None:
-                    inventory[item_name] = qty
-                else:
-                    inventory[item_name] = current_qty + qty
-
-            elif isinstance(event, (ConsumeEvent, WasteEvent, CorrectionRemoveEvent)):
-                if current_qty is not None:
-                    # Subtract
-                    inventory[item_name] = current_qty - qty
-
-                    # If quantity becomes <= 0, should we remove it?
-                    # Contracts say "No negative inventory".
-                    # If we go negative here, it means the ledger has invalid state relative to this simple projection.
-                    # We will allow negative in calculation but maybe filter in UI.
-                    # Or strictly, we keep it to show the discrepancy.
-                else:
-                    # Removing from empty?
-                    # Initialize with negative
-                    neg_qty = Quantity(value=-qty.value, unit=qty.unit, approx=qty.approx)
-                    inventory[item_name] = neg_qty
-
-        return inventory
+            InventoryProjector._apply(balances, event)
+
+        return _to_state(balances)
+
+    @staticmethod
+    def project_ledger(ledger: LedgerStore) -> Dict[str, Quantity]:
+        """
+        Projects the current state of a store, starting from its latest
+        SNAPSHOT checkpoint and replaying only the events after it.
+        """
+        checkpoint = latest_checkpoint(ledger)
+        balances = _from_state(checkpoint.items) if checkpoint else {}
+        from_version = checkpoint.as_of_version if checkpoint else 0
+
+        for event in ledger.get_stream(from_version=from_version):
+            InventoryProjector._apply(balances, event)
+
+        return _to_state(balances)
+
+    @staticmethod
+    def state_as_of(ledger: LedgerStore, version: Optional[int] = None, timestamp: Optional[datetime] = None) -> Dict[str, Quantity]:
+        """
+        Inventory as it was at a ledger version or a point in time (exactly one must be given).
+        Starts from the nearest checkpoint inside that prefix and replays only the delta.
+        """
+        if (version is None) == (timestamp is None):
+            raise ValueError("Provide exactly one of version or timestamp")
+        target = version if version is not None else ledger.version_at(timestamp)
+
+        checkpoint = latest_checkpoint(ledger, max_version=target)
+        balances = _from_state(checkpoint.items) if checkpoint else {}
+        from_version = checkpoint.as_of_version if checkpoint else 0
+
+        for event in ledger.get_stream(from_version=from_version, to_version=target):
+            InventoryProjector._apply(balances, event)
+
+        return _to_state(balances)
+
+    @staticmethod
+    def project_item(ledger: LedgerStore, item: ItemIdentity) -> Optional[Quantity]:
+        """
+        Balance of a single item identity (name, variant, brand), read through
+        the store's per-item index instead of replaying the whole ledger.
+        """
+        balances: Dict[str, FixedQuantity] = {}
+        for event in ledger.get_item_stream(item):
+            InventoryProjector._apply(balances, event)
+        balance = balances.get(item.name)
+        return balance.to_quantity() if balance is not None else None
+
+    @staticmethod
+    def _apply(balances: Dict[str, FixedQuantity], event: LedgerEvent) -> None:
+        """
+        Adds one event to the running totals. Raises ValueError where the
+        Quantity arithmetic would: mixed units or a negative balance.
+        """
+        change = _signed_change(event)
+        if change is not None:
+            _accumulate(balances, *change)
+
+def _signed_change(event: LedgerEvent) -> Optional[Tuple[str, FixedQuantity]]:
+    # Skip events without payload or quantity (e.g. snapshots; corrections carry quantity_delta)
+    if not hasattr(event, 'payload') or not hasattr(event.payload, 'quantity'):
+        return None
+
+    amount = FixedQuantity.from_quantity(event.payload.quantity)
+    if isinstance(event, (PurchaseEvent, CorrectionAddEvent)):
+        return event.payload.item.name, amount
+    if isinstance(event, (ConsumeEvent, WasteEvent, CorrectionRemoveEvent)):
+        return event.payload.item.name, -amount
+    return None
+
+def _accumulate(balances: Dict[str, FixedQuantity], item_name: str, amount: FixedQuantity) -> None:
+    current = balances.get(item_name)
+    balance = amount if current is None else current + amount
+    if balance.milli < 0:
+        # Contracts say "No negative inventory".
+        raise ValueError("Quantity value must be non-negative")
+    balances[item_name] = balance
+
+def _from_state(state: Dict[str, Quantity]) -> Dict[str, FixedQuantity]:
+    return {name: FixedQuantity.from_quantity(quantity) for name, quantity in state.items()}
+
+def _to_state(balances: Dict[str, FixedQuantity]) -> Dict[str, Quantity]:
+    return {name: balance.to_quantity() for name, balance in balances.items()}
+
+class IncrementalInventoryProjector:
+    """
+    Stateful projector kept in sync with a LedgerStore.
+
+    Applies only the events after its last processed version and answers
+    single-item queries in O(1). Results equal InventoryProjector.project_state
+    over the same events; an item whose history project_state cannot project
+    raises ValueError when read.
+    """
+
+    def __init__(self, ledger: LedgerStore, checkpoint_version: int = 0, checkpoint_state: Optional[Dict[str, Quantity]] = None, subscribe: bool = True):
+        """
+        :param ledger: Store to follow.
+        :param checkpoint_version: Version that checkpoint_state was projected at; replay starts after it.
+        :param checkpoint_state: Projected state at checkpoint_version (as returned by project_state).
+        :param subscribe: Catch up automatically after every append to the ledger.
+        """
+        self._ledger = ledger
+        self._lock = threading.Lock()
+        self._version = checkpoint_version
+        self._balances: Dict[str, Optional[FixedQuantity]] = _from_state(checkpoint_state or {})
+        # Items whose history stopped being projectable, with the project_state error.
+        self._errors: Dict[str, str] = {}
+
+        self.catch_up()
+        self._subscribed = subscribe
+        if subscribe:
+            ledger.subscribe(self._on_commit)
+
+    @classmethod
+    def from_latest_checkpoint(cls, ledger: LedgerStore, subscribe: bool = True) -> "IncrementalInventoryProjector":
+        """
+        Starts from the ledger's latest SNAPSHOT checkpoint and replays only the tail.
+        """
+        checkpoint = latest_checkpoint(ledger)
+        if checkpoint is None:
+            return cls(ledger, subscribe=subscribe)
+        return cls(ledger, checkpoint.as_of_version, checkpoint.items, subscribe=subscribe)
+
+    @property
+    def version(self) -> int:
+        """Ledger version the state reflects."""
+        return self._version
+
+    @property
+    def is_stale(self) -> bool:
+        return self._ledger.version > self._version
+
+    def catch_up(self) -> int:
+        """
+        Applies events committed since the last processed version. Returns the new version.
+        """
+        with self._lock:
+            for event in self._ledger.get_stream(from_version=self._version):
+                self._apply(event)
+                self._version += 1
+            return self._version
+
+    def get(self, item_name: str) -> Optional[Quantity]:
+        """
+        Current quantity of an item (normalized), or None if it never appeared.
+        """
+        error = self._errors.get(item_name)
+        if error is not None:
+            raise ValueError(error)
+        balance = self._balances.get(item_name)
+        return balance.to_quantity() if balance is not None else None
+
+    def state(self) -> Dict[str, Quantity]:
+        """
+        Full projected state, as InventoryProjector.project_state would return it.
+        """
+        return {name: self.get(name) for name in list(self._balances)}
+
+    def close(self) -> None:
+        if self._subscribed:
+            self._ledger.unsubscribe(self._on_commit)
+            self._subscribed = False
+
+    def _on_commit(self, version: int) -> None:
+        if version > self._version:
+            self.catch_up()
+
+    def _apply(self, event: LedgerEvent) -> None:
+        change = _signed_change(event)
+        if change is None or change[0] in self._errors:
+            return
+        item_name, amount = change
+        try:
+            _accumulate(self._balances, item_name, amount)
+        except ValueError as e:
+            self._errors[item_name] = str(e)
+            self._balances.setdefault(item_name, None)
@@ -0,0 +1,33 @@
+import json
+from typing import Dict, Type
+from ..events.types import (
+    LedgerEvent, PurchaseEvent, ConsumeEvent, WasteEvent, CorrectionAddEvent, CorrectionRemoveEvent, SnapshotEvent
+)
+from ...contracts.mutation import MutationType
+
+# Concrete event class per mutation type. Events without a payload decode as
+# the plain LedgerEvent.
+EVENT_TYPES: Dict[MutationType, Type[LedgerEvent]] = {
+    MutationType.PURCHASE: PurchaseEvent,
+    MutationType.CONSUME: ConsumeEvent,
+    MutationType.WASTE: WasteEvent,
+    MutationType.CORRECTION_ADD: CorrectionAddEvent,
+    MutationType.CORRECTION_REMOVE: CorrectionRemoveEvent,
+    MutationType.SNAPSHOT: SnapshotEvent,
+}
+
+def encode_event(event: LedgerEvent) -> bytes:
+    """
+    Serializes an event to UTF-8 JSON for durable stores.
+    """
+    return event.model_dump_json().encode("utf-8")
+
+def decode_event(data: bytes) -> LedgerEvent:
+    """
+    Rebuilds the concrete event class from bytes produced by encode_event.
+    """
+    raw = json.loads(data)
+    if raw.get("payload") is None:
+        return LedgerEvent.model_validate(raw)
+    event_cls = EVENT_TYPES.get(MutationType(raw["mutation_type"]), LedgerEvent)
+    return event_cls.model_validate(raw)
@@ -0,0 +1,425 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Iterator, Optional, Sequence, Tuple, Union
+from uuid import UUID
+from .interface import LedgerStore
+from .codec import encode_event, decode_event
+from ..events.types import LedgerEvent
+from ...contracts.inventory import ItemIdentity
+from ...contracts.mutation import MutationType
+from ...identity.registry import ITEM_REGISTRY
+from ...exceptions import ConcurrencyError, LedgerCorruptionError
+
+class _Segment:
+    """
+    Bookkeeping for one segment file: first version it holds and record offsets.
+    """
+    __slots__ = ("base_version", "path", "offsets", "size")
+
+    def __init__(self, base_version: int, path: Path):
+        self.base_version = base_version
+        self.path = path
+        self.offsets: List[int] = []
+        self.size = 0
+
+class FileLedgerStore(LedgerStore):
+    """
+    D1.1 Event-Sourcing Lite
+    Durable LedgerStore backed by rolling append-only segment files.
+
+    Each record is framed as [length][batch_remaining][crc32][json payload],
+    where batch_remaining counts the records still to follow in the same
+    append_many batch. Appends from concurrent threads share fsyncs (group
+    commit): one thread syncs on behalf of every record written before it
+    started, the others wait for it. A torn record or unfinished batch at the
+    tail of the last segment (crash mid-write) is truncated on open; a bad
+    record anywhere else raises LedgerCorruptionError.
+
+    With sync on, one appending thread is bound by fsync latency, and group
+    commit across threads is bound by per-append Python work under the GIL
+    (see benchmarks/file_ledger_append.py). Bulk writers should use
+    append_many, which pays for one fsync per batch.
+
+    The per-item index (registry item id -> sorted event positions), the event-id
+    index (event_id -> position), the type index (mutation type -> sorted
+    positions) and the running maximum of UTC timestamps used by version_at live
+    in memory and are rebuilt from the segments on open.
+    """
+
+    SEGMENT_SUFFIX = ".seg"
+    DEFAULT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+    _HEADER = struct.Struct("<III") # payload length, batch_remaining, crc32 of (batch_remaining + payload)
+
+    def __init__(self, directory: Union[str, Path], segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES, sync: bool = True):
+        """
+        :param directory: Directory holding the segment files (created if missing).
+        :param segment_max_bytes: Size after which a new segment is started.
+        :param sync: fsync before append returns. Disable only for throwaway ledgers.
+        """
+        if segment_max_bytes <= 0:
+            raise ValueError("segment_max_bytes must be positive")
+
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._segment_max_bytes = segment_max_bytes
+        self._sync = sync
+
+        self._write_lock = threading.Lock()
+        self._sync_cond = threading.Condition()
+        self._durable_version = 0
+        self._syncing = False
+
+        self._segments: List[_Segment] = []
+        self._current_version = 0
+        self._item_positions: Dict[int, List[int]] = {}
+        self._event_positions: Dict[UUID, int] = {}
+        self._type_positions: Dict[MutationType, List[int]] = {}
+        self._max_timestamps: List[datetime] = []
+        self._load()
+        self._segment_bases = [seg.base_version for seg in self._segments]
+
+        self._durable_version = self._current_version
+        self._file = open(self._segments[-1].path, "ab")
+
+    # --- LedgerStore -----------------------------------------------------
+
+    def append(self, event: LedgerEvent) -> None:
+        if not isinstance(event, LedgerEvent):
+            raise TypeError("Only LedgerEvent instances can be appended.")
+
+        # Everything derived from the event is computed before taking the lock.
+        record = self._frame(encode_event(event), 0)
+        keys = [(event.event_id, event.mutation_type, self._utc(event.timestamp), self._item_id(event))]
+
+        with self._write_lock:
+            # Optimistic Locking Check
+            if event.expected_version is not None:
+                if event.expected_version != self._current_version:
+                    raise ConcurrencyError(
+                        f"Version mismatch: Expected {event.expected_version}, but ledger is at {self._current_version}"
+                    )
+            self._check_unique([event], self._event_positions)
+            self._commit([record], keys)
+            written_version = self._current_version
+
+        self._wait_durable(written_version)
+        self._notify(written_version)
+
+    def append_many(self, events: Sequence[LedgerEvent], expected_version: Optional[int] = None) -> None:
+        events = list(events)
+        for event in events:
+            if not isinstance(event, LedgerEvent):
+                raise TypeError("Only LedgerEvent instances can be appended.")
+        records = [self._frame(encode_event(event), len(events) - i - 1) for i, event in enumerate(events)]
+        keys = [(event.event_id, event.mutation_type, self._utc(event.timestamp), self._item_id(event)) for event in events]
+
+        with self._write_lock:
+            self._check_batch(events, self._current_version, expected_version)
+            self._check_unique(events, self._event_positions)
+            if not records:
+                return
+            self._commit(records, keys)
+            written_version = self._current_version
+
+        self._wait_durable(written_version)
+        self._notify(written_version)
+
+    def get_stream(self, from_version: int = 0, to_version: Optional[int] = None) -> Iterator[LedgerEvent]:
+        # Capture the committed extent now; later appends are not visible.
+        with self._write_lock:
+            if to_version is None or to_version > self._current_version:
+                to_version = self._current_version
+            extents = []
+            for seg in self._segments:
+                seg_end_version = seg.base_version + len(seg.offsets)
+                if seg_end_version <= from_version or seg.base_version >= to_version:
+                    continue
+                first = max(from_version, seg.base_version) - seg.base_version
+                last = min(to_version, seg_end_version) - seg.base_version
+                end = seg.offsets[last] if last < len(seg.offsets) else seg.size
+                extents.append((seg.path, seg.offsets[first], end))
+        return self._iter_extents(extents)
+
+    def get_item_stream(self, item: ItemIdentity) -> Iterator[LedgerEvent]:
+        with self._write_lock:
+            locations = [self._locate(p) for p in self._item_positions.get(ITEM_REGISTRY.get(item), [])]
+        return self._iter_locations(locations)
+
+    def last_modified_version(self, item: ItemIdentity) -> Optional[int]:
+        with self._write_lock:
+            positions = self._item_positions.get(ITEM_REGISTRY.get(item))
+            return positions[-1] + 1 if positions else None
+
+    def get_event(self, event_id: Union[UUID, str]) -> Optional[LedgerEvent]:
+        with self._write_lock:
+            position = self._event_positions.get(self._event_key(event_id))
+            if position is None:
+                return None
+            location = self._locate(position)
+        return list(self._iter_locations([location]))[0]
+
+    def get_event_version(self, event_id: Union[UUID, str]) -> Optional[int]:
+        with self._write_lock:
+            position = self._event_positions.get(self._event_key(event_id))
+        return position + 1 if position is not None else None
+
+    def latest_of_type(self, mutation_type: MutationType, max_version: Optional[int] = None) -> Optional[LedgerEvent]:
+        with self._write_lock:
+            limit = self._current_version if max_version is None else min(max_version, self._current_version)
+            positions = self._type_positions.get(mutation_type, [])
+            index = bisect_left(positions, limit)
+            if not index:
+                return None
+            location = self._locate(positions[index - 1])
+        return list(self._iter_locations([location]))[0]
+
+    def version_at(self, timestamp: datetime) -> int:
+        with self._write_lock:
+            return bisect_right(self._max_timestamps, self._utc(timestamp))
+
+    def snapshot(self) -> List[LedgerEvent]:
+        return list(self.get_stream())
+
+    @property
+    def version(self) -> int:
+        return self._current_version
+
+    # --- Lifecycle -------------------------------------------------------
+
+    def close(self) -> None:
+        with self._write_lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            if self._sync:
+                os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __enter__(self) -> "FileLedgerStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # --- Internals -------------------------------------------------------
+
+    def _segment_path(self, base_version: int) -> Path:
+        return self._dir / f"{base_version:020d}{self.SEGMENT_SUFFIX}"
+
+    def _load(self) -> None:
+        paths = sorted(self._dir.glob(f"*{self.SEGMENT_SUFFIX}"))
+        if not paths:
+            self._segments.append(_Segment(0, self._segment_path(0)))
+            self._segment_path(0).touch()
+            return
+
+        for index, path in enumerate(paths):
+            base_version = int(path.stem)
+            if base_version != self._current_version:
+                raise LedgerCorruptionError(
+                    f"Segment {path.name} starts at version {base_version}, expected {self._current_version}"
+                )
+            segment = _Segment(base_version, path)
+            is_last = index == len(paths) - 1
+            self._scan_segment(segment, truncate_torn_tail=is_last)
+            self._segments.append(segment)
+            self._index_segment(segment)
+            self._current_version += len(segment.offsets)
+
+    def _index_segment(self, segment: _Segment) -> None:
+        # Only plain JSON parsing here; full model validation is deferred to reads.
+        if not segment.offsets:
+            return
+        header_size = self._HEADER.size
+        keys = []
+        with open(segment.path, "rb") as f, mmap.mmap(f.fileno(), segment.size, access=mmap.ACCESS_READ) as mm:
+            for offset in segment.offsets:
+                length, _, _ = self._HEADER.unpack_from(mm, offset)
+                raw = json.loads(mm[offset + header_size:offset + header_size + length])
+                item = (raw.get("payload") or {}).get("item")
+                item_id = ITEM_REGISTRY.intern_key(item["name"], item.get("variant"), item.get("brand")) if item else None
+                timestamp = self._utc(datetime.fromisoformat(raw["timestamp"].replace("Z", "+00:00")))
+                keys.append((UUID(raw["event_id"]), MutationType(raw["mutation_type"]), timestamp, item_id))
+        self._index_keys(keys, self._running_max(self._max_timestamps, [key[2] for key in keys]))
+
+    def _commit(self, records: List[bytes], keys: List[Tuple[UUID, MutationType, datetime, Optional[int]]]) -> None:
+        # Caller holds the write lock. Index entries are built first, then the
+        # records are written; indexes and version only move once the write succeeded.
+        maxima = self._running_max(self._max_timestamps, [key[2] for key in keys])
+        self._write_records(records)
+        self._index_keys(keys, maxima)
+        self._current_version += len(records)
+
+    def _index_keys(self, keys: List[Tuple[UUID, MutationType, datetime, Optional[int]]], maxima: List[datetime]) -> None:
+        # Caller holds the write lock (or is loading); keys belong to the next positions.
+        self._max_timestamps.extend(maxima)
+        for position, (event_id, mutation_type, _, item_id) in enumerate(keys, start=self._current_version):
+            self._event_positions.setdefault(event_id, position)
+            self._type_positions.setdefault(mutation_type, []).append(position)
+            if item_id is not None:
+                self._item_positions.setdefault(item_id, []).append(position)
+
+    def _locate(self, position: int) -> Tuple[Path, int]:
+        # Caller holds the write lock.
+        segment = self._segments[bisect_right(self._segment_bases, position) - 1]
+        return segment.path, segment.offsets[position - segment.base_version]
+
+    def _scan_segment(self, segment: _Segment, truncate_torn_tail: bool) -> None:
+        file_size = segment.path.stat().st_size
+        if file_size == 0:
+            return
+
+        header_size = self._HEADER.size
+        pos = 0
+        # Records of the batch currently being scanned; only kept once the batch is complete.
+        pending: List[int] = []
+        with open(segment.path, "rb") as f, mmap.mmap(f.fileno(), file_size, access=mmap.ACCESS_READ) as mm:
+            while pos < file_size:
+                valid = pos + header_size <= file_size
+                if valid:
+                    length, remaining, crc = self._HEADER.unpack_from(mm, pos)
+                    end = pos + header_size + length
+                    valid = end <= file_size and self._checksum(remaining, mm[pos + header_size:end]) == crc
+                if not valid:
+                    break
+                pending.append(pos)
+                pos = end
+                if remaining == 0:
+                    segment.offsets.extend(pending)
+                    pending = []
+
+        if pending:
+            # Batch cut short: none of it counts.
+            pos = pending[0]
+
+        if pos < file_size:
+            if not truncate_torn_tail:
+                raise LedgerCorruptionError(f"Corrupt record in {segment.path.name} at offset {pos}")
+            # Crash during the last write: drop the partial record.
+            with open(segment.path, "r+b") as f:
+                f.truncate(pos)
+                f.flush()
+                os.fsync(f.fileno())
+        segment.size = pos
+
+    @classmethod
+    def _checksum(cls, remaining: int, data: bytes) -> int:
+        return zlib.crc32(data, zlib.crc32(remaining.to_bytes(4, "little")))
+
+    @classmethod
+    def _frame(cls, data: bytes, remaining: int) -> bytes:
+        return cls._HEADER.pack(len(data), remaining, cls._checksum(remaining, data)) + data
+
+    def _write_records(self, records: List[bytes]) -> None:
+        # Caller holds the write lock. A batch is never split across segments,
+        # so a segment may exceed the size limit by up to one batch.
+        batch_size = sum(len(r) for r in records)
+        segment = self._segments[-1]
+        if segment.size and segment.size + batch_size > self._segment_max_bytes:
+            segment = self._roll()
+
+        try:
+            self._file.write(b"".join(records))
+            self._file.flush()
+        except BaseException:
+            # Do not leave a partial batch behind a failed write.
+            self._file.truncate(segment.size)
+            raise
+
+        for record in records:
+            segment.offsets.append(segment.size)
+            segment.size += len(record)
+
+    def _roll(self) -> _Segment:
+        # Seal the active segment durably before opening the next one.
+        self._file.flush()
+        if self._sync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+        segment = _Segment(self._current_version, self._segment_path(self._current_version))
+        self._file = open(segment.path, "ab")
+        self._segments.append(segment)
+        self._segment_bases.append(segment.base_version)
+        if self._sync:
+            self._fsync_directory()
+        return segment
+
+    def _fsync_directory(self) -> None:
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self._dir, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _wait_durable(self, version: int) -> None:
+        """
+        Group commit: returns once `version` is on disk. The first waiter to
+        find no sync in flight becomes the leader and fsyncs everything
+        written so far; the rest block until a sync covers them.
+        """
+        if not self._sync:
+            return
+
+        with self._sync_cond:
+            while self._durable_version < version and self._syncing:
+                self._sync_cond.wait()
+            if self._durable_version >= version:
+                return
+            self._syncing = True
+
+        synced_version = None
+        try:
+            with self._write_lock:
+                synced_version = self._current_version
+                # dup() keeps the descriptor valid even if a roll closes the file meanwhile.
+                fd = os.dup(self._file.fileno())
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        finally:
+            with self._sync_cond:
+                self._syncing = False
+                if synced_version is not None:
+                    self._durable_version = max(self._durable_version, synced_version)
+                self._sync_cond.notify_all()
+
+    def _iter_extents(self, extents: List[Tuple[Path, int, int]]) -> Iterator[LedgerEvent]:
+        header_size = self._HEADER.size
+        for path, start, end in extents:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), end, access=mmap.ACCESS_READ) as mm:
+                pos = start
+                while pos < end:
+                    length, _, _ = self._HEADER.unpack_from(mm, pos)
+                    payload = pos + header_size
+                    yield decode_event(mm[payload:payload + length])
+                    pos = payload + length
+
+    def _iter_locations(self, locations: List[Tuple[Path, int]]) -> Iterator[LedgerEvent]:
+        header_size = self._HEADER.size
+        current_path, f, mm = None, None, None
+        try:
+            for path, offset in locations:
+                if path != current_path:
+                    if mm is not None:
+                        mm.close()
+                        f.close()
+                    current_path = path
+                    f = open(path, "rb")
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                length, _, _ = self._HEADER.unpack_from(mm, offset)
+                yield decode_event(mm[offset + header_size:offset + header_size + length])
+        finally:
+            if mm is not None:
+                mm.close()
+                f.close()
@@ -1,6 +1,15 @@
+import logging
 from abc import ABC, abstractmethod
-from typing import List, Iterator
+from datetime import datetime, timezone
+from typing import Callable, Container, List, Iterator, Optional, Sequence, Tuple, Union
+from uuid import UUID
 from ..events.types import LedgerEvent
+from ...contracts.inventory import ItemIdentity
+from ...contracts.mutation import MutationType
+from ...identity.registry import ITEM_REGISTRY
+from ...exceptions import ConcurrencyError, DuplicateEventError
+
+logger = logging.getLogger("dwbs.ledger.store")
 
 class LedgerStore(ABC):
     """
@@ -8,18 +17,82 @@ class LedgerStore(ABC):
     Interface for the append-only event store.
     """
 
+    # Called with the new ledger version after each committed append.
+    _listeners: Tuple[Callable[[int], None], ...] = ()
+
     @abstractmethod
     def append(self, event: LedgerEvent) -> None:
         """
         Appends a new event to the ledger.
         Must enforce append-only logic (no overwrites).
+        Raises DuplicateEventError if the event_id is already in the ledger.
         """
         pass
 
     @abstractmethod
-    def get_stream(self) -> Iterator[LedgerEvent]:
+    def append_many(self, events: Sequence[LedgerEvent], expected_version: Optional[int] = None) -> None:
+        """
+        Appends a batch of events atomically: either all are committed or none.
+        One concurrency check and one durable write for the whole batch.
+        :param expected_version: Required ledger version before the batch, if given.
+        Events carrying their own expected_version must match their position in the batch.
+        Raises DuplicateEventError if an event_id is already in the ledger or repeated in the batch.
+        """
+        pass
+
+    @abstractmethod
+    def get_stream(self, from_version: int = 0, to_version: Optional[int] = None) -> Iterator[LedgerEvent]:
         """
         Returns an iterator over the event stream chronologically.
+        Optionally sliced to the events that moved the ledger from
+        `from_version` up to `to_version` (defaults to the current version).
+        """
+        pass
+
+    @abstractmethod
+    def get_item_stream(self, item: ItemIdentity) -> Iterator[LedgerEvent]:
+        """
+        Returns the events concerning `item` (matched on name, variant, brand)
+        in ledger order. Cost is proportional to that item's events only.
+        """
+        pass
+
+    @abstractmethod
+    def last_modified_version(self, item: ItemIdentity) -> Optional[int]:
+        """
+        Returns the ledger version produced by the latest event touching `item`,
+        or None if the item never appears.
+        """
+        pass
+
+    @abstractmethod
+    def get_event(self, event_id: Union[UUID, str]) -> Optional[LedgerEvent]:
+        """
+        Returns the event with this id in O(1), or None if it is not in the ledger.
+        """
+        pass
+
+    @abstractmethod
+    def get_event_version(self, event_id: Union[UUID, str]) -> Optional[int]:
+        """
+        Returns the ledger version produced by the event with this id, or None.
+        """
+        pass
+
+    @abstractmethod
+    def latest_of_type(self, mutation_type: MutationType, max_version: Optional[int] = None) -> Optional[LedgerEvent]:
+        """
+        Returns the most recent event of the given type among the first
+        `max_version` events (default: the whole ledger), or None.
+        """
+        pass
+
+    @abstractmethod
+    def version_at(self, timestamp: datetime) -> int:
+        """
+        Ledger version as of `timestamp`: the length of the longest prefix of
+        the ledger whose events all happened at or before it. Stays well
+        defined when timestamps are not perfectly ordered.
         """
         pass
 
@@ -29,3 +102,109 @@ class LedgerStore(ABC):
         Returns a point-in-time copy of the full event log.
         """
         pass
+
+    @property
+    @abstractmethod
+    def version(self) -> int:
+        """
+        Number of events committed so far. Used for optimistic locking.
+        """
+        pass
+
+    def subscribe(self, listener: Callable[[int], None]) -> None:
+        """
+        Registers a callback invoked with the new version after every commit.
+        Callbacks run on the appending thread, after the write is durable.
+        Exceptions raised by a callback are logged and swallowed.
+        """
+        self._listeners = self._listeners + (listener,)
+
+    def unsubscribe(self, listener: Callable[[int], None]) -> None:
+        self._listeners = tuple(l for l in self._listeners if l != listener)
+
+    def _notify(self, version: int) -> None:
+        # The events are already committed: a failing listener is logged, never raised
+        # to the appender, and does not keep the other listeners from running.
+        for listener in self._listeners:
+            try:
+                listener(version)
+            except Exception:
+                logger.exception("Ledger listener %r failed at version %d", listener, version)
+
+    @staticmethod
+    def _item_key(event: LedgerEvent) -> Optional[str]:
+        """
+        Key used by the per-item index, or None for events without an item.
+        """
+        payload = getattr(event, "payload", None)
+        item = getattr(payload, "item", None)
+        return item.key() if item is not None else None
+
+    @staticmethod
+    def _item_id(event: LedgerEvent) -> Optional[int]:
+        """
+        Registry id used by in-process per-item indexes, or None for events without an item.
+        """
+        payload = getattr(event, "payload", None)
+        item = getattr(payload, "item", None)
+        return ITEM_REGISTRY.intern(item) if item is not None else None
+
+    @staticmethod
+    def _utc(timestamp: datetime) -> datetime:
+        """
+        Naive UTC form of a timestamp, so that naive and aware timestamps compare.
+        Naive timestamps are taken as local time, which is what datetime.now() gives.
+        """
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def _running_max(previous: List[datetime], timestamps: Sequence[datetime]) -> List[datetime]:
+        """
+        Running maximum of `timestamps` (already in _utc form), continuing from the last entry of `previous`.
+        """
+        latest = previous[-1] if previous else None
+        maxima = []
+        for timestamp in timestamps:
+            latest = timestamp if latest is None or timestamp > latest else latest
+            maxima.append(latest)
+        return maxima
+
+    @staticmethod
+    def _event_key(event_id: Union[UUID, str]) -> Optional[UUID]:
+        """
+        Normalizes ids given as strings; malformed ids simply match nothing.
+        """
+        if isinstance(event_id, UUID):
+            return event_id
+        try:
+            return UUID(str(event_id))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _check_unique(events: Sequence[LedgerEvent], known: Container[UUID]) -> None:
+        """
+        Rejects events whose event_id is in `known` or repeated in the batch. Call with the write lock held.
+        """
+        seen = set()
+        for event in events:
+            if event.event_id in known or event.event_id in seen:
+                raise DuplicateEventError(f"Event {event.event_id} is already in the ledger")
+            seen.add(event.event_id)
+
+    @staticmethod
+    def _check_batch(events: Sequence[LedgerEvent], current_version: int, expected_version: Optional[int]) -> None:
+        """
+        Shared validation for append_many. Call with the write lock held.
+        """
+        if expected_version is not None and expected_version != current_version:
+            raise ConcurrencyError(
+                f"Version mismatch: Expected {expected_version}, but ledger is at {current_version}"
+            )
+        for offset, event in enumerate(events):
+            if not isinstance(event, LedgerEvent):
+                raise TypeError("Only LedgerEvent instances can be appended.")
+            if event.expected_version is not None and event.expected_version != current_version + offset:
+                raise ConcurrencyError(
+                    f"Version mismatch: Expected {event.expected_version}, but ledger is at {current_version + offset}"
+                )
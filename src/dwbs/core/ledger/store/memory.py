@@ -1,40 +1,204 @@
-from typing import List, Iterator
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Iterator, Optional, Sequence, Tuple, Union, overload
+from uuid import UUID
 from .interface import LedgerStore
 from ..events.types import LedgerEvent
+from ...contracts.inventory import ItemIdentity
+from ...contracts.mutation import MutationType
+from ...identity.registry import ITEM_REGISTRY
 from ...exceptions import ConcurrencyError
 
+CHUNK_SIZE = 1024
+
+class LedgerView(Sequence[LedgerEvent]):
+    """
+    Immutable view of the ledger at a fixed version.
+
+    Sealed chunks are tuples shared between views. The open tail list is only
+    ever appended to, so a view reads it up to its own length and never sees
+    later events. Creating a view copies nothing.
+    """
+    __slots__ = ("_chunks", "_tail", "_length")
+
+    def __init__(self, chunks: Tuple[Tuple[LedgerEvent, ...], ...], tail: List[LedgerEvent], length: int):
+        self._chunks = chunks
+        self._tail = tail
+        self._length = length
+
+    @property
+    def version(self) -> int:
+        return self._length
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> LedgerEvent: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[LedgerEvent]: ...
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return list(self)[index]
+            return list(self.iter_range(start, stop))
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ledger index out of range")
+        sealed = len(self._chunks) * CHUNK_SIZE
+        if index < sealed:
+            return self._chunks[index // CHUNK_SIZE][index % CHUNK_SIZE]
+        return self._tail[index - sealed]
+
+    def __iter__(self) -> Iterator[LedgerEvent]:
+        return self.iter_range(0, self._length)
+
+    def iter_range(self, start: int, stop: int) -> Iterator[LedgerEvent]:
+        """
+        Iterates positions [start, stop), skipping whole chunks outside the range.
+        """
+        start = max(start, 0)
+        stop = min(stop, self._length)
+        sealed = len(self._chunks) * CHUNK_SIZE
+        for chunk_index in range(start // CHUNK_SIZE, min(len(self._chunks), -(-stop // CHUNK_SIZE))):
+            chunk_start = chunk_index * CHUNK_SIZE
+            chunk = self._chunks[chunk_index]
+            yield from islice(chunk, max(start - chunk_start, 0), min(stop - chunk_start, CHUNK_SIZE))
+        if stop > sealed:
+            yield from islice(self._tail, max(start - sealed, 0), stop - sealed)
+
 class InMemoryLedgerStore(LedgerStore):
     """
     D1.1 Event-Sourcing Lite
     In-memory implementation of the LedgerStore.
+
+    Writers are serialized by a lock; each commit publishes a new LedgerView.
+    Readers only take the current view, so they never block or copy.
+    A per-item index maps registry item ids to the sorted positions of their events,
+    an event-id index maps each event_id to its position, a type index
+    lists the positions of each mutation type, and a running maximum of
+    event timestamps (in UTC, sorted by construction) answers version_at by bisection.
     """
     def __init__(self):
-        self._events: List[LedgerEvent] = []
-        self._current_version: int = 0
+        self._write_lock = threading.Lock()
+        self._view = LedgerView((), [], 0)
+        self._item_positions: Dict[int, List[int]] = {}
+        self._event_positions: Dict[UUID, int] = {}
+        self._type_positions: Dict[MutationType, List[int]] = {}
+        self._max_timestamps: List[datetime] = []
 
     def append(self, event: LedgerEvent) -> None:
         if not isinstance(event, LedgerEvent):
             raise TypeError("Only LedgerEvent instances can be appended.")
 
-        # Optimistic Locking Check
-        if event.expected_version is not None:
-            if event.expected_version != self._current_version:
-                raise ConcurrencyError(
-                    f"Version mismatch: Expected {event.expected_version}, but ledger is at {self._current_version}"
-                )
+        with self._write_lock:
+            current_version = self._view.version
+
+            # Optimistic Locking Check
+            if event.expected_version is not None:
+                if event.expected_version != current_version:
+                    raise ConcurrencyError(
+                        f"Version mismatch: Expected {event.expected_version}, but ledger is at {current_version}"
+                    )
+
+            self._check_unique([event], self._event_positions)
+            # Strictly append-only.
+            self._publish([event])
+            version = self._view.version
+
+        self._notify(version)
+
+    def append_many(self, events: Sequence[LedgerEvent], expected_version: Optional[int] = None) -> None:
+        events = list(events)
+        with self._write_lock:
+            self._check_batch(events, self._view.version, expected_version)
+            self._check_unique(events, self._event_positions)
+            self._publish(events)
+            version = self._view.version
+
+        if events:
+            self._notify(version)
+
+    def get_stream(self, from_version: int = 0, to_version: Optional[int] = None) -> Iterator[LedgerEvent]:
+        # Iterate a fixed view so concurrent appends are not observed mid-stream
+        view = self._view
+        return view.iter_range(from_version, len(view) if to_version is None else to_version)
+
+    def get_item_stream(self, item: ItemIdentity) -> Iterator[LedgerEvent]:
+        view = self._view
+        positions = self._visible_positions(item, view)
+        return (view[p] for p in positions)
 
-        # Strictly append-only.
-        self._events.append(event)
-        self._current_version += 1
+    def last_modified_version(self, item: ItemIdentity) -> Optional[int]:
+        positions = self._item_positions.get(ITEM_REGISTRY.get(item), [])
+        visible = bisect_left(positions, self._view.version)
+        return positions[visible - 1] + 1 if visible else None
 
-    def get_stream(self) -> Iterator[LedgerEvent]:
-        # Return iterator to prevent modification of the list
-        return iter(self._events)
+    def get_event(self, event_id: Union[UUID, str]) -> Optional[LedgerEvent]:
+        view = self._view
+        position = self._event_position(event_id, view)
+        return view[position] if position is not None else None
+
+    def get_event_version(self, event_id: Union[UUID, str]) -> Optional[int]:
+        position = self._event_position(event_id, self._view)
+        return position + 1 if position is not None else None
+
+    def latest_of_type(self, mutation_type: MutationType, max_version: Optional[int] = None) -> Optional[LedgerEvent]:
+        view = self._view
+        limit = len(view) if max_version is None else min(max_version, len(view))
+        positions = self._type_positions.get(mutation_type, [])
+        index = bisect_left(positions, limit)
+        return view[positions[index - 1]] if index else None
+
+    def version_at(self, timestamp: datetime) -> int:
+        return min(bisect_right(self._max_timestamps, self._utc(timestamp)), self._view.version)
 
     def snapshot(self) -> List[LedgerEvent]:
         # Return a shallow copy of the list
-        return list(self._events)
+        return list(self._view)
+
+    def view(self) -> LedgerView:
+        """
+        O(1) immutable snapshot at the current version.
+        """
+        return self._view
 
     @property
     def version(self) -> int:
-        return self._current_version
+        return self._view.version
+
+    def _visible_positions(self, item: ItemIdentity, view: LedgerView) -> List[int]:
+        # Index lists may already hold positions of a commit not yet published; cut at the view.
+        positions = self._item_positions.get(ITEM_REGISTRY.get(item), [])
+        return positions[:bisect_left(positions, len(view))]
+
+    def _event_position(self, event_id: Union[UUID, str], view: LedgerView) -> Optional[int]:
+        position = self._event_positions.get(self._event_key(event_id))
+        if position is None or position >= len(view):
+            return None
+        return position
+
+    def _publish(self, events: List[LedgerEvent]) -> None:
+        # Caller holds the write lock. Existing views keep their own length, so
+        # appending to the shared tail is invisible to them.
+        # Derived keys are computed first, so a failure leaves the indexes untouched.
+        view = self._view
+        chunks, tail = view._chunks, view._tail
+        item_ids = [self._item_id(event) for event in events]
+        self._max_timestamps.extend(self._running_max(self._max_timestamps, [self._utc(event.timestamp) for event in events]))
+        for position, (event, item_id) in enumerate(zip(events, item_ids), start=view.version):
+            if item_id is not None:
+                self._item_positions.setdefault(item_id, []).append(position)
+            self._event_positions.setdefault(event.event_id, position)
+            self._type_positions.setdefault(event.mutation_type, []).append(position)
+            tail.append(event)
+            if len(tail) == CHUNK_SIZE:
+                chunks = chunks + (tuple(tail),)
+                tail = []
+        self._view = LedgerView(chunks, tail, view.version + len(events))
@@ -0,0 +1,275 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import List, Iterator, Optional, Sequence, Tuple, Union
+from uuid import UUID
+from .interface import LedgerStore
+from .codec import encode_event, decode_event
+from ..events.types import LedgerEvent
+from ...contracts.inventory import ItemIdentity
+from ...contracts.mutation import MutationType
+from ...exceptions import ConcurrencyError, DuplicateEventError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    version INTEGER PRIMARY KEY,
+    event_id TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    actor TEXT NOT NULL,
+    mutation_type TEXT NOT NULL,
+    item_key TEXT,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_actor ON events(actor);
+CREATE INDEX IF NOT EXISTS idx_events_mutation_type ON events(mutation_type, version);
+CREATE INDEX IF NOT EXISTS idx_events_item_key ON events(item_key, version);
+"""
+
+def _format_timestamp(ts: datetime) -> str:
+    # Naive UTC in a fixed-width ISO format, so that string order equals time
+    # order whatever the time zone (or lack of one) of the original timestamp.
+    return LedgerStore._utc(ts).isoformat(timespec="microseconds")
+
+def _to_row(event: LedgerEvent) -> Tuple:
+    return (
+        str(event.event_id),
+        _format_timestamp(event.timestamp),
+        event.actor,
+        event.mutation_type.value,
+        LedgerStore._item_key(event),
+        encode_event(event),
+    )
+
+_INSERT = (
+    "INSERT INTO events (version, event_id, timestamp, actor, mutation_type, item_key, body) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+class SqliteLedgerStore(LedgerStore):
+    """
+    D1.1 Event-Sourcing Lite
+    LedgerStore persisted in a SQLite database running in WAL mode.
+
+    Row `version` is the ledger version produced by the event (1-based), so
+    the events after version v are exactly the rows with version > v.
+    Indexed columns (timestamp, actor, mutation_type, item_key) allow slices
+    to be read without decoding the rest of the log. Readers use pooled
+    connections and never block the single writer connection.
+    """
+
+    def __init__(self, path: Union[str, Path], reader_pool_size: int = 4, sync: bool = True):
+        """
+        :param path: Database file. Must be a real file: WAL readers need shared storage.
+        :param reader_pool_size: Idle reader connections kept for reuse.
+        :param sync: Commit with synchronous=FULL, so an append is durable when it returns.
+            False uses NORMAL: faster, but the last commits can be lost on power failure.
+        """
+        self._path = str(path)
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute(f"PRAGMA synchronous={'FULL' if sync else 'NORMAL'}")
+        self._writer.executescript(_SCHEMA)
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=reader_pool_size)
+
+    # --- LedgerStore -----------------------------------------------------
+
+    def append(self, event: LedgerEvent) -> None:
+        if not isinstance(event, LedgerEvent):
+            raise TypeError("Only LedgerEvent instances can be appended.")
+
+        row = _to_row(event)
+
+        with self._write_transaction() as cur:
+            current_version = cur.execute("SELECT COALESCE(MAX(version), 0) FROM events").fetchone()[0]
+
+            # Optimistic Locking Check
+            if event.expected_version is not None and event.expected_version != current_version:
+                raise ConcurrencyError(
+                    f"Version mismatch: Expected {event.expected_version}, but ledger is at {current_version}"
+                )
+
+            self._insert(cur, [(current_version + 1,) + row])
+
+        self._notify(current_version + 1)
+
+    def append_many(self, events: Sequence[LedgerEvent], expected_version: Optional[int] = None) -> None:
+        events = list(events)
+        for event in events:
+            if not isinstance(event, LedgerEvent):
+                raise TypeError("Only LedgerEvent instances can be appended.")
+        rows = [_to_row(event) for event in events]
+
+        with self._write_transaction() as cur:
+            current_version = cur.execute("SELECT COALESCE(MAX(version), 0) FROM events").fetchone()[0]
+            self._check_batch(events, current_version, expected_version)
+            self._check_unique(events, ())
+            self._insert(cur, [(current_version + i + 1,) + row for i, row in enumerate(rows)])
+
+        if rows:
+            self._notify(current_version + len(rows))
+
+    def get_stream(self, from_version: int = 0, to_version: Optional[int] = None) -> Iterator[LedgerEvent]:
+        return self.query(from_version=from_version, to_version=to_version)
+
+    def get_item_stream(self, item: ItemIdentity) -> Iterator[LedgerEvent]:
+        return self.query(item=item)
+
+    def last_modified_version(self, item: ItemIdentity) -> Optional[int]:
+        with self._reader() as conn:
+            return conn.execute("SELECT MAX(version) FROM events WHERE item_key = ?", (item.key(),)).fetchone()[0]
+
+    def get_event(self, event_id: Union[UUID, str]) -> Optional[LedgerEvent]:
+        key = self._event_key(event_id)
+        if key is None:
+            return None
+        with self._reader() as conn:
+            row = conn.execute("SELECT body FROM events WHERE event_id = ?", (str(key),)).fetchone()
+        return decode_event(row[0]) if row else None
+
+    def get_event_version(self, event_id: Union[UUID, str]) -> Optional[int]:
+        key = self._event_key(event_id)
+        if key is None:
+            return None
+        with self._reader() as conn:
+            row = conn.execute("SELECT version FROM events WHERE event_id = ?", (str(key),)).fetchone()
+        return row[0] if row else None
+
+    def latest_of_type(self, mutation_type: MutationType, max_version: Optional[int] = None) -> Optional[LedgerEvent]:
+        sql = "SELECT body FROM events WHERE mutation_type = ?"
+        params: list = [mutation_type.value]
+        if max_version is not None:
+            sql += " AND version <= ?"
+            params.append(max_version)
+        with self._reader() as conn:
+            row = conn.execute(sql + " ORDER BY version DESC LIMIT 1", params).fetchone()
+        return decode_event(row[0]) if row else None
+
+    def version_at(self, timestamp: datetime) -> int:
+        # The first event later than `timestamp` ends the prefix.
+        with self._reader() as conn:
+            first_after, current = conn.execute(
+                "SELECT (SELECT MIN(version) FROM events WHERE timestamp > ?), COALESCE(MAX(version), 0) FROM events",
+                (_format_timestamp(timestamp),)
+            ).fetchone()
+        return current if first_after is None else first_after - 1
+
+    def snapshot(self) -> List[LedgerEvent]:
+        return list(self.get_stream())
+
+    @property
+    def version(self) -> int:
+        with self._reader() as conn:
+            return conn.execute("SELECT COALESCE(MAX(version), 0) FROM events").fetchone()[0]
+
+    # --- Indexed reads ---------------------------------------------------
+
+    def query(
+        self,
+        from_version: int = 0,
+        to_version: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        actor: Optional[str] = None,
+        mutation_type: Optional[MutationType] = None,
+        item: Optional[ItemIdentity] = None,
+    ) -> Iterator[LedgerEvent]:
+        """
+        Returns matching events in ledger order. All filters are optional and combined with AND.
+        - from_version / to_version: same slice semantics as get_stream.
+        - since / until: inclusive timestamp window.
+        """
+        clauses = ["version > ?"]
+        params: list = [from_version]
+        if to_version is not None:
+            clauses.append("version <= ?")
+            params.append(to_version)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_format_timestamp(since))
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(_format_timestamp(until))
+        if actor is not None:
+            clauses.append("actor = ?")
+            params.append(actor)
+        if mutation_type is not None:
+            clauses.append("mutation_type = ?")
+            params.append(mutation_type.value)
+        if item is not None:
+            clauses.append("item_key = ?")
+            params.append(item.key())
+
+        sql = f"SELECT body FROM events WHERE {' AND '.join(clauses)} ORDER BY version"
+        return self._iter_bodies(sql, params)
+
+    # --- Lifecycle -------------------------------------------------------
+
+    def close(self) -> None:
+        with self._write_lock:
+            self._writer.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self) -> "SqliteLedgerStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # --- Internals -------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; transactions are managed explicitly.
+        return sqlite3.connect(self._path, isolation_level=None, check_same_thread=False)
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Cursor]:
+        with self._write_lock:
+            cur = self._writer.cursor()
+            # IMMEDIATE takes the write lock up front, so the version check
+            # and the inserts happen atomically even across processes.
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                yield cur
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+            cur.execute("COMMIT")
+
+    @staticmethod
+    def _insert(cur: sqlite3.Cursor, rows: List[Tuple]) -> None:
+        # The UNIQUE index on event_id enforces the duplicate check against stored events.
+        try:
+            cur.executemany(_INSERT, rows)
+        except sqlite3.IntegrityError as e:
+            if "event_id" not in str(e):
+                raise
+            raise DuplicateEventError("Event id is already in the ledger") from e
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _iter_bodies(self, sql: str, params: list) -> Iterator[LedgerEvent]:
+        # A single SELECT reads one WAL snapshot, so concurrent appends are not seen mid-iteration.
+        with self._reader() as conn:
+            for (body,) in conn.execute(sql, params):
+                yield decode_event(body)
@@ -1,8 +1,173 @@
-from typing import Dict, List, Optional
-from ...contracts.inventory import InventoryState, ItemIdentity, Quantity
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from ...contracts.inventory import InventoryState, InventoryItem, ItemIdentity, Quantity
+from ...units.fixed import FixedQuantity
+from ...identity.registry import ITEM_REGISTRY
 from .recipe import Recipe
 from ..graph.substitution import SubstitutionGraph
 
+class SubstituteReach:
+    """
+    D2.1 Ingredient Substitution Graph
+    Required item id -> the in-stock items that can fill it, as (item id,
+    min total penalty), cheapest first; the item itself comes first at 0.0.
+
+    Built by walking substitution edges backwards from each in-stock item, so
+    the cost follows the inventory (tens of items) rather than the forward
+    substitute fan-out of every ingredient. Items missing here cannot be
+    satisfied from stock at all.
+    """
+    __slots__ = ("_fillers", "_graph")
+
+    def __init__(self, in_stock, substitution_graph: Optional[SubstitutionGraph] = None):
+        self._graph = substitution_graph
+        fillers: Dict[int, List[Tuple[int, float]]] = {}
+        for stock_id in in_stock:
+            for required_id, penalty in self._required(stock_id):
+                fillers.setdefault(required_id, []).append((stock_id, penalty))
+        for required_id, entries in fillers.items():
+            entries.sort(key=lambda entry: (entry[1], entry[0] != required_id))
+        self._fillers = fillers
+
+    def add(self, stock_id: int) -> List[int]:
+        """
+        Registers a newly in-stock item. Returns the required ids it can now fill.
+        """
+        touched = []
+        for required_id, penalty in self._required(stock_id):
+            entries = self._fillers.setdefault(required_id, [])
+            if any(filler == stock_id for filler, _ in entries):
+                continue
+            entries.append((stock_id, penalty))
+            entries.sort(key=lambda entry: (entry[1], entry[0] != required_id))
+            touched.append(required_id)
+        return touched
+
+    def discard(self, stock_id: int) -> List[int]:
+        """
+        Removes an item that went out of stock. Returns the required ids it filled.
+        """
+        touched = []
+        for required_id, _ in self._required(stock_id):
+            entries = self._fillers.get(required_id)
+            if not entries:
+                continue
+            kept = [entry for entry in entries if entry[0] != stock_id]
+            if len(kept) == len(entries):
+                continue
+            if kept:
+                self._fillers[required_id] = kept
+            else:
+                del self._fillers[required_id]
+            touched.append(required_id)
+        return touched
+
+    def _required(self, stock_id: int) -> List[Tuple[int, float]]:
+        # The item itself, then everything it can stand in for.
+        required = [(stock_id, 0.0)]
+        if self._graph:
+            required.extend(self._graph.get_required_ids(stock_id))
+        return required
+
+    def fillers(self, required_id: int) -> Sequence[Tuple[int, float]]:
+        """
+        In-stock items that can fill required_id (itself or a substitute), cheapest first.
+        """
+        return self._fillers.get(required_id, ())
+
+    def best_penalty(self, required_id: int) -> Optional[float]:
+        """
+        Lowest penalty at which required_id can be filled from stock, ignoring quantities.
+        """
+        entries = self._fillers.get(required_id)
+        return entries[0][1] if entries else None
+
+    def __contains__(self, required_id: int) -> bool:
+        return required_id in self._fillers
+
+    def __len__(self) -> int:
+        return len(self._fillers)
+
+class InventoryIndex:
+    """
+    D2 Recipe Knowledge Graph
+    Inventory indexed once per request: in-stock items grouped by registry
+    item id, plus the aggregated stock per id (built on first use).
+    Scoring a whole catalog against one index avoids re-walking
+    InventoryState.items for every recipe.
+    """
+    __slots__ = ("items", "_stock", "_reach")
+
+    def __init__(self, items: Dict[int, List[InventoryItem]]):
+        self.items = items
+        self._stock: Optional[Dict[int, FixedQuantity]] = None
+        self._reach: Optional[Tuple[Optional[SubstitutionGraph], SubstituteReach]] = None
+
+    @classmethod
+    def build(cls, inventory: InventoryState) -> "InventoryIndex":
+        items: Dict[int, List[InventoryItem]] = {}
+        for inv_item in inventory.items:
+            if inv_item.is_in_stock():
+                items.setdefault(ITEM_REGISTRY.intern(inv_item.item), []).append(inv_item)
+        return cls(items)
+
+    @property
+    def stock(self) -> Dict[int, FixedQuantity]:
+        """
+        Total in-stock quantity per item id, in base units.
+        """
+        if self._stock is None:
+            self._stock = {key: _total(inv_items) for key, inv_items in self.items.items()}
+        return self._stock
+
+    def update(self, item_id: int, inv_items: List[InventoryItem]) -> None:
+        """
+        Replaces the inventory items of one id (all of them; out-of-stock ones are
+        dropped) and updates the stock total and any built SubstituteReach in place.
+        """
+        in_stock = [inv_item for inv_item in inv_items if inv_item.is_in_stock()]
+        was_in_stock = item_id in self.items
+        if in_stock:
+            self.items[item_id] = in_stock
+        else:
+            self.items.pop(item_id, None)
+
+        if self._stock is not None:
+            if in_stock:
+                self._stock[item_id] = _total(in_stock)
+            else:
+                self._stock.pop(item_id, None)
+        if self._reach is not None and was_in_stock != bool(in_stock):
+            reach = self._reach[1]
+            if in_stock:
+                reach.add(item_id)
+            else:
+                reach.discard(item_id)
+
+    def reach(self, substitution_graph: Optional[SubstitutionGraph] = None) -> SubstituteReach:
+        """
+        SubstituteReach of the in-stock items, computed once per index and graph.
+        """
+        if self._reach is None or self._reach[0] is not substitution_graph:
+            self._reach = (substitution_graph, SubstituteReach(self.items, substitution_graph))
+        return self._reach[1]
+
+def _total(inv_items: List[InventoryItem]) -> FixedQuantity:
+    total = None
+    for inv_item in inv_items:
+        quantity = FixedQuantity.from_quantity(inv_item.quantity)
+        if total is None:
+            total = quantity
+        else:
+            try:
+                total = total + quantity
+            except ValueError:
+                # Mixed units (e.g. Grams vs Pieces) for same item?
+                # Should not happen in well-formed inventory, but if it does, we keep separate?
+                # For Phase 1, we assume consistent units for same item.
+                pass
+    return total
+
 class FeasibilityChecker:
     """
     D2 Recipe Knowledge Graph
@@ -11,83 +176,81 @@ class FeasibilityChecker:
 
     def __init__(self, substitution_graph: Optional[SubstitutionGraph] = None):
         self.substitution_graph = substitution_graph
+        # (InventoryState, its version, index) of the last index_for call; the state is weakly held.
+        self._last_index: Optional[Tuple[weakref.ref, int, InventoryIndex]] = None
 
     def can_cook(self, recipe: Recipe, inventory: InventoryState) -> bool:
         """
         Returns True if all ingredients are present in sufficient quantity,
         considering substitutions if a graph is provided.
         """
-        # 1. Aggregate inventory stock
-        # Map: ItemIdentity -> Total Quantity
-        # Note: We need to handle units. We'll normalize everything to base units if possible,
-        # but Quantity contract only normalizes within same type (Weight/Volume).
-        # We'll assume strict unit matching or normalization for now.
+        return self.can_cook_indexed(recipe, self.index_for(inventory))
 
-        stock: Dict[str, Quantity] = {} # Keyed by full_name or hash of Identity
-
-        # Helper to key
-        def get_key(item_id: ItemIdentity) -> str:
-            # We use full_name as key for aggregation since ItemIdentity is value object
-            # But wait, ItemIdentity might differ in confidence.
-            # We strictly match name, variant, brand.
-            return f"{item_id.name}|{item_id.variant}|{item_id.brand}"
-
-        # We also need a way to store the Identity object for substitution lookups
-        item_map: Dict[str, ItemIdentity] = {}
-
-        for inv_item in inventory.items:
-            if not inv_item.is_in_stock():
-                continue
+    def index_for(self, inventory: InventoryState) -> InventoryIndex:
+        """
+        InventoryIndex of an inventory, reused while the same InventoryState at the
+        same version comes back, so its SubstituteReach is built once per inventory
+        version rather than once per call. Read-only: do not update() it.
+        """
+        last = self._last_index
+        if last is not None and last[0]() is inventory and last[1] == inventory.version:
+            return last[2]
+        index = InventoryIndex.build(inventory)
+        self._last_index = (weakref.ref(inventory), inventory.version, index)
+        return index
 
-            key = get_key(inv_item.item)
-            item_map[key] = inv_item.item
+    def can_cook_indexed(self, recipe: Recipe, index: InventoryIndex) -> bool:
+        """
+        Same as can_cook, against a prebuilt InventoryIndex.
+        """
+        # Stock is keyed by registry id: name, variant and brand must match, confidence is ignored.
+        # Quantities are normalized to base units; mixed units for one item keep the first.
+        stock = index.stock
+        # Exact item and every substitute in stock, found by one reverse walk per index.
+        reach = index.reach(self.substitution_graph)
 
-            if key not in stock:
-                stock[key] = inv_item.quantity
-            else:
-                try:
-                    stock[key] = stock[key] + inv_item.quantity
-                except ValueError:
-                    # Mixed units (e.g. Grams vs Pieces) for same item?
-                    # Should not happen in well-formed inventory, but if it does, we keep separate?
-                    # For Phase 1, we assume consistent units for same item.
-                    pass
-
-        # 2. Check each ingredient
         for ingredient in recipe.ingredients:
-            required_qty = ingredient.quantity
-            required_item = ingredient.item
-            required_key = get_key(required_item)
+            required_qty = FixedQuantity.from_quantity(ingredient.quantity)
+            required_key = ITEM_REGISTRY.intern(ingredient.item)
 
-            # Check if we have enough of the exact item
-            if self._has_sufficient_quantity(stock.get(required_key), required_qty):
-                continue
+            for filler_key, _ in reach.fillers(required_key):
+                if self._has_sufficient_quantity(stock.get(filler_key), required_qty):
+                    break
+            else:
+                # Missing ingredient
+                return False
 
-            # Not enough exact item. Check substitutions.
-            if self.substitution_graph:
-                substitutes = self.substitution_graph.get_substitutes(required_item)
-                found_substitute = False
-                for sub_item, penalty in substitutes:
-                    sub_key = get_key(sub_item)
-                    if self._has_sufficient_quantity(stock.get(sub_key), required_qty):
-                        found_substitute = True
-                        break
+        return True
 
-                if found_substitute:
-                    continue
+    def compile_matrix(self, recipes: List[Recipe]) -> "FeasibilityMatrix":
+        """
+        Compiles a catalog (with this checker's substitution graph) for can_cook_matrix.
+        Requires numpy.
+        """
+        from ..index.matrix import FeasibilityMatrix
+        return FeasibilityMatrix(recipes, self.substitution_graph)
 
-            # Missing ingredient
-            return False
+    def can_cook_matrix(self, matrix: "FeasibilityMatrix", inventory: Union[InventoryState, InventoryIndex]) -> List[bool]:
+        """
+        can_cook for every recipe of a compiled catalog, in catalog order, with one
+        vectorized pass. Amounts without an exact fixed-point form use the scalar check.
+        """
+        index = inventory if isinstance(inventory, InventoryIndex) else self.index_for(inventory)
+        feasible = matrix.evaluate(index.stock)
+        if feasible is None:
+            return [self.can_cook_indexed(recipe, index) for recipe in matrix.recipes]
 
-        return True
+        result = feasible.tolist()
+        for row in matrix.inexact_rows:
+            result[row] = self.can_cook_indexed(matrix.recipes[row], index)
+        return result
 
-    def _has_sufficient_quantity(self, available: Optional[Quantity], required: Quantity) -> bool:
-        if not available:
+    def _has_sufficient_quantity(self, available: Optional[FixedQuantity], required: FixedQuantity) -> bool:
+        if available is None:
             return False
 
-        # Try to compare. normalize() handles unit conversion (kg->g).
+        # Both sides are already in base units (kg->g), so this is an int comparison.
         try:
-             # We use < operator from Quantity which handles normalization
              if available < required:
                  return False
              return True
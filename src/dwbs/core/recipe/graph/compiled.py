@@ -0,0 +1,217 @@
+import heapq
+import itertools
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+from ...contracts.inventory import ItemIdentity
+from ...identity.registry import ITEM_REGISTRY, IdentityKey
+
+_MAGIC = b"DWBSCSR1"
+# Node count, edge count, byte length of the identity table.
+_HEADER = struct.Struct("<QQQ")
+
+class CompiledSubstitutionGraph:
+    """
+    D2.1 Ingredient Substitution Graph
+    Frozen, compact form of a SubstitutionGraph in CSR layout.
+
+    Nodes are numbered 0..n-1 locally. The substitutes of node v are
+    neighbors[offsets[v]:offsets[v + 1]] with the matching penalties, in the
+    order the rules were added. Queries take and return registry ids like
+    SubstitutionGraph, so both can be passed wherever a graph is read.
+
+    save() writes the arrays and the node identities to a binary file;
+    load() maps the arrays straight from that file and only interns the
+    identities, so startup does not rebuild the adjacency.
+    """
+
+    def __init__(self, offsets: Sequence[int], neighbors: Sequence[int], penalties: Sequence[float], keys: List[IdentityKey], source=None):
+        self._offsets = offsets
+        self._neighbors = neighbors
+        self._penalties = penalties
+        self._keys = keys # (name, variant, brand) per local node
+        # Local node -> registry id, and back.
+        self._ids = array("q", (ITEM_REGISTRY.intern_key(*key) for key in keys))
+        self._local: Dict[int, int] = {item_id: node for node, item_id in enumerate(self._ids)}
+        # Memoized closure per registry id; the graph never changes.
+        self._closure: Dict[int, Tuple[Tuple[int, float], ...]] = {}
+        self._source = source # Keeps a mapped file open while the views are in use
+        # Reverse CSR (substitute -> originals), built on first get_required_ids,
+        # and the memoized reverse walks over it.
+        self._reverse: Optional[Tuple[array, array, array]] = None
+        self._required: Dict[int, Tuple[Tuple[int, float], ...]] = {}
+
+    @classmethod
+    def from_graph(cls, graph) -> "CompiledSubstitutionGraph":
+        """
+        Compiles the current edges of a SubstitutionGraph.
+        """
+        items: Dict[int, ItemIdentity] = graph._items
+        local = {item_id: node for node, item_id in enumerate(items)}
+        offsets = array("q", [0])
+        neighbors = array("i")
+        penalties = array("d")
+        for item_id in items:
+            for sub_id, penalty in graph._adj.get(item_id, ()):
+                neighbors.append(local[sub_id])
+                penalties.append(penalty)
+            offsets.append(len(neighbors))
+        return cls(offsets, neighbors, penalties, [(item.name, item.variant, item.brand) for item in items.values()])
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._neighbors)
+
+    def get_substitutes(self, item: ItemIdentity) -> List[Tuple[ItemIdentity, float]]:
+        """
+        Returns all valid substitutes for the given item, including transitive ones.
+        Returns list of (SubstituteItem, TotalPenalty).
+        """
+        item_id = ITEM_REGISTRY.get(item)
+        if item_id is None:
+            return []
+        return [(ITEM_REGISTRY.identity(sub_id), penalty) for sub_id, penalty in self.get_substitute_ids(item_id)]
+
+    def get_substitute_ids(self, item_id: int) -> Sequence[Tuple[int, float]]:
+        """
+        Same as get_substitutes, over registry ids. Memoized; do not mutate the result.
+        """
+        cached = self._closure.get(item_id)
+        if cached is None:
+            node = self._local.get(item_id)
+            ids = self._ids
+            paths = self._shortest_paths(node) if node is not None else ()
+            cached = self._closure[item_id] = tuple((ids[sub], penalty) for sub, penalty in paths)
+        return cached
+
+    def get_required_ids(self, item_id: int) -> Sequence[Tuple[int, float]]:
+        """
+        Reverse of get_substitute_ids: every item that item_id can stand in for,
+        with the min total penalty. Memoized; do not mutate the result.
+        """
+        cached = self._required.get(item_id)
+        if cached is None:
+            node = self._local.get(item_id)
+            if node is not None and self._reverse is None:
+                self._reverse = self._transpose()
+            ids = self._ids
+            paths = self._shortest_paths(node, *self._reverse) if node is not None else ()
+            cached = self._required[item_id] = tuple((ids[original], penalty) for original, penalty in paths)
+        return cached
+
+    def closure(self) -> Dict[int, Sequence[Tuple[int, float]]]:
+        """
+        All-sources closure: every item with substitutes -> its substitutes by min penalty.
+        """
+        offsets = self._offsets
+        return {
+            self._ids[node]: self.get_substitute_ids(self._ids[node])
+            for node in range(len(self))
+            if offsets[node + 1] > offsets[node]
+        }
+
+    def _transpose(self) -> Tuple[array, array, array]:
+        # Counting sort of the edges by target node.
+        offsets, neighbors, penalties = self._offsets, self._neighbors, self._penalties
+        nodes = len(self)
+        counts = [0] * (nodes + 1)
+        for target in neighbors:
+            counts[target + 1] += 1
+        for node in range(nodes):
+            counts[node + 1] += counts[node]
+        reverse_offsets = array("q", counts)
+        sources = array("i", bytes(len(neighbors) * array("i").itemsize))
+        reverse_penalties = array("d", bytes(len(neighbors) * array("d").itemsize))
+        fill = counts[:-1]
+        for node in range(nodes):
+            for edge in range(offsets[node], offsets[node + 1]):
+                slot = fill[neighbors[edge]]
+                fill[neighbors[edge]] += 1
+                sources[slot] = node
+                reverse_penalties[slot] = penalties[edge]
+        return reverse_offsets, sources, reverse_penalties
+
+    def _shortest_paths(self, source: int, offsets=None, neighbors=None, penalties=None) -> List[Tuple[int, float]]:
+        # Same Dijkstra as SubstitutionGraph, over local node numbers (forward arrays by default).
+        if offsets is None:
+            offsets, neighbors, penalties = self._offsets, self._neighbors, self._penalties
+        counter = itertools.count()
+        pq = [(0.0, next(counter), source)]
+        min_penalties: Dict[int, float] = {source: 0.0}
+        substitutes = []
+
+        while pq:
+            current_penalty, _, current = heapq.heappop(pq)
+            if current_penalty > min_penalties.get(current, float('inf')):
+                continue
+            if current != source:
+                substitutes.append((current, current_penalty))
+
+            for edge in range(offsets[current], offsets[current + 1]):
+                neighbor = neighbors[edge]
+                new_penalty = current_penalty + penalties[edge]
+                if new_penalty < min_penalties.get(neighbor, float('inf')):
+                    min_penalties[neighbor] = new_penalty
+                    heapq.heappush(pq, (new_penalty, next(counter), neighbor))
+
+        return substitutes
+
+    def save(self, path: str) -> None:
+        """
+        Writes the graph to a binary file: header, offsets (int64),
+        penalties (float64), neighbors (int32), then the node identities as JSON.
+        Arrays are stored little-endian.
+        """
+        table = json.dumps(self._keys).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER.pack(len(self), self.edge_count, len(table)))
+            for typecode, values in (("q", self._offsets), ("d", self._penalties), ("i", self._neighbors)):
+                block = array(typecode, values)
+                if sys.byteorder != "little":
+                    block.byteswap()
+                f.write(block.tobytes())
+            f.write(table)
+
+    @classmethod
+    def load(cls, path: str, use_mmap: bool = True) -> "CompiledSubstitutionGraph":
+        """
+        Opens a file written by save(). With use_mmap the arrays are views
+        over the mapped file (pages are read on demand); otherwise they are copied.
+        """
+        with open(path, "rb") as f:
+            if use_mmap:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = f.read()
+
+        if bytes(data[:len(_MAGIC)]) != _MAGIC:
+            raise ValueError(f"Not a compiled substitution graph: {path}")
+        nodes, edges, table_size = _HEADER.unpack_from(data, len(_MAGIC))
+
+        position = len(_MAGIC) + _HEADER.size
+        view = memoryview(data)
+        blocks = []
+        for typecode, count in (("q", nodes + 1), ("d", edges), ("i", edges)):
+            size = count * array(typecode).itemsize
+            block = view[position:position + size]
+            position += size
+            if not use_mmap or sys.byteorder != "little":
+                copied = array(typecode)
+                copied.frombytes(block)
+                if sys.byteorder != "little":
+                    copied.byteswap()
+                blocks.append(copied)
+            else:
+                blocks.append(block.cast(typecode))
+
+        table = json.loads(bytes(view[position:position + table_size]).decode("utf-8"))
+        offsets, penalties, neighbors = blocks
+        source: Optional[object] = data if use_mmap else None
+        return cls(offsets, neighbors, penalties, [tuple(key) for key in table], source=source)
@@ -1,15 +1,50 @@
-from typing import Dict, List, Tuple, Set, Optional
+import heapq
+import itertools
+from typing import Callable, Dict, Iterable, List, Tuple, Set, Optional, Sequence
 from ...contracts.inventory import ItemIdentity
+from ...identity.registry import ITEM_REGISTRY
+from ...exceptions import SubstitutionCycleError
+from .compiled import CompiledSubstitutionGraph
+
+Edge = Tuple[ItemIdentity, ItemIdentity, float]
 
 class SubstitutionGraph:
     """
     D2.1 Ingredient Substitution Graph
     Manages a directed graph where edges represent valid substitutions.
     Edge (A -> B) means "If you need A, you can use B".
+    Nodes are item ids from the shared ItemRegistry.
+
+    Transitive substitutes are memoized per source. Adding or changing an
+    edge out of X drops exactly the cached sources that can reach X; the
+    reverse walks of get_required_ids are memoized the same way, per target.
+
+    The graph must stay acyclic. A topological order is maintained
+    incrementally (Pearce-Kelly), so a single insert only searches the nodes
+    between the two endpoints in that order; load_edges checks a whole batch
+    with one strongly-connected-components pass.
     """
     def __init__(self):
-        # Adjacency list: Item -> List of (Substitute, Penalty)
-        self._adj: Dict[ItemIdentity, List[Tuple[ItemIdentity, float]]] = {}
+        # Adjacency list: Item id -> List of (Substitute id, Penalty)
+        self._adj: Dict[int, List[Tuple[int, float]]] = {}
+        # Original id -> {substitute id: index in _adj[original]}, for O(1) duplicate checks
+        self._edge_index: Dict[int, Dict[int, int]] = {}
+        # Reverse adjacency: substitute id -> original ids
+        self._radj: Dict[int, Set[int]] = {}
+        # Topological position: for every edge A -> B, _order[A] < _order[B]
+        self._order: Dict[int, int] = {}
+        self._low = 0
+        self._high = 0
+        # Identities as they were added, returned by get_substitutes.
+        self._items: Dict[int, ItemIdentity] = {}
+        # Memoized closure: source id -> substitutes sorted by min total penalty
+        self._closure: Dict[int, Tuple[Tuple[int, float], ...]] = {}
+        # Node id -> cached sources whose closure passes through it (itself included)
+        self._dependents: Dict[int, Set[int]] = {}
+        # Same for get_required_ids: target id -> items it can stand in for,
+        # and node id -> cached targets whose reverse walk passes through it.
+        self._required: Dict[int, Tuple[Tuple[int, float], ...]] = {}
+        self._required_dependents: Dict[int, Set[int]] = {}
 
     def add_substitution(self, original: ItemIdentity, substitute: ItemIdentity, penalty: float):
         """
@@ -21,74 +56,278 @@ class SubstitutionGraph:
         if penalty < 0:
             raise ValueError("Penalty cannot be negative")
 
-        if original == substitute:
+        original_id = ITEM_REGISTRY.intern(original)
+        substitute_id = ITEM_REGISTRY.intern(substitute)
+        if original_id == substitute_id:
             return # No-op
 
         # Cycle detection: Check if adding Original -> Substitute creates a cycle
         # A cycle exists if there is already a path from Substitute -> Original
-        if self._path_exists(substitute, original):
-             raise ValueError(f"Cycle detected: {substitute.full_name()} already leads to {original.full_name()}")
+        if not self._reorder(original_id, substitute_id):
+            raise SubstitutionCycleError(
+                f"Cycle detected: {substitute.full_name()} already leads to {original.full_name()}",
+                [(original, substitute, penalty)]
+            )
 
-        if original not in self._adj:
-            self._adj[original] = []
+        self._insert(original_id, original, substitute_id, substitute, penalty)
 
-        # Check if already exists to update penalty? Or allow multiples?
-        # We'll just append for now, simpler. Or overwrite if exact match.
-        for i, (existing_sub, _) in enumerate(self._adj[original]):
-            if existing_sub == substitute:
-                # Update penalty
-                self._adj[original][i] = (substitute, penalty)
-                return
+    def load_edges(self, edges: Iterable[Edge]) -> int:
+        """
+        Adds many substitution rules at once: (original, substitute, penalty).
+
+        All-or-nothing: cycles are found with a single strongly-connected-components
+        pass over the graph plus the new edges, and if there are any, every new edge
+        that lies on a cycle is reported in SubstitutionCycleError.edges and nothing
+        is added. Returns the number of edges inserted or updated.
+        """
+        batch: Dict[Tuple[int, int], Edge] = {}
+        for original, substitute, penalty in edges:
+            if penalty < 0:
+                raise ValueError("Penalty cannot be negative")
+            original_id = ITEM_REGISTRY.intern(original)
+            substitute_id = ITEM_REGISTRY.intern(substitute)
+            if original_id != substitute_id:
+                # Later duplicates overwrite earlier ones, like repeated add_substitution calls.
+                batch[(original_id, substitute_id)] = (original, substitute, penalty)
 
-        self._adj[original].append((substitute, penalty))
+        successors: Dict[int, List[int]] = {node: [sub for sub, _ in subs] for node, subs in self._adj.items()}
+        for original_id, substitute_id in batch:
+            successors.setdefault(original_id, []).append(substitute_id)
+
+        components, emitted = _strongly_connected(successors)
+        offending = [edge for (original_id, substitute_id), edge in batch.items() if components[original_id] == components[substitute_id]]
+        if offending:
+            listed = ", ".join(f"{o.full_name()} -> {s.full_name()}" for o, s, _ in offending)
+            raise SubstitutionCycleError(f"Cycle detected in {len(offending)} edge(s): {listed}", offending)
+
+        changed = 0
+        for (original_id, substitute_id), (original, substitute, penalty) in batch.items():
+            changed += self._insert(original_id, original, substitute_id, substitute, penalty)
+
+        # Tarjan emits components sinks first; reversed, that is a topological order.
+        self._order = {node: position for position, node in enumerate(reversed(emitted))}
+        self._low, self._high = 0, len(emitted)
+        return changed
 
     def get_substitutes(self, item: ItemIdentity) -> List[Tuple[ItemIdentity, float]]:
         """
         Returns all valid substitutes for the given item, including transitive ones.
         Returns list of (SubstituteItem, TotalPenalty).
         """
-        substitutes = []
-        # Use Dijkstra-like approach to find shortest paths (min penalty)
-        import heapq
+        item_id = ITEM_REGISTRY.get(item)
+        if item_id is None:
+            return []
+        return [(self._items[sub_id], penalty) for sub_id, penalty in self.get_substitute_ids(item_id)]
 
-        # Priority queue: (penalty, item_wrapper)
-        # We need a wrapper because ItemIdentity comparison in tuple might fail if penalties equal?
-        # Actually Pydantic models are comparable.
+    def get_substitute_ids(self, item_id: int) -> Sequence[Tuple[int, float]]:
+        """
+        Same as get_substitutes, over registry ids. Memoized; do not mutate the result.
+        """
+        cached = self._closure.get(item_id)
+        if cached is None:
+            cached = self._closure[item_id] = tuple(self._shortest_paths(item_id))
+            _track(self._dependents, item_id, cached)
+        return cached
 
-        # We use a simple counter to break ties to avoid comparing items
-        import itertools
-        counter = itertools.count()
+    def get_required_ids(self, item_id: int) -> Sequence[Tuple[int, float]]:
+        """
+        Reverse of get_substitute_ids: every item that item_id can stand in for,
+        with the min total penalty, walking substitution edges backwards.
+        Memoized; do not mutate the result.
+        """
+        cached = self._required.get(item_id)
+        if cached is None:
+            adj, positions = self._adj, self._edge_index
+            cached = self._required[item_id] = tuple(_dijkstra(item_id, lambda node: (
+                (original, adj[original][positions[original][node]][1]) for original in self._radj.get(node, ())
+            )))
+            _track(self._required_dependents, item_id, cached)
+        return cached
+
+    def closure(self) -> Dict[int, Sequence[Tuple[int, float]]]:
+        """
+        All-sources closure: every item with substitutes -> its substitutes by min penalty.
+        """
+        return {item_id: self.get_substitute_ids(item_id) for item_id in list(self._adj)}
 
-        pq = [(0.0, next(counter), item)]
-        min_penalties: Dict[ItemIdentity, float] = {item: 0.0}
+    def compile(self) -> CompiledSubstitutionGraph:
+        """
+        Frozen CSR copy of the current edges, for large read-only graphs
+        (see CompiledSubstitutionGraph.save / load).
+        """
+        return CompiledSubstitutionGraph.from_graph(self)
 
-        while pq:
-            current_penalty, _, current_item = heapq.heappop(pq)
+    def _invalidate(self, original_id: int, substitute_id: int) -> None:
+        # Edge original -> substitute moved: only sources that reach the original
+        # see a different closure, and only targets the substitute reaches (itself
+        # included) a different reverse walk.
+        _drop(self._closure, self._dependents, original_id)
+        _drop(self._required, self._required_dependents, substitute_id)
 
-            if current_penalty > min_penalties.get(current_item, float('inf')):
-                continue
+    def _shortest_paths(self, item_id: int) -> List[Tuple[int, float]]:
+        return _dijkstra(item_id, lambda node: self._adj.get(node, ()))
 
-            if current_item != item:
-                substitutes.append((current_item, current_penalty))
+    def _insert(self, original_id: int, original: ItemIdentity, substitute_id: int, substitute: ItemIdentity, penalty: float) -> bool:
+        # Caller has checked for cycles. Returns True if the graph changed.
+        self._items.setdefault(original_id, original)
+        self._items.setdefault(substitute_id, substitute)
+        adj = self._adj.setdefault(original_id, [])
+        positions = self._edge_index.setdefault(original_id, {})
 
-            for neighbor, weight in self._adj.get(current_item, []):
-                new_penalty = current_penalty + weight
-                if new_penalty < min_penalties.get(neighbor, float('inf')):
-                    min_penalties[neighbor] = new_penalty
-                    heapq.heappush(pq, (new_penalty, next(counter), neighbor))
+        # Existing edge: update the penalty in place, keeping the edge order.
+        i = positions.get(substitute_id)
+        if i is not None:
+            if adj[i][1] == penalty:
+                return False
+            adj[i] = (substitute_id, penalty)
+        else:
+            positions[substitute_id] = len(adj)
+            adj.append((substitute_id, penalty))
+            self._radj.setdefault(substitute_id, set()).add(original_id)
+        self._invalidate(original_id, substitute_id)
+        return True
 
-        return substitutes
+    def _reorder(self, original_id: int, substitute_id: int) -> bool:
+        """
+        Pearce-Kelly insert of edge original -> substitute into the topological order.
+        Returns False (order untouched) if the edge would close a cycle.
+        """
+        order = self._order
+        # New nodes: an original without edges can go first, a substitute last.
+        if original_id not in order:
+            self._low -= 1
+            order[original_id] = self._low
+        if substitute_id not in order:
+            order[substitute_id] = self._high
+            self._high += 1
 
-    def _path_exists(self, start: ItemIdentity, end: ItemIdentity) -> bool:
-        visited = set()
-        stack = [start]
+        lower, upper = order[substitute_id], order[original_id]
+        if lower > upper:
+            return True
+
+        # Affected region: nodes ordered between substitute and original.
+        forward: List[int] = []
+        seen = {substitute_id}
+        stack = [substitute_id]
+        while stack:
+            node = stack.pop()
+            if node == original_id:
+                return False
+            forward.append(node)
+            for neighbor, _ in self._adj.get(node, ()):
+                if neighbor not in seen and order[neighbor] <= upper:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+
+        backward: List[int] = []
+        seen = {original_id}
+        stack = [original_id]
         while stack:
-            curr = stack.pop()
-            if curr == end:
-                return True
-            if curr in visited:
+            node = stack.pop()
+            backward.append(node)
+            for neighbor in self._radj.get(node, ()):
+                if neighbor not in seen and order[neighbor] >= lower:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+
+        # Everything that leads to original now precedes everything substitute leads to.
+        nodes = sorted(backward, key=order.__getitem__) + sorted(forward, key=order.__getitem__)
+        for node, position in zip(nodes, sorted(order[node] for node in nodes)):
+            order[node] = position
+        return True
+
+def _track(dependents: Dict[int, Set[int]], key: int, entries: Sequence[Tuple[int, float]]) -> None:
+    # Records that the cached walk from `key` passes through itself and every node in `entries`.
+    dependents.setdefault(key, set()).add(key)
+    for node, _ in entries:
+        dependents.setdefault(node, set()).add(key)
+
+def _drop(cache: Dict[int, Sequence[Tuple[int, float]]], dependents: Dict[int, Set[int]], changed: int) -> None:
+    # Evicts every cached walk that passes through `changed`, and its bookkeeping.
+    for key in dependents.pop(changed, ()):
+        for node, _ in cache.pop(key, ()):
+            nodes = dependents.get(node)
+            if nodes is not None:
+                nodes.discard(key)
+        if key != changed:
+            dependents.get(key, set()).discard(key)
+
+def _dijkstra(source: int, edges: Callable[[int], Iterable[Tuple[int, float]]]) -> List[Tuple[int, float]]:
+    """
+    Min total penalty from source to every reachable node (source excluded),
+    in order of increasing penalty. `edges(node)` yields (neighbor, penalty).
+    """
+    substitutes = []
+    # We use a simple counter to break ties to avoid comparing items
+    counter = itertools.count()
+
+    pq = [(0.0, next(counter), source)]
+    min_penalties: Dict[int, float] = {source: 0.0}
+
+    while pq:
+        current_penalty, _, current_item = heapq.heappop(pq)
+
+        if current_penalty > min_penalties.get(current_item, float('inf')):
+            continue
+
+        if current_item != source:
+            substitutes.append((current_item, current_penalty))
+
+        for neighbor, weight in edges(current_item):
+            new_penalty = current_penalty + weight
+            if new_penalty < min_penalties.get(neighbor, float('inf')):
+                min_penalties[neighbor] = new_penalty
+                heapq.heappush(pq, (new_penalty, next(counter), neighbor))
+
+    return substitutes
+
+def _strongly_connected(successors: Dict[int, List[int]]) -> Tuple[Dict[int, int], List[int]]:
+    """
+    Iterative Tarjan. Returns node -> component number and the nodes in the
+    order their components were completed (sinks first).
+    """
+    index: Dict[int, int] = {}
+    lowlink: Dict[int, int] = {}
+    on_stack: Set[int] = set()
+    stack: List[int] = []
+    components: Dict[int, int] = {}
+    emitted: List[int] = []
+    counter = 0
+
+    nodes = set(successors)
+    for targets in successors.values():
+        nodes.update(targets)
+
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, child = work.pop()
+            if child == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack.add(node)
+            targets = successors.get(node, ())
+            if child < len(targets):
+                work.append((node, child + 1))
+                target = targets[child]
+                if target not in index:
+                    work.append((target, 0))
+                elif target in on_stack:
+                    lowlink[node] = min(lowlink[node], index[target])
                 continue
-            visited.add(curr)
-            for neighbor, _ in self._adj.get(curr, []):
-                stack.append(neighbor)
-        return False
+            if lowlink[node] == index[node]:
+                component = len(emitted)
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    components[member] = component
+                    emitted.append(member)
+                    if member == node:
+                        break
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return components, emitted
@@ -0,0 +1,68 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..domain.recipe import Recipe
+from ..graph.substitution import SubstitutionGraph
+from ...identity.registry import ITEM_REGISTRY
+
+class RecipeCatalogIndex:
+    """
+    D2 Recipe Knowledge Graph
+    Inverted index from item id to the recipe ingredient slots it can fill:
+    the ingredient itself and every item that substitutes for it.
+
+    candidates() only walks the postings of the items given, so its cost
+    follows the inventory, not the catalog. A recipe is a candidate when each
+    of its ingredients can be filled by one of the items; every recipe
+    can_cook accepts is a candidate (quantities are left to the scorer).
+    Build a new index when the catalog or the substitution graph changes.
+    """
+
+    def __init__(self, recipes: Iterable[Recipe], substitution_graph: Optional[SubstitutionGraph] = None):
+        self._recipes: List[Recipe] = list(recipes)
+        self._postings: Dict[int, List[Tuple[int, int]]] = {} # item id -> (recipe position, ingredient slot)
+        self._slot_counts: List[int] = []
+        self._no_ingredients: List[int] = []
+
+        fillers_by_item: Dict[int, List[int]] = {}
+        for position, recipe in enumerate(self._recipes):
+            self._slot_counts.append(len(recipe.ingredients))
+            if not recipe.ingredients:
+                self._no_ingredients.append(position)
+            for slot, ingredient in enumerate(recipe.ingredients):
+                item_id = ITEM_REGISTRY.intern(ingredient.item)
+                fillers = fillers_by_item.get(item_id)
+                if fillers is None:
+                    fillers = fillers_by_item[item_id] = self._fillers(item_id, substitution_graph)
+                for filler in fillers:
+                    self._postings.setdefault(filler, []).append((position, slot))
+
+    @property
+    def recipes(self) -> List[Recipe]:
+        return self._recipes
+
+    def candidates(self, item_ids: Iterable[int]) -> List[Recipe]:
+        """
+        Recipes whose ingredients can all be filled by the given item ids
+        (typically the in-stock items), in catalog order.
+        """
+        filled: Dict[int, Set[int]] = {}
+        for item_id in set(item_ids):
+            for position, slot in self._postings.get(item_id, ()):
+                filled.setdefault(position, set()).add(slot)
+
+        positions = [p for p, slots in filled.items() if len(slots) == self._slot_counts[p]]
+        positions.extend(self._no_ingredients)
+        return [self._recipes[p] for p in sorted(positions)]
+
+    def dependents(self, item_ids: Iterable[int]) -> Set[int]:
+        """
+        Catalog positions of the recipes that use any of the items, directly or
+        as a substitute: the recipes whose feasibility or score can change with them.
+        """
+        return {position for item_id in item_ids for position, _ in self._postings.get(item_id, ())}
+
+    @staticmethod
+    def _fillers(item_id: int, substitution_graph: Optional[SubstitutionGraph]) -> List[int]:
+        fillers = [item_id]
+        if substitution_graph:
+            fillers.extend(sub_id for sub_id, _ in substitution_graph.get_substitute_ids(item_id))
+        return fillers
@@ -0,0 +1,98 @@
+from typing import Dict, Iterable, List, Optional
+from ..domain.recipe import Recipe
+from ..graph.substitution import SubstitutionGraph
+from ...contracts.inventory import Unit
+from ...identity.registry import ITEM_REGISTRY
+from ...units.fixed import FixedQuantity
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is the optional "fast" extra
+    np = None
+
+HAS_NUMPY = np is not None
+
+_UNIT_CODES: Dict[Unit, int] = {unit: code for code, unit in enumerate(Unit)}
+
+class FeasibilityMatrix:
+    """
+    D2 Recipe Knowledge Graph
+    A recipe catalog compiled into a sparse requirement matrix.
+
+    Each non-zero is one ingredient slot: (recipe row, item column, required
+    milli-base-units, base unit). Substitutes are extra (slot, item column)
+    pairs, taken from the graph at compile time. evaluate() checks every slot
+    against a stock vector in one vectorized pass, ORs in the substitute
+    columns and all-reduces per recipe. Recompile when the catalog or the
+    substitution graph changes.
+    """
+
+    def __init__(self, recipes: Iterable[Recipe], substitution_graph: Optional[SubstitutionGraph] = None):
+        if not HAS_NUMPY:
+            raise ImportError("FeasibilityMatrix requires numpy (install the 'fast' extra)")
+        self.recipes: List[Recipe] = list(recipes)
+
+        rows: List[int] = []
+        columns: List[int] = []
+        required: List[int] = []
+        units: List[int] = []
+        alt_slots: List[int] = []
+        alt_columns: List[int] = []
+        inexact = set()
+        substitutes: Dict[int, List[int]] = {}
+
+        for row, recipe in enumerate(self.recipes):
+            for ingredient in recipe.ingredients:
+                amount = FixedQuantity.from_quantity(ingredient.quantity)
+                if not amount.is_exact:
+                    # Left to the scalar check; this row is overwritten by the caller.
+                    inexact.add(row)
+                    continue
+                column = ITEM_REGISTRY.intern(ingredient.item)
+                slot = len(rows)
+                rows.append(row)
+                columns.append(column)
+                required.append(amount.milli)
+                units.append(_UNIT_CODES[amount.unit])
+
+                if substitution_graph:
+                    subs = substitutes.get(column)
+                    if subs is None:
+                        subs = substitutes[column] = [sub for sub, _ in substitution_graph.get_substitute_ids(column)]
+                    alt_slots.extend([slot] * len(subs))
+                    alt_columns.extend(subs)
+
+        self.inexact_rows: List[int] = sorted(inexact)
+        self._rows = np.array(rows, dtype=np.int64)
+        self._columns = np.array(columns, dtype=np.int64)
+        self._required = np.array(required, dtype=np.int64)
+        self._units = np.array(units, dtype=np.int8)
+        self._alt_slots = np.array(alt_slots, dtype=np.int64)
+        self._alt_columns = np.array(alt_columns, dtype=np.int64)
+        self._width = max(columns + alt_columns, default=-1) + 1
+
+    def evaluate(self, stock: Dict[int, FixedQuantity]) -> Optional["np.ndarray"]:
+        """
+        Boolean feasibility per recipe row for a stock map (item id -> base-unit total).
+        Returns None when a stock amount has no exact int form; rows listed in
+        inexact_rows are not meaningful and must be checked separately.
+        """
+        width = self._width
+        amounts = np.zeros(width + 1, dtype=np.int64)
+        stock_units = np.full(width + 1, -1, dtype=np.int8)
+        for item_id, quantity in stock.items():
+            if item_id >= width:
+                continue # No recipe uses it
+            if not quantity.is_exact:
+                return None
+            amounts[item_id] = quantity.milli
+            stock_units[item_id] = _UNIT_CODES[quantity.unit]
+
+        slot_ok = (stock_units[self._columns] == self._units) & (amounts[self._columns] >= self._required)
+        if len(self._alt_slots):
+            alt_required = self._required[self._alt_slots]
+            alt_ok = (stock_units[self._alt_columns] == self._units[self._alt_slots]) & (amounts[self._alt_columns] >= alt_required)
+            slot_ok |= np.bincount(self._alt_slots[alt_ok], minlength=len(slot_ok)).astype(bool)
+
+        missing = np.bincount(self._rows[~slot_ok], minlength=len(self.recipes))
+        return missing == 0
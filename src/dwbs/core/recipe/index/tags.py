@@ -0,0 +1,88 @@
+from typing import Dict, Iterable, List, Optional
+from ..domain.recipe import Recipe
+from ..tags.tags import RecipeTag
+
+class TagIndex:
+    """
+    D2.3 Cultural & Context Tags
+    Tag membership of a catalog compiled into bitsets.
+
+    Each tag gets a bit, so every recipe has an int tag mask. Each tag also
+    has a posting bitset (a Python int) with bit i set when recipe i carries
+    it. A required/excluded query is a few ANDs over the postings, then one
+    pass to read the set bits back as catalog positions. Build a new index
+    when the catalog changes.
+    """
+
+    def __init__(self, recipes: Iterable[Recipe]):
+        self._recipes: List[Recipe] = list(recipes)
+        self._bits: Dict[RecipeTag, int] = {tag: 1 << bit for bit, tag in enumerate(RecipeTag)}
+        self.masks: List[int] = []
+
+        # Postings are filled byte-wise, then turned into ints once (little-endian: bit i = recipe i).
+        size = (len(self._recipes) + 7) // 8
+        buffers: Dict[RecipeTag, bytearray] = {}
+        for position, recipe in enumerate(self._recipes):
+            mask = 0
+            for tag in recipe.tags:
+                bit = self._bits.get(tag)
+                if bit is None:
+                    bit = self._bits[tag] = 1 << len(self._bits)
+                if not mask & bit:
+                    mask |= bit
+                    buffer = buffers.get(tag)
+                    if buffer is None:
+                        buffer = buffers[tag] = bytearray(size)
+                    buffer[position >> 3] |= 1 << (position & 7)
+            self.masks.append(mask)
+        self._postings: Dict[RecipeTag, int] = {tag: int.from_bytes(buffer, "little") for tag, buffer in buffers.items()}
+        self._everything = (1 << len(self._recipes)) - 1
+
+    @property
+    def recipes(self) -> List[Recipe]:
+        return self._recipes
+
+    def mask(self, tags: Iterable[RecipeTag]) -> int:
+        """
+        Tag mask of a set of tags, in this index's bit layout (unknown tags have no bit).
+        """
+        mask = 0
+        for tag in tags:
+            mask |= self._bits.get(tag, 0)
+        return mask
+
+    def matching(self, required_tags: Optional[Iterable[RecipeTag]] = None, exclude_tags: Optional[Iterable[RecipeTag]] = None) -> int:
+        """
+        Bitset of the recipes that carry all required_tags and none of exclude_tags.
+        """
+        selected = self._everything
+        for tag in required_tags or ():
+            selected &= self._postings.get(tag, 0)
+            if not selected:
+                return 0
+        for tag in exclude_tags or ():
+            selected &= ~self._postings.get(tag, 0)
+        return selected
+
+    def positions(self, required_tags: Optional[Iterable[RecipeTag]] = None, exclude_tags: Optional[Iterable[RecipeTag]] = None) -> List[int]:
+        """
+        Catalog positions of the matching recipes, ascending.
+        """
+        # Bit i is character i of the reversed binary string.
+        bits = bin(self.matching(required_tags, exclude_tags))[:1:-1]
+        positions = []
+        position = bits.find("1")
+        while position != -1:
+            positions.append(position)
+            position = bits.find("1", position + 1)
+        return positions
+
+    def select(self, required_tags: Optional[Iterable[RecipeTag]] = None, exclude_tags: Optional[Iterable[RecipeTag]] = None) -> List[Recipe]:
+        """
+        Matching recipes, in catalog order.
+        """
+        recipes = self._recipes
+        return [recipes[position] for position in self.positions(required_tags, exclude_tags)]
+
+    def count(self, required_tags: Optional[Iterable[RecipeTag]] = None, exclude_tags: Optional[Iterable[RecipeTag]] = None) -> int:
+        return bin(self.matching(required_tags, exclude_tags)).count("1")
@@ -0,0 +1,342 @@
+import json
+import mmap
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from pydantic import Field
+from ...contracts.base import SystemContract
+from ...identity.registry import ITEM_REGISTRY
+from ..domain.recipe import Recipe
+from ..domain.metadata import Difficulty
+from ..tags.tags import RecipeTag
+from ..index.tags import TagIndex
+
+class RecipeSummary:
+    """
+    Light, unvalidated view of one stored recipe: what the indexes need,
+    without instructions or description. `ingredient_ids` are registry ids.
+    """
+    __slots__ = ("id", "name", "tags", "ingredient_ids", "difficulty", "total_minutes", "_offset", "_length")
+
+    def __init__(
+        self,
+        recipe_id: str,
+        name: str,
+        tags: List[RecipeTag],
+        ingredient_ids: Tuple[int, ...],
+        difficulty: Optional[Difficulty],
+        total_minutes: Optional[int],
+        offset: int,
+        length: int,
+    ):
+        self.id = recipe_id
+        self.name = name
+        self.tags = tags
+        self.ingredient_ids = ingredient_ids
+        self.difficulty = difficulty
+        self.total_minutes = total_minutes
+        self._offset = offset
+        self._length = length
+
+class RecipePage(SystemContract):
+    """
+    One page of a filtered catalog query.
+    """
+    recipes: List[Recipe]
+    total: int = Field(..., description="Recipes matching the filters, over all pages.")
+    offset: int
+    limit: int
+
+class RecipeRepository:
+    """
+    D2 Recipe Knowledge Graph
+    Recipe catalog persisted as JSON lines, one Recipe per line.
+
+    Opening the file reads every line once and keeps only a RecipeSummary
+    and its byte range; full Recipe models (with instructions and
+    description) are parsed and validated on demand from the mapped file.
+    In-memory indexes cover id, tags (TagIndex bitsets), ingredient item id,
+    difficulty and total time (prep + cook). Writes append a line; a recipe
+    saved again under the same id replaces the earlier line (and moves to
+    the end of storage order), which stays in the file until compact().
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        :param path: JSON lines file (created on first write if missing).
+        """
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._summaries: List[RecipeSummary] = []
+        self._by_id: Dict[str, int] = {}
+        self._map: Optional[mmap.mmap] = None
+        self._size = 0
+        self._indexes: Optional[_Indexes] = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, recipe_id: str) -> bool:
+        return recipe_id in self._by_id
+
+    def add(self, recipe: Recipe) -> None:
+        self.add_many([recipe])
+
+    def add_many(self, recipes: Iterable[Recipe]) -> None:
+        """
+        Appends recipes in one write. Ids already stored are replaced.
+        """
+        lines = [recipe.model_dump_json().encode("utf-8") + b"\n" for recipe in recipes]
+        if not lines:
+            return
+        with self._lock:
+            # A last line saved without its newline must not run into the first new one.
+            prefix = b"\n" if self._size and self._map[self._size - 1:self._size] != b"\n" else b""
+            with open(self._path, "ab") as f:
+                offset = f.tell() + len(prefix)
+                f.write(prefix + b"".join(lines))
+            for line in lines:
+                self._index_line(json.loads(line), offset, len(line) - 1)
+                offset += len(line)
+            self._remap()
+            self._indexes = None
+
+    def get(self, recipe_id: str) -> Optional[Recipe]:
+        """
+        Full recipe, parsed from disk, or None.
+        """
+        with self._lock:
+            position = self._by_id.get(recipe_id)
+            return self._read(position) if position is not None else None
+
+    def summary(self, recipe_id: str) -> Optional[RecipeSummary]:
+        position = self._by_id.get(recipe_id)
+        return self._summaries[position] if position is not None else None
+
+    def summaries(self, **filters) -> List[RecipeSummary]:
+        """
+        Summaries of the recipes matching query() filters, in storage order. Nothing is parsed.
+        """
+        with self._lock:
+            return [self._summaries[p] for p in self._select(**filters)]
+
+    def query(self, offset: int = 0, limit: int = 50, **filters) -> RecipePage:
+        """
+        One page of matching recipes, in storage order. Only the page is parsed.
+
+        Filters (all optional, combined with AND):
+        - tags / exclude_tags: must carry all / none of these RecipeTags.
+        - difficulty: one Difficulty or a collection of them.
+        - max_total_minutes: prep + cook at most this; recipes without times are excluded.
+        - uses: ItemIdentities (or registry ids) the recipe must all use.
+        - within: ItemIdentities (or registry ids) that cover every ingredient of the recipe.
+        - substitution_graph: lets `within` items also cover the ingredients they substitute for.
+
+        With the in-stock items as `within` and the scorer's substitution graph,
+        the result is what RecipeCatalogIndex.candidates returns: pass it as
+        `recipes` to ActionRecommender to score only those.
+        """
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must be non-negative")
+        with self._lock:
+            positions = self._select(**filters)
+            page = positions[offset:offset + limit]
+            recipes = [self._read(p) for p in page]
+        return RecipePage(recipes=recipes, total=len(positions), offset=offset, limit=limit)
+
+    def stream(self, batch_size: int = 256, **filters) -> Iterator[Recipe]:
+        """
+        Matching recipes, parsed batch_size at a time, in storage order.
+        Recipes added while streaming are not included. The matches are held by
+        id, so compact() may run meanwhile; a recipe replaced in between is read
+        in its latest version.
+        """
+        with self._lock:
+            recipe_ids = [self._summaries[p].id for p in self._select(**filters)]
+        for start in range(0, len(recipe_ids), batch_size):
+            with self._lock:
+                batch = [self._read(self._by_id[recipe_id]) for recipe_id in recipe_ids[start:start + batch_size]]
+            yield from batch
+
+    def compact(self) -> None:
+        """
+        Rewrites the file without replaced lines.
+        """
+        with self._lock:
+            live = sorted(self._by_id.values())
+            data = b"".join(self._raw(p) + b"\n" for p in live)
+            temp = self._path.with_suffix(self._path.suffix + ".tmp")
+            with open(temp, "wb") as f:
+                f.write(data)
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            temp.replace(self._path)
+            self._summaries = []
+            self._by_id = {}
+            self._indexes = None
+            self._load_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+    def _load(self) -> None:
+        with self._lock:
+            self._load_locked()
+
+    def _load_locked(self) -> None:
+        if not self._path.exists():
+            return
+        self._remap()
+        if self._map is None:
+            return
+        data = self._map
+        offset = 0
+        while offset < self._size:
+            end = data.find(b"\n", offset)
+            last = end == -1
+            if last:
+                end = self._size
+            if end > offset:
+                try:
+                    raw = json.loads(data[offset:end])
+                except ValueError:
+                    if not last:
+                        raise
+                    # Crash during the last write: drop the partial line.
+                    self._truncate(offset)
+                    return
+                self._index_line(raw, offset, end - offset)
+            offset = end + 1
+
+    def _truncate(self, size: int) -> None:
+        self._map.close()
+        self._map = None
+        with open(self._path, "r+b") as f:
+            f.truncate(size)
+        self._remap()
+
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._size = self._path.stat().st_size if self._path.exists() else 0
+        if self._size:
+            with open(self._path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _index_line(self, raw: dict, offset: int, length: int) -> None:
+        times = [raw.get("prep_time_minutes"), raw.get("cook_time_minutes")]
+        total = None if times == [None, None] else sum(t or 0 for t in times)
+        difficulty = raw.get("difficulty")
+        ingredient_ids = tuple(
+            ITEM_REGISTRY.intern_key(item["name"], item.get("variant"), item.get("brand"))
+            for item in (ingredient["item"] for ingredient in raw["ingredients"])
+        )
+        summary = RecipeSummary(
+            raw["id"],
+            raw["name"],
+            [RecipeTag(tag) for tag in raw.get("tags", ())],
+            ingredient_ids,
+            Difficulty(difficulty) if difficulty is not None else None,
+            total,
+            offset,
+            length,
+        )
+        self._by_id[summary.id] = len(self._summaries)
+        self._summaries.append(summary)
+
+    def _raw(self, position: int) -> bytes:
+        summary = self._summaries[position]
+        return self._map[summary._offset:summary._offset + summary._length]
+
+    def _read(self, position: int) -> Recipe:
+        return Recipe.model_validate_json(self._raw(position))
+
+    def _select(
+        self,
+        tags: Optional[Iterable[RecipeTag]] = None,
+        exclude_tags: Optional[Iterable[RecipeTag]] = None,
+        difficulty=None,
+        max_total_minutes: Optional[int] = None,
+        uses=None,
+        within=None,
+        substitution_graph=None,
+    ) -> List[int]:
+        if self._indexes is None:
+            self._indexes = _Indexes(self._summaries, self._by_id)
+        indexes = self._indexes
+
+        selected: Optional[Set[int]] = None
+        def narrow(positions: Iterable[int]) -> None:
+            nonlocal selected
+            selected = set(positions) if selected is None else selected.intersection(positions)
+
+        if tags or exclude_tags:
+            narrow(indexes.tags.positions(tags, exclude_tags))
+        if difficulty is not None:
+            levels = [difficulty] if isinstance(difficulty, Difficulty) else list(difficulty)
+            narrow(p for level in levels for p in indexes.by_difficulty.get(level, ()))
+        if max_total_minutes is not None:
+            narrow(indexes.by_time_positions[:bisect_right(indexes.by_time, max_total_minutes)])
+        for item_id in _item_ids(uses):
+            narrow(indexes.by_ingredient.get(item_id, ()))
+        if within is not None:
+            # Count, per recipe, the distinct ingredients covered by `within`.
+            available = set(_item_ids(within))
+            if substitution_graph is not None:
+                available.update(
+                    original for item_id in list(available) for original, _ in substitution_graph.get_required_ids(item_id)
+                )
+            covered: Dict[int, int] = {}
+            for item_id in available:
+                for p in indexes.by_ingredient.get(item_id, ()):
+                    covered[p] = covered.get(p, 0) + 1
+            matched = [p for p, count in covered.items() if count == indexes.distinct[p]]
+            matched.extend(indexes.no_ingredients)
+            narrow(matched)
+
+        if selected is None:
+            return list(indexes.live)
+        return sorted(p for p in selected if p in indexes.live_set)
+
+def _item_ids(items) -> List[int]:
+    if not items:
+        return []
+    return [item if isinstance(item, int) else ITEM_REGISTRY.intern(item) for item in items]
+
+class _Indexes:
+    """
+    Secondary indexes over the live (latest per id) summaries, rebuilt after writes.
+    """
+
+    def __init__(self, summaries: List[RecipeSummary], by_id: Dict[str, int]):
+        self.live: List[int] = sorted(by_id.values())
+        self.live_set: Set[int] = set(self.live)
+        # Tag bitsets are over all stored lines; replaced lines are filtered by live_set.
+        self.tags = TagIndex(summaries)
+        self.by_difficulty: Dict[Difficulty, List[int]] = {}
+        self.by_ingredient: Dict[int, List[int]] = {}
+        self.distinct: Dict[int, int] = {}
+        self.no_ingredients: List[int] = []
+        timed: List[Tuple[int, int]] = []
+        for p in self.live:
+            summary = summaries[p]
+            if summary.difficulty is not None:
+                self.by_difficulty.setdefault(summary.difficulty, []).append(p)
+            ingredient_ids = set(summary.ingredient_ids)
+            self.distinct[p] = len(ingredient_ids)
+            if not ingredient_ids:
+                self.no_ingredients.append(p)
+            for item_id in ingredient_ids:
+                self.by_ingredient.setdefault(item_id, []).append(p)
+            if summary.total_minutes is not None:
+                timed.append((summary.total_minutes, p))
+        timed.sort()
+        self.by_time: List[int] = [minutes for minutes, _ in timed]
+        self.by_time_positions: List[int] = [p for _, p in timed]
@@ -1,30 +1,33 @@
+from operator import is_
 from typing import List, Optional
 from ..domain.recipe import Recipe
+from ..index.tags import TagIndex
 from .tags import RecipeTag
 
-def filter_recipes(recipes: List[Recipe], required_tags: Optional[List[RecipeTag]] = None, exclude_tags: Optional[List[RecipeTag]] = None) -> List[Recipe]:
+def filter_recipes(
+    recipes: List[Recipe],
+    required_tags: Optional[List[RecipeTag]] = None,
+    exclude_tags: Optional[List[RecipeTag]] = None,
+    index: Optional[TagIndex] = None,
+) -> List[Recipe]:
     """
     Filters a list of recipes based on tags.
     - required_tags: Recipe must include ALL of these tags.
     - exclude_tags: Recipe must include NONE of these tags.
+    - index: TagIndex(recipes) built once by the caller. This is the fast path
+      when the same catalog is filtered repeatedly; without it every call
+      indexes the recipes again. Raises ValueError if it was built over other recipes.
     """
     if not required_tags and not exclude_tags:
         return recipes
 
-    result = []
-    for recipe in recipes:
-        recipe_tags = set(recipe.tags)
+    if index is None:
+        index = TagIndex(recipes)
+    elif not _same_recipes(index, recipes):
+        raise ValueError("index was built over a different list of recipes")
+    return index.select(required_tags, exclude_tags)
 
-        if required_tags:
-            # Check if all required tags are present
-            if not all(tag in recipe_tags for tag in required_tags):
-                continue
-
-        if exclude_tags:
-            # Check if any excluded tag is present
-            if any(tag in recipe_tags for tag in exclude_tags):
-                continue
-
-        result.append(recipe)
-
-    return result
+def _same_recipes(index: TagIndex, recipes: List[Recipe]) -> bool:
+    # Identity per element: cheap next to rebuilding, and catches edits to the list.
+    indexed = index.recipes
+    return indexed is recipes or (len(indexed) == len(recipes) and all(map(is_, indexed, recipes)))
@@ -0,0 +1,108 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional, Tuple, Union
+from ..contracts.inventory import Quantity, Unit
+
+# Milli-base-units per unit (mg, µl, 1/1000 piece) and the base unit they land in.
+MILLI = 1000
+_SCALES = {
+    Unit.KILOGRAM: (1000 * MILLI, Unit.GRAM),
+    Unit.LITER: (1000 * MILLI, Unit.MILLILITER),
+}
+
+Milli = Union[int, Decimal]
+
+@lru_cache(maxsize=4096)
+def to_milli(value: Decimal, unit: Unit) -> Tuple[Milli, Unit]:
+    """
+    Converts an amount to a count of milli-base-units. The count is an int
+    when the amount is a whole number of milli-units and the exact Decimal
+    product otherwise.
+    """
+    scale, base = _SCALES.get(unit, (MILLI, unit))
+    scaled = value * scale
+    if scaled == scaled.to_integral_value():
+        return int(scaled), base
+    return scaled, base
+
+def unit_scale(unit: Unit) -> int:
+    """Milli-base-units in one `unit`."""
+    return _SCALES.get(unit, (MILLI, unit))[0]
+
+class FixedQuantity:
+    """
+    D1.3 Quantity & Unit Normalization
+    Compact internal quantity for hot paths: a base unit (G, ML, PCS, ...)
+    and a count of milli-base-units.
+
+    Arithmetic and comparisons are plain int operations with no model
+    validation. Amounts finer than a milli-unit keep an exact Decimal count,
+    so results always equal the Quantity (Decimal) arithmetic. Convert at the
+    boundaries with from_quantity / to_quantity.
+    """
+    __slots__ = ("unit", "milli", "approx")
+
+    def __init__(self, unit: Unit, milli: Milli, approx: bool = False):
+        self.unit = unit
+        self.milli = milli
+        self.approx = approx
+
+    @classmethod
+    def from_quantity(cls, quantity: Quantity) -> "FixedQuantity":
+        milli, base = to_milli(quantity.value, quantity.unit)
+        return cls(base, milli, quantity.approx)
+
+    @property
+    def is_exact(self) -> bool:
+        """True when the count is a whole number of milli-base-units."""
+        return isinstance(self.milli, int)
+
+    def to_quantity(self, unit: Optional[Unit] = None) -> Quantity:
+        """
+        Public Quantity in the base unit, or in `unit` if it shares the base
+        unit (e.g. KG for a gram amount). Raises ValueError for negative amounts,
+        like the Quantity contract.
+        """
+        scale = MILLI
+        if unit is not None and unit != self.unit:
+            scale, base = _SCALES.get(unit, (MILLI, unit))
+            if base != self.unit:
+                raise ValueError(f"Cannot convert {self.unit} to {unit}")
+        else:
+            unit = self.unit
+        return Quantity(value=Decimal(self.milli) / scale, unit=unit, approx=self.approx)
+
+    def scaled(self, factor: Decimal) -> "FixedQuantity":
+        milli = self.milli * factor
+        if isinstance(milli, Decimal) and milli == milli.to_integral_value():
+            milli = int(milli)
+        return FixedQuantity(self.unit, milli, self.approx)
+
+    def __add__(self, other: "FixedQuantity") -> "FixedQuantity":
+        if self.unit != other.unit:
+            raise ValueError(f"Cannot add different units: {self.unit} and {other.unit}")
+        return FixedQuantity(self.unit, self.milli + other.milli, self.approx or other.approx)
+
+    def __sub__(self, other: "FixedQuantity") -> "FixedQuantity":
+        if self.unit != other.unit:
+            raise ValueError(f"Cannot subtract different units: {self.unit} and {other.unit}")
+        return FixedQuantity(self.unit, self.milli - other.milli, self.approx or other.approx)
+
+    def __neg__(self) -> "FixedQuantity":
+        return FixedQuantity(self.unit, -self.milli, self.approx)
+
+    def __lt__(self, other: "FixedQuantity") -> bool:
+        if self.unit != other.unit:
+            raise ValueError(f"Cannot compare different units: {self.unit} and {other.unit}")
+        return self.milli < other.milli
+
+    def __eq__(self, other: object) -> bool:
+        # Like Quantity.__eq__: approx does not take part in equality.
+        if not isinstance(other, FixedQuantity):
+            return NotImplemented
+        return self.unit == other.unit and self.milli == other.milli
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"FixedQuantity(unit={self.unit.value}, milli={self.milli}, approx={self.approx})"
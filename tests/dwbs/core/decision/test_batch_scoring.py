@@ -0,0 +1,132 @@
+import random
+from datetime import date, timedelta
+from unittest.mock import patch
+from dwbs.core.decision.scoring.scorer import RecipeScorer
+from dwbs.core.decision.explanation.generator import ExplanationGenerator
+from dwbs.core.decision.logic.recommender import ActionRecommender
+from dwbs.core.recipe.domain.feasibility import FeasibilityChecker, InventoryIndex
+from dwbs.core.recipe.domain.recipe import Recipe
+from dwbs.core.recipe.graph.substitution import SubstitutionGraph
+from dwbs.core.contracts.inventory import InventoryState, InventoryItem, ItemIdentity, Quantity, Unit
+import factories
+
+TODAY = date.today()
+NAMES = [f"Item{i}" for i in range(30)]
+
+def make_catalog(count, seed=5):
+    return factories.make_catalog(count, NAMES, seed, sizes=(1, 4), quantity=factories.grams(400))
+
+def make_inventory(seed=6):
+    rng = random.Random(seed)
+    items = []
+    for name in rng.sample(NAMES, 20):
+        items.append(InventoryItem(
+            item=ItemIdentity(name=name, confidence=rng.choice([0.5, 0.8, 1.0])),
+            quantity=Quantity(value=rng.randint(0, 1), unit=Unit.KILOGRAM),
+            expiry_date=TODAY + timedelta(days=rng.randint(-1, 5)) if rng.random() < 0.5 else None
+        ))
+    return InventoryState(items=items)
+
+def make_scorer():
+    graph = SubstitutionGraph()
+    for i in range(0, len(NAMES) - 1, 3):
+        graph.add_substitution(ItemIdentity(name=NAMES[i]), ItemIdentity(name=NAMES[i + 1]), 0.3)
+    return RecipeScorer(FeasibilityChecker(substitution_graph=graph))
+
+def test_score_batch_matches_score():
+    scorer = make_scorer()
+    recipes = make_catalog(300)
+    inventory = make_inventory()
+
+    expected = [scorer.score(r, inventory, today=TODAY) for r in recipes]
+    assert scorer.score_batch(recipes, inventory, today=TODAY) == expected
+    assert any(s > 0 for s in expected) and any(s == 0 for s in expected)
+
+def test_recommend_indexes_inventory_once():
+    scorer = make_scorer()
+    recommender = ActionRecommender(scorer, ExplanationGenerator(scorer))
+    recipes = make_catalog(200)
+    inventory = make_inventory()
+
+    with patch.object(InventoryIndex, "build", wraps=InventoryIndex.build) as build:
+        action = recommender.recommend(recipes, inventory)
+
+    assert build.call_count == 1
+    best = max(scorer.score(r, inventory) for r in recipes)
+    assert action.score == best
+
+def test_recommend_top_k_ranks_by_score_then_id():
+    scorer = make_scorer()
+    generator = ExplanationGenerator(scorer)
+    recommender = ActionRecommender(scorer, generator)
+    recipes = make_catalog(300)
+    inventory = make_inventory()
+
+    ranked = sorted(
+        ((scorer.score(r, inventory, today=TODAY), r.id) for r in recipes),
+        key=lambda entry: (-entry[0], entry[1])
+    )
+    expected = [(score, recipe_id) for score, recipe_id in ranked if score > 0]
+
+    with patch.object(generator, "generate_suggestion_explanation", wraps=generator.generate_suggestion_explanation) as explain:
+        top = recommender.recommend_top_k(recipes, inventory, 20, today=TODAY)
+    assert [(a.score, a.recipe.id) for a in top] == expected[:20]
+    assert explain.call_count == 20
+
+    everything = recommender.recommend_top_k(list(reversed(recipes)), inventory, 1000, today=TODAY)
+    assert [(a.score, a.recipe.id) for a in everything] == expected
+    assert recommender.recommend_top_k(recipes, inventory, 0) == []
+
+def test_recommend_top_k_stops_at_the_score_ceiling():
+    scorer = make_scorer()
+    recommender = ActionRecommender(scorer, ExplanationGenerator(scorer))
+    # Every item fully confident and nothing expiring: the ceiling is 1.0.
+    inventory = InventoryState(items=[
+        InventoryItem(item=ItemIdentity(name=name), quantity=Quantity(value=1, unit=Unit.KILOGRAM))
+        for name in NAMES
+    ])
+    recipes = make_catalog(1000)
+
+    with patch.object(scorer, "trace_batch", wraps=scorer.trace_batch) as trace_batch:
+        top = recommender.recommend_top_k(recipes, inventory, 3, today=TODAY)
+
+    assert [a.recipe.id for a in top] == sorted(r.id for r in recipes)[:3]
+    assert trace_batch.call_count == 1
+
+def test_recommend_top_k_ceiling_covers_recipes_without_ingredients():
+    scorer = make_scorer()
+    recommender = ActionRecommender(scorer, ExplanationGenerator(scorer))
+    # Everything in stock at 0.7, but a recipe without ingredients scores 1.0.
+    inventory = InventoryState(items=[
+        InventoryItem(item=ItemIdentity(name=name, confidence=0.7), quantity=Quantity(value=1, unit=Unit.KILOGRAM))
+        for name in NAMES
+    ])
+    recipes = make_catalog(70) + [Recipe(id="z", name="Water", ingredients=[], instructions=[])]
+
+    top = recommender.recommend_top_k(recipes, inventory, 1, today=TODAY)
+    best = recommender.recommend(recipes, inventory)
+
+    assert [a.recipe.id for a in top] == [best.recipe.id] == ["z"]
+    assert top[0].score == best.score == 1.0
+
+def test_explanations_from_traces_match_a_fresh_walk():
+    scorer = make_scorer()
+    generator = ExplanationGenerator(scorer)
+    recipes = make_catalog(300)
+    inventory = make_inventory()
+
+    traces = scorer.trace_batch(recipes, inventory, today=TODAY)
+    assert [t.score for t in traces] == scorer.score_batch(recipes, inventory, today=TODAY)
+    for recipe, trace in zip(recipes, traces):
+        if trace.score <= 0:
+            continue
+        assert len(trace.candidates) == len(recipe.ingredients)
+        assert generator.generate_suggestion_explanation(recipe, inventory, trace.score, today=TODAY, trace=trace) == \
+            generator.generate_suggestion_explanation(recipe, inventory, trace.score, today=TODAY)
+
+    # The recommender hands its trace over: no second walk over the ingredients.
+    recommender = ActionRecommender(scorer, generator)
+    with patch.object(scorer, "get_candidates", wraps=scorer.get_candidates) as get_candidates:
+        recommender.recommend(recipes, inventory)
+        recommender.recommend_top_k(recipes, inventory, 5)
+    assert get_candidates.call_count == 0
@@ -13,6 +13,7 @@ class TestDecisionDeterminism(unittest.TestCase):
         # Setup Component Chain
         feasibility_checker = Mock(spec=FeasibilityChecker)
         feasibility_checker.can_cook.return_value = True
+        feasibility_checker.can_cook_indexed.return_value = True
         feasibility_checker.substitution_graph = None
 
         scorer = RecipeScorer(feasibility_checker)
@@ -0,0 +1,93 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from dwbs.core.decision.logic.live import LiveRecommendationView
+from dwbs.core.decision.scoring.scorer import RecipeScorer
+from dwbs.core.recipe.domain.feasibility import FeasibilityChecker
+from dwbs.core.recipe.graph.substitution import SubstitutionGraph
+from dwbs.core.ingestion.manual.service import ManualEntryService
+from dwbs.core.ledger.store.memory import InMemoryLedgerStore
+from dwbs.core.contracts.inventory import InventoryState, InventoryItem, ItemIdentity, Quantity, Unit
+import factories
+from factories import consume
+
+TODAY = date.today()
+NAMES = [f"Live{i}" for i in range(24)]
+
+def make_scorer():
+    graph = SubstitutionGraph()
+    for i in range(0, len(NAMES) - 2, 4):
+        graph.add_substitution(ItemIdentity(name=NAMES[i]), ItemIdentity(name=NAMES[i + 1]), 0.3)
+        graph.add_substitution(ItemIdentity(name=NAMES[i + 1]), ItemIdentity(name=NAMES[i + 2]), 0.2)
+    return RecipeScorer(FeasibilityChecker(substitution_graph=graph))
+
+def make_catalog(count, rng):
+    return factories.make_catalog(count, NAMES, rng, id_format="r{:04d}")
+
+def expected_top(scorer, recipes, items, k):
+    inventory = InventoryState(items=items)
+    ranked = sorted((-scorer.score(r, inventory, today=TODAY), r.id) for r in recipes)
+    return [(recipe_id, -negated) for negated, recipe_id in ranked if negated < 0][:k]
+
+def test_live_view_tracks_the_ledger():
+    rng = random.Random(21)
+    scorer = make_scorer()
+    recipes = make_catalog(400, rng)
+    ledger = InMemoryLedgerStore()
+    view = LiveRecommendationView(scorer, recipes, InventoryState(), k=10, today=TODAY)
+    view.follow(ledger)
+    entry = ManualEntryService(ledger)
+    assert view.top() == []
+
+    # Reference inventory: item name -> lots in grams
+    lots = {}
+    for step in range(60):
+        name = rng.choice(NAMES)
+        if lots.get(name) and rng.random() < 0.4:
+            # Use up part of the stock; lots expiring first go first.
+            total = sum(grams for grams, _ in lots[name])
+            used = rng.randint(1, total)
+            ledger.append(consume(name, used))
+            remaining = []
+            for grams, expiry in sorted(lots[name], key=lambda lot: (lot[1] is None, lot[1] or date.max)):
+                taken = min(grams, used)
+                used -= taken
+                if grams > taken:
+                    remaining.append((grams - taken, expiry))
+            lots[name] = remaining
+        else:
+            grams = rng.randint(50, 400)
+            expiry = TODAY + timedelta(days=rng.randint(0, 6)) if rng.random() < 0.5 else None
+            entry.create_entry(ItemIdentity(name=name), Quantity(value=grams, unit=Unit.GRAM), expiry_date=expiry)
+            lots.setdefault(name, []).append((grams, expiry))
+
+        assert view.version == ledger.version == step + 1
+        items = [
+            InventoryItem(item=ItemIdentity(name=n), quantity=Quantity(value=grams, unit=Unit.GRAM), expiry_date=expiry)
+            for n, item_lots in lots.items() for grams, expiry in item_lots
+        ]
+        actual = [(recipe.id, score) for recipe, score in view.top()]
+        assert actual == expected_top(scorer, recipes, items, 10)
+
+    view.close()
+    entry.create_entry(ItemIdentity(name=NAMES[0]), Quantity(value=1, unit=Unit.KILOGRAM))
+    assert view.version == ledger.version - 1
+
+def test_event_rescores_only_dependent_recipes():
+    rng = random.Random(3)
+    scorer = make_scorer()
+    recipes = make_catalog(400, rng)
+    inventory = InventoryState(items=[
+        InventoryItem(item=ItemIdentity(name=name), quantity=Quantity(value=Decimal("0.5"), unit=Unit.KILOGRAM))
+        for name in NAMES[:12]
+    ])
+    view = LiveRecommendationView(scorer, recipes, inventory, k=5, today=TODAY)
+
+    # Live4 -> Live5 -> Live6: buying Live6 touches recipes using any of them.
+    users = {r.id for r in recipes if any(i.item.name in ("Live4", "Live5", "Live6") for i in r.ingredients)}
+    ledger = InMemoryLedgerStore()
+    event = ManualEntryService(ledger).create_entry(ItemIdentity(name="Live6"), Quantity(value=200, unit=Unit.GRAM))
+    assert view.apply(event) == len(users) < len(recipes)
+
+    items = inventory.items + [InventoryItem(item=ItemIdentity(name="Live6"), quantity=Quantity(value=200, unit=Unit.GRAM))]
+    assert [(r.id, s) for r, s in view.top(50)] == expected_top(scorer, recipes, items, 50)
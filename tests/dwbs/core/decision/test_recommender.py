@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import Mock, MagicMock
 from dwbs.core.decision.logic.recommender import ActionRecommender, SuggestRecipeAction, AskUserAction, NoAction
-from dwbs.core.decision.scoring.scorer import RecipeScorer
+from dwbs.core.decision.scoring.scorer import RecipeScorer, ScoreTrace
 from dwbs.core.decision.explanation.generator import ExplanationGenerator
 from dwbs.core.recipe.domain.recipe import Recipe
 from dwbs.core.contracts.inventory import InventoryState
@@ -12,6 +12,10 @@ class TestActionRecommender(unittest.TestCase):
         self.mock_scorer = Mock(spec=RecipeScorer)
         self.mock_explanation_generator = Mock(spec=ExplanationGenerator)
         self.recommender = ActionRecommender(self.mock_scorer, self.mock_explanation_generator)
+        # The recommender scores in one batch; route it through the per-recipe mock.
+        self.mock_scorer.trace_batch.side_effect = lambda recipes, inventory, today=None, index=None: [
+            ScoreTrace(self.mock_scorer.score(r, inventory), 1.0, []) for r in recipes
+        ]
 
         # Default mock explanation
         self.mock_explanation = Explanation(reason="Test", source_fact="Test", confidence=1.0)
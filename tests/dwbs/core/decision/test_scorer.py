@@ -4,13 +4,14 @@ from datetime import date
 from dwbs.core.decision.scoring.scorer import RecipeScorer
 from dwbs.core.recipe.domain.recipe import Recipe
 from dwbs.core.contracts.inventory import InventoryState, InventoryItem, ItemIdentity, StockStatus
-from dwbs.core.recipe.domain.feasibility import FeasibilityChecker
+from dwbs.core.recipe.domain.feasibility import FeasibilityChecker, InventoryIndex
 from dwbs.core.recipe.domain.ingredient import IngredientRef
 
 class TestRecipeScorer(unittest.TestCase):
     def setUp(self):
         self.mock_feasibility_checker = Mock(spec=FeasibilityChecker)
         self.mock_feasibility_checker.substitution_graph = None # Default no graph
+        self.mock_feasibility_checker.index_for.side_effect = InventoryIndex.build
         self.scorer = RecipeScorer(self.mock_feasibility_checker)
 
     def create_item_identity(self, name, confidence=1.0):
@@ -31,7 +32,7 @@ class TestRecipeScorer(unittest.TestCase):
 
     def test_score_feasible_high_confidence(self):
         # Setup
-        self.mock_feasibility_checker.can_cook.return_value = True
+        self.mock_feasibility_checker.can_cook_indexed.return_value = True
 
         # Recipe
         item_id = self.create_item_identity("Tomato")
@@ -55,7 +56,7 @@ class TestRecipeScorer(unittest.TestCase):
 
     def test_score_feasible_low_confidence(self):
         # Setup
-        self.mock_feasibility_checker.can_cook.return_value = True
+        self.mock_feasibility_checker.can_cook_indexed.return_value = True
 
         # Recipe
         item_id = self.create_item_identity("Tomato")
@@ -81,7 +82,7 @@ class TestRecipeScorer(unittest.TestCase):
         # Recipe needs Tomato and Onion
         # Tomato has conf 1.0, Onion has conf 0.4
 
-        self.mock_feasibility_checker.can_cook.return_value = True
+        self.mock_feasibility_checker.can_cook_indexed.return_value = True
 
         t_id = self.create_item_identity("Tomato")
         o_id = self.create_item_identity("Onion")
@@ -107,7 +108,7 @@ class TestRecipeScorer(unittest.TestCase):
         # Recipe needs Tomato. Inventory has Tomato(0.4) and Tomato(0.9).
         # Should pick 0.9.
 
-        self.mock_feasibility_checker.can_cook.return_value = True
+        self.mock_feasibility_checker.can_cook_indexed.return_value = True
 
         t_id = self.create_item_identity("Tomato")
         ing1 = MagicMock(spec=IngredientRef)
@@ -129,7 +130,7 @@ class TestRecipeScorer(unittest.TestCase):
         # Recipe with expiring ingredient (confidence 1.0)
         # Should get 1.0 + 1.0 = 2.0
 
-        self.mock_feasibility_checker.can_cook.return_value = True
+        self.mock_feasibility_checker.can_cook_indexed.return_value = True
 
         t_id = self.create_item_identity("Tomato")
         ing1 = MagicMock(spec=IngredientRef)
@@ -153,7 +154,7 @@ class TestRecipeScorer(unittest.TestCase):
         # Recipe with ingredient expiring later (confidence 1.0)
         # Should get 1.0
 
-        self.mock_feasibility_checker.can_cook.return_value = True
+        self.mock_feasibility_checker.can_cook_indexed.return_value = True
 
         t_id = self.create_item_identity("Tomato")
         ing1 = MagicMock(spec=IngredientRef)
@@ -177,7 +178,7 @@ class TestRecipeScorer(unittest.TestCase):
         # Recipe with expiring ingredient (confidence 0.4)
         # Should get 0.4 + 1.0 = 1.4
 
-        self.mock_feasibility_checker.can_cook.return_value = True
+        self.mock_feasibility_checker.can_cook_indexed.return_value = True
 
         t_id = self.create_item_identity("Tomato", confidence=0.4)
         ing1 = MagicMock(spec=IngredientRef)
@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+from dwbs.core.decision.scoring.cache import ScoringCache
+from dwbs.core.decision.scoring.scorer import RecipeScorer
+from dwbs.core.decision.explanation.generator import ExplanationGenerator
+from dwbs.core.recipe.domain.feasibility import FeasibilityChecker
+from dwbs.core.recipe.domain.recipe import Recipe
+from dwbs.core.recipe.domain.ingredient import IngredientRef
+from dwbs.core.contracts.inventory import InventoryState, InventoryItem, ItemIdentity, Quantity, Unit
+
+TODAY = date.today()
+
+def make_recipe(recipe_id, name, grams):
+    return Recipe(id=recipe_id, name=recipe_id, instructions=[], ingredients=[
+        IngredientRef(item=ItemIdentity(name=name), quantity=Quantity(value=grams, unit=Unit.GRAM))
+    ])
+
+def make_inventory(version, grams=500, expiry=None):
+    return InventoryState(version=version, items=[
+        InventoryItem(item=ItemIdentity(name="Rice"), quantity=Quantity(value=grams, unit=Unit.GRAM), expiry_date=expiry)
+    ])
+
+def test_lru_eviction_and_version_invalidation():
+    cache = ScoringCache(maxsize=2)
+    cache.put(1, ("score", "a", TODAY), 1.0)
+    cache.put(1, ("score", "b", TODAY), 0.5)
+    assert cache.get(1, ("score", "a", TODAY)) == 1.0 # a is now most recent
+    cache.put(1, ("score", "c", TODAY), 0.0)
+    assert cache.get(1, ("score", "b", TODAY)) is None
+    assert cache.get(1, ("score", "c", TODAY)) == 0.0
+    assert cache.cache_info() == (2, 1, 2, 2, 1)
+
+    # A newer version drops everything; older versions are neither served nor stored.
+    assert cache.get(2, ("score", "a", TODAY)) is None
+    cache.put(1, ("score", "a", TODAY), 1.0)
+    assert cache.cache_info().currsize == 0 and cache.cache_info().version == 2
+
+def test_scorer_and_explanations_hit_the_cache():
+    cache = ScoringCache()
+    scorer = RecipeScorer(FeasibilityChecker(), cache=cache)
+    generator = ExplanationGenerator(scorer)
+    recipes = [make_recipe("pilaf", "Rice", 200), make_recipe("risotto", "Rice", 800)]
+    inventory = make_inventory(version=7, expiry=TODAY + timedelta(days=1))
+
+    with patch.object(scorer, "trace_indexed", wraps=scorer.trace_indexed) as trace_indexed:
+        assert scorer.score_batch(recipes, inventory) == [2.0, 0.0]
+        assert scorer.score_batch(recipes, inventory) == [2.0, 0.0]
+        assert scorer.score(recipes[0], inventory) == 2.0
+    assert trace_indexed.call_count == 1
+    assert (cache.hits, cache.misses) == (3, 2)
+
+    first = generator.generate_suggestion_explanation(recipes[0], inventory, 2.0)
+    assert generator.generate_suggestion_explanation(recipes[0], inventory, 2.0) is first
+    assert "expires tomorrow" in first.reason
+
+    # The inventory changed: new version, fresh results.
+    assert scorer.score(recipes[1], make_inventory(version=8, grams=1000)) == 1.0
+    assert scorer.score(recipes[1], inventory) == 0.0 # Outdated version: computed, not cached
+    assert cache.cache_info().currsize == 1
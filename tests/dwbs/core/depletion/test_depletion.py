@@ -4,6 +4,7 @@ from src.dwbs.core.recipe.domain.recipe import Recipe
 from src.dwbs.core.recipe.domain.ingredient import IngredientRef
 from src.dwbs.core.contracts.inventory import ItemIdentity, Quantity, Unit
 from src.dwbs.core.depletion.service import DepletionService
+from src.dwbs.core.ledger.store.memory import InMemoryLedgerStore
 
 class TestDepletionService:
     def setup_method(self):
@@ -55,3 +56,24 @@ class TestDepletionService:
     def test_deplete_recipe_empty(self):
         result = self.service.deplete_recipe(None, "user-1")
         assert result.is_failure
+
+    def test_commit_recipe_appends_atomically(self):
+        recipe = Recipe(
+            id="rec-002",
+            name="Salad",
+            ingredients=[
+                IngredientRef(item=ItemIdentity(name="Lettuce"), quantity=Quantity(value=Decimal("100"), unit=Unit.GRAM)),
+                IngredientRef(item=ItemIdentity(name="Tomato"), quantity=Quantity(value=Decimal("2"), unit=Unit.PIECE)),
+            ],
+            instructions=["Toss"]
+        )
+        ledger = InMemoryLedgerStore()
+
+        result = self.service.commit_recipe(ledger, recipe, actor_id="user-1", expected_version=0)
+        assert result.is_success
+        assert ledger.version == 2
+        assert ledger.snapshot() == result.value
+
+        stale = self.service.commit_recipe(ledger, recipe, actor_id="user-1", expected_version=0)
+        assert stale.is_failure
+        assert ledger.version == 2
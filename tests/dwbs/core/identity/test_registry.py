@@ -0,0 +1,36 @@
+import threading
+from dwbs.core.identity.registry import ItemRegistry
+from dwbs.core.contracts.inventory import ItemIdentity
+
+def test_ids_are_dense_and_ignore_confidence():
+    registry = ItemRegistry()
+    tomato = registry.intern(ItemIdentity(name="Tomato"))
+    canned = registry.intern(ItemIdentity(name="Tomato", variant="Canned"))
+
+    assert (tomato, canned) == (0, 1)
+    assert registry.intern(ItemIdentity(name="Tomato", confidence=0.4)) == tomato
+    assert registry.intern_key("Tomato", "Canned") == canned
+    assert registry.identity(canned) == ItemIdentity(name="Tomato", variant="Canned")
+    assert len(registry) == 2
+
+def test_get_never_registers():
+    registry = ItemRegistry()
+    assert registry.get(ItemIdentity(name="Basil")) is None
+    assert len(registry) == 0
+
+def test_concurrent_interning_hands_out_one_id():
+    registry = ItemRegistry()
+    results = []
+
+    def worker():
+        results.append([registry.intern_key(f"item-{i}") for i in range(200)])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(registry) == 200
+    assert all(ids == results[0] for ids in results)
+    assert sorted(results[0]) == list(range(200))
@@ -29,12 +29,12 @@ class TestDraftConfirmationService(unittest.TestCase):
         self.assertEqual(event.payload.item.name, "Apple")
         self.assertEqual(event.payload.source, MutationSource.USER_CONFIRMED_OCR)
 
-        self.mock_store.append.assert_called_once_with(event)
+        self.mock_store.append_many.assert_called_once_with([event], expected_version=None)
 
     def test_finalize_empty_list(self):
         events = self.service.finalize_draft([])
         self.assertEqual(len(events), 0)
-        self.mock_store.append.assert_not_called()
+        self.mock_store.append_many.assert_not_called()
 
 if __name__ == '__main__':
     unittest.main()
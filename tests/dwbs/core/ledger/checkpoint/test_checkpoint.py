@@ -0,0 +1,116 @@
+import pytest
+from decimal import Decimal
+from dwbs.core.ledger.store.memory import InMemoryLedgerStore
+from dwbs.core.ledger.store.file import FileLedgerStore
+from dwbs.core.ledger.events.types import SnapshotEvent
+from dwbs.core.ledger.projection import InventoryProjector, IncrementalInventoryProjector
+from dwbs.core.ledger.checkpoint.service import CheckpointService, CheckpointPolicy
+from dwbs.core.contracts.mutation import MutationType
+from factories import purchase, consume
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_checkpoint_every_n_events():
+    store = InMemoryLedgerStore()
+    projector = IncrementalInventoryProjector(store)
+    CheckpointService(store, projector, CheckpointPolicy(every_events=10))
+
+    store.append(purchase("Rice", 1000))
+    for _ in range(24):
+        store.append(consume("Rice", 10))
+
+    snapshots = [e for e in store.snapshot() if e.mutation_type == MutationType.SNAPSHOT]
+    assert len(snapshots) == 2
+    latest = store.latest_of_type(MutationType.SNAPSHOT)
+    assert isinstance(latest, SnapshotEvent)
+    assert latest.payload.as_of_version == 21
+    assert latest.payload.items["Rice"].value == Decimal(1000 - 19 * 10)
+
+    # Projections ignore snapshot events themselves
+    assert InventoryProjector.project_state(store.snapshot())["Rice"].value == Decimal(760)
+
+def test_checkpoint_every_t_seconds():
+    store = InMemoryLedgerStore()
+    clock = FakeClock()
+    projector = IncrementalInventoryProjector(store)
+    CheckpointService(store, projector, CheckpointPolicy(every_events=None, every_seconds=60), clock=clock)
+
+    store.append(purchase("Rice", 100))
+    assert store.latest_of_type(MutationType.SNAPSHOT) is None
+
+    clock.now = 61
+    store.append(consume("Rice", 10))
+    assert store.latest_of_type(MutationType.SNAPSHOT).payload.as_of_version == 2
+
+def test_policy_requires_a_trigger():
+    with pytest.raises(ValueError):
+        CheckpointPolicy(every_events=None, every_seconds=None)
+
+def test_cold_start_replays_only_tail(tmp_path):
+    with FileLedgerStore(tmp_path, sync=False) as store:
+        projector = IncrementalInventoryProjector(store)
+        CheckpointService(store, projector, CheckpointPolicy(every_events=50))
+        store.append(purchase("Flour", 10000))
+        for _ in range(120):
+            store.append(consume("Flour", 5))
+        expected = InventoryProjector.project_state(store.snapshot())
+
+    with FileLedgerStore(tmp_path, sync=False) as reopened:
+        checkpoint = reopened.latest_of_type(MutationType.SNAPSHOT).payload
+        assert reopened.version - checkpoint.as_of_version <= 51
+
+        replayed = []
+        original_get_stream = reopened.get_stream
+        def counting_get_stream(from_version=0, to_version=None):
+            replayed.append(from_version)
+            return original_get_stream(from_version, to_version)
+        reopened.get_stream = counting_get_stream
+
+        assert InventoryProjector.project_ledger(reopened) == expected
+        warm = IncrementalInventoryProjector.from_latest_checkpoint(reopened, subscribe=False)
+        assert warm.state() == expected
+        assert replayed == [checkpoint.as_of_version, checkpoint.as_of_version]
+
+def test_state_as_of_starts_from_nearest_checkpoint():
+    store = InMemoryLedgerStore()
+    projector = IncrementalInventoryProjector(store)
+    CheckpointService(store, projector, CheckpointPolicy(every_events=10))
+    store.append(purchase("Rice", 1000))
+    for _ in range(30):
+        store.append(consume("Rice", 10))
+
+    history = store.snapshot()
+    replayed = []
+    original_get_stream = store.get_stream
+    def counting_get_stream(from_version=0, to_version=None):
+        replayed.append((from_version, to_version))
+        return original_get_stream(from_version, to_version)
+    store.get_stream = counting_get_stream
+
+    for version in (5, 15, 25, store.version):
+        assert InventoryProjector.state_as_of(store, version=version) == InventoryProjector.project_state(history[:version])
+    checkpoints = [e.payload.as_of_version for e in history if e.mutation_type == MutationType.SNAPSHOT]
+    assert [start for start, _ in replayed] == [0, checkpoints[0], checkpoints[1], checkpoints[-1]]
+
+def test_failed_checkpoint_backs_off_for_an_interval():
+    store = InMemoryLedgerStore()
+    projector = IncrementalInventoryProjector(store)
+    CheckpointService(store, projector, CheckpointPolicy(every_events=5))
+    attempts = []
+    def failing_state():
+        attempts.append(store.version)
+        raise ValueError("cannot project")
+    projector.state = failing_state
+
+    store.append(purchase("Rice", 1000))
+    for _ in range(11):
+        store.append(consume("Rice", 10))
+
+    # One attempt per interval, not one per commit after the first failure.
+    assert attempts == [5, 10]
+    assert store.latest_of_type(MutationType.SNAPSHOT) is None
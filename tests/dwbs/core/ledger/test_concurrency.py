@@ -1,7 +1,8 @@
 import pytest
+import threading
 from uuid import uuid4
 from datetime import datetime
-from src.dwbs.core.ledger.store.memory import InMemoryLedgerStore
+from src.dwbs.core.ledger.store.memory import InMemoryLedgerStore, CHUNK_SIZE
 from src.dwbs.core.ledger.events.types import LedgerEvent
 from src.dwbs.core.exceptions import ConcurrencyError
 from src.dwbs.core.contracts.mutation import MutationType
@@ -85,3 +86,71 @@ def test_mixing_versioned_and_unversioned_events():
     # Append unversioned again
     store.append(create_dummy_event(expected_version=None))
     assert store.version == 3
+
+def test_append_many_single_version_check():
+    store = InMemoryLedgerStore()
+    store.append(create_dummy_event())
+
+    store.append_many([create_dummy_event(), create_dummy_event()], expected_version=1)
+    assert store.version == 3
+
+    with pytest.raises(ConcurrencyError):
+        store.append_many([create_dummy_event(), create_dummy_event()], expected_version=1)
+    assert store.version == 3
+
+def test_append_many_is_all_or_nothing():
+    store = InMemoryLedgerStore()
+
+    # Second event claims the wrong position within the batch
+    batch = [create_dummy_event(expected_version=0), create_dummy_event(expected_version=0)]
+    with pytest.raises(ConcurrencyError):
+        store.append_many(batch)
+    assert store.version == 0
+    assert store.snapshot() == []
+
+    with pytest.raises(TypeError):
+        store.append_many([create_dummy_event(), "not an event"])
+    assert store.version == 0
+
+def test_concurrent_writers_never_share_a_version():
+    store = InMemoryLedgerStore()
+    conflicts = []
+
+    def writer():
+        for _ in range(200):
+            while True:
+                try:
+                    store.append(create_dummy_event(expected_version=store.version))
+                    break
+                except ConcurrencyError:
+                    conflicts.append(1)
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert store.version == 1600
+    assert len(store.snapshot()) == 1600
+
+def test_views_are_fixed_and_span_chunks():
+    store = InMemoryLedgerStore()
+    events = [create_dummy_event() for _ in range(CHUNK_SIZE * 2 + 10)]
+    store.append_many(events[:CHUNK_SIZE - 1])
+
+    view = store.view()
+    store.append_many(events[CHUNK_SIZE - 1:])
+
+    # The earlier view is unaffected by later appends, including a chunk seal
+    assert view.version == CHUNK_SIZE - 1
+    assert list(view) == events[:CHUNK_SIZE - 1]
+    with pytest.raises(IndexError):
+        view[CHUNK_SIZE - 1]
+
+    latest = store.view()
+    assert len(latest) == len(events)
+    assert latest[CHUNK_SIZE] == events[CHUNK_SIZE]
+    assert latest[-1] == events[-1]
+    assert latest[CHUNK_SIZE - 5:CHUNK_SIZE + 5] == events[CHUNK_SIZE - 5:CHUNK_SIZE + 5]
+    assert list(store.get_stream(from_version=CHUNK_SIZE + 3, to_version=2 * CHUNK_SIZE + 1)) == events[CHUNK_SIZE + 3:2 * CHUNK_SIZE + 1]
@@ -0,0 +1,168 @@
+import pytest
+import threading
+from decimal import Decimal
+from dwbs.core.ledger.store.file import FileLedgerStore
+from dwbs.core.ledger.events.types import PurchaseEvent, ConsumeEvent, LedgerEvent
+from dwbs.core.contracts.mutation import MutationType
+from dwbs.core.contracts.inventory import ItemIdentity
+from dwbs.core.exceptions import ConcurrencyError, LedgerCorruptionError
+from factories import purchase, consume
+
+def test_round_trip_preserves_event_types(tmp_path):
+    events = [purchase(), consume(), LedgerEvent(actor="admin", mutation_type=MutationType.SNAPSHOT)]
+    with FileLedgerStore(tmp_path) as store:
+        for event in events:
+            store.append(event)
+        assert store.version == 3
+        assert store.snapshot() == events
+
+    with FileLedgerStore(tmp_path) as reopened:
+        assert reopened.version == 3
+        stream = list(reopened.get_stream())
+        assert stream == events
+        assert isinstance(stream[0], PurchaseEvent)
+        assert isinstance(stream[1], ConsumeEvent)
+
+def test_optimistic_locking(tmp_path):
+    with FileLedgerStore(tmp_path) as store:
+        store.append(purchase(expected_version=0))
+        with pytest.raises(ConcurrencyError) as excinfo:
+            store.append(purchase(expected_version=0))
+        assert "Version mismatch" in str(excinfo.value)
+        assert store.version == 1
+
+    with FileLedgerStore(tmp_path) as reopened:
+        reopened.append(purchase(expected_version=1))
+        assert reopened.version == 2
+
+def test_segments_roll_and_reload(tmp_path):
+    with FileLedgerStore(tmp_path, segment_max_bytes=1024) as store:
+        for i in range(20):
+            store.append(purchase(value=str(i + 1)))
+
+    assert len(list(tmp_path.glob("*.seg"))) > 1
+    with FileLedgerStore(tmp_path, segment_max_bytes=1024) as reopened:
+        values = [e.payload.quantity.value for e in reopened.get_stream()]
+        assert values == [Decimal(i + 1) for i in range(20)]
+
+def test_torn_tail_is_truncated(tmp_path):
+    with FileLedgerStore(tmp_path) as store:
+        store.append(purchase())
+        store.append(purchase())
+
+    segment = sorted(tmp_path.glob("*.seg"))[-1]
+    data = segment.read_bytes()
+    segment.write_bytes(data[:-5]) # Simulate crash mid-write
+
+    with FileLedgerStore(tmp_path) as reopened:
+        assert reopened.version == 1
+        reopened.append(purchase(expected_version=1))
+        assert len(reopened.snapshot()) == 2
+
+def test_corruption_in_sealed_segment_raises(tmp_path):
+    with FileLedgerStore(tmp_path, segment_max_bytes=512) as store:
+        for _ in range(6):
+            store.append(purchase())
+
+    first = sorted(tmp_path.glob("*.seg"))[0]
+    data = bytearray(first.read_bytes())
+    data[20] ^= 0xFF
+    first.write_bytes(bytes(data))
+
+    with pytest.raises(LedgerCorruptionError):
+        FileLedgerStore(tmp_path, segment_max_bytes=512)
+
+def test_concurrent_appends_with_version_checks(tmp_path):
+    store = FileLedgerStore(tmp_path)
+    conflicts = []
+
+    def writer():
+        for _ in range(25):
+            while True:
+                try:
+                    store.append(purchase(expected_version=store.version))
+                    break
+                except ConcurrencyError:
+                    conflicts.append(1)
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert store.version == 100
+    store.close()
+    assert FileLedgerStore(tmp_path).version == 100
+
+def test_stream_slices_across_segments(tmp_path):
+    with FileLedgerStore(tmp_path, segment_max_bytes=1024) as store:
+        events = [purchase(value=str(i + 1)) for i in range(12)]
+        for event in events:
+            store.append(event)
+
+        assert list(store.get_stream(from_version=5)) == events[5:]
+        assert list(store.get_stream(from_version=2, to_version=9)) == events[2:9]
+        assert list(store.get_stream(from_version=12)) == []
+
+def test_append_many_single_batch(tmp_path):
+    with FileLedgerStore(tmp_path) as store:
+        store.append(purchase())
+        batch = [purchase(name=f"Item{i}") for i in range(40)]
+        store.append_many(batch, expected_version=1)
+        assert store.version == 41
+
+        with pytest.raises(ConcurrencyError):
+            store.append_many([purchase()], expected_version=1)
+        assert store.version == 41
+
+    with FileLedgerStore(tmp_path) as reopened:
+        assert reopened.snapshot()[1:] == batch
+
+def test_torn_batch_is_dropped_entirely(tmp_path):
+    with FileLedgerStore(tmp_path) as store:
+        store.append(purchase())
+        store.append_many([purchase(name=f"Item{i}") for i in range(5)])
+
+    segment = sorted(tmp_path.glob("*.seg"))[-1]
+    data = segment.read_bytes()
+    segment.write_bytes(data[:-5]) # Crash while writing the last record of the batch
+
+    with FileLedgerStore(tmp_path) as reopened:
+        assert reopened.version == 1
+        assert [e.payload.item.name for e in reopened.get_stream()] == ["Apple"]
+
+class _FailingFile:
+    """
+    Writes half of what it is given, then fails, like a disk filling up mid-batch.
+    """
+    def __init__(self, f):
+        self.wrapped = f
+
+    def write(self, data):
+        self.wrapped.write(data[:len(data) // 2])
+        self.wrapped.flush()
+        raise RuntimeError("write failed")
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+def test_failed_batch_leaves_store_unchanged(tmp_path):
+    with FileLedgerStore(tmp_path, sync=False) as store:
+        first = purchase()
+        store.append(first)
+        store._file = _FailingFile(store._file)
+        with pytest.raises(RuntimeError):
+            store.append_many([purchase(name=f"Item{i}") for i in range(5)])
+        store._file = store._file.wrapped
+
+        assert store.version == 1
+        assert store.snapshot() == [first]
+        assert store.last_modified_version(ItemIdentity(name="Item0")) is None
+
+        second = consume()
+        store.append(second)
+
+    with FileLedgerStore(tmp_path, sync=False) as reopened:
+        assert reopened.version == 2
+        assert reopened.snapshot() == [first, second]
@@ -0,0 +1,63 @@
+import pytest
+import random
+from decimal import Decimal
+from dwbs.core.ledger.store.memory import InMemoryLedgerStore
+from dwbs.core.ledger.projection import InventoryProjector, IncrementalInventoryProjector
+from dwbs.core.contracts.inventory import Quantity, Unit
+from factories import purchase, consume, waste
+
+def test_follows_ledger_and_matches_full_projection():
+    store = InMemoryLedgerStore()
+    projector = IncrementalInventoryProjector(store)
+    random.seed(7)
+
+    for name in ["Rice", "Flour", "Milk"]:
+        store.append(purchase(name, 100, Unit.KILOGRAM))
+    for _ in range(200):
+        name = random.choice(["Rice", "Flour", "Milk"])
+        action = random.choice([purchase, consume, waste])
+        store.append(action(name, random.randint(1, 500)))
+
+        assert projector.version == store.version
+        assert projector.state() == InventoryProjector.project_state(store.snapshot())
+
+    assert not projector.is_stale
+
+def test_manual_catch_up_without_subscription():
+    store = InMemoryLedgerStore()
+    store.append(purchase("Rice", 1, Unit.KILOGRAM, approx=True))
+    projector = IncrementalInventoryProjector(store, subscribe=False)
+
+    store.append_many([consume("Rice", 200), purchase("Milk", 1, Unit.LITER)])
+    assert projector.is_stale
+    assert projector.get("Rice").value == Decimal(1000)
+
+    assert projector.catch_up() == 3
+    rice = projector.get("Rice")
+    assert rice == Quantity(value=Decimal(800), unit=Unit.GRAM)
+    assert rice.approx is True
+    assert projector.get("Milk") == Quantity(value=Decimal(1000), unit=Unit.MILLILITER)
+    assert projector.get("Bread") is None
+
+def test_replay_from_checkpoint_only_reads_tail():
+    store = InMemoryLedgerStore()
+    store.append_many([purchase("Rice", 500), consume("Rice", 100)])
+    checkpoint = InventoryProjector.project_state(store.snapshot())
+    store.append(consume("Rice", 50))
+
+    projector = IncrementalInventoryProjector(store, checkpoint_version=2, checkpoint_state=checkpoint)
+    assert projector.version == 3
+    assert projector.get("Rice").value == Decimal(350)
+
+def test_unprojectable_items_raise_like_project_state():
+    store = InMemoryLedgerStore()
+    projector = IncrementalInventoryProjector(store)
+    store.append_many([purchase("Rice", 100), purchase("Rice", 1, Unit.PIECE), consume("Eggs", 2, Unit.PIECE), purchase("Milk", 1, Unit.LITER)])
+
+    with pytest.raises(ValueError):
+        InventoryProjector.project_state(store.snapshot())
+    with pytest.raises(ValueError):
+        projector.get("Rice")
+    with pytest.raises(ValueError):
+        projector.get("Eggs")
+    assert projector.get("Milk").value == Decimal(1000)
@@ -0,0 +1,102 @@
+import pytest
+import threading
+from datetime import datetime, timedelta
+from dwbs.core.ledger.store.sqlite import SqliteLedgerStore
+from dwbs.core.contracts.mutation import MutationType
+from dwbs.core.contracts.inventory import ItemIdentity
+from dwbs.core.exceptions import ConcurrencyError
+from factories import purchase, consume
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+
+@pytest.fixture
+def store(tmp_path):
+    s = SqliteLedgerStore(tmp_path / "ledger.db")
+    yield s
+    s.close()
+
+def test_append_and_reopen(tmp_path):
+    events = [purchase(), consume()]
+    with SqliteLedgerStore(tmp_path / "ledger.db") as store:
+        for e in events:
+            store.append(e)
+        assert store.version == 2
+
+    with SqliteLedgerStore(tmp_path / "ledger.db") as reopened:
+        assert reopened.version == 2
+        assert reopened.snapshot() == events
+
+def test_commits_are_synchronous_unless_disabled(tmp_path):
+    # PRAGMA synchronous: 1 = NORMAL, 2 = FULL
+    with SqliteLedgerStore(tmp_path / "full.db") as store:
+        assert store._writer.execute("PRAGMA synchronous").fetchone()[0] == 2
+    with SqliteLedgerStore(tmp_path / "normal.db", sync=False) as store:
+        assert store._writer.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+def test_optimistic_locking_inside_transaction(store):
+    store.append(purchase(expected_version=0))
+    with pytest.raises(ConcurrencyError) as excinfo:
+        store.append(purchase(expected_version=0))
+    assert "Version mismatch" in str(excinfo.value)
+    assert store.version == 1
+
+def test_version_slices(store):
+    events = [purchase(name=f"Item{i}") for i in range(5)]
+    for e in events:
+        store.append(e)
+
+    assert list(store.get_stream(from_version=3)) == events[3:]
+    assert list(store.get_stream(from_version=1, to_version=3)) == events[1:3]
+
+def test_indexed_filters(store):
+    store.append(purchase(name="Apple", actor="alice", timestamp=BASE_TIME))
+    store.append(consume(name="Apple", actor="bob", timestamp=BASE_TIME + timedelta(days=1)))
+    store.append(purchase(name="Milk", actor="alice", timestamp=BASE_TIME + timedelta(days=2)))
+
+    window = list(store.query(since=BASE_TIME + timedelta(hours=1), until=BASE_TIME + timedelta(days=2)))
+    assert [e.actor for e in window] == ["bob", "alice"]
+
+    assert len(list(store.query(actor="alice"))) == 2
+    assert len(list(store.query(mutation_type=MutationType.CONSUME))) == 1
+    apples = list(store.query(item=ItemIdentity(name="Apple")))
+    assert [e.mutation_type for e in apples] == [MutationType.PURCHASE, MutationType.CONSUME]
+
+def test_readers_run_while_writers_append(store):
+    for i in range(50):
+        store.append(purchase(name=f"Item{i}"))
+
+    stop = threading.Event()
+    seen_lengths = []
+
+    def reader():
+        while not stop.is_set():
+            seen_lengths.append(len(store.snapshot()))
+
+    def writer():
+        for i in range(50):
+            store.append(purchase(name=f"More{i}"))
+
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    for t in readers:
+        t.start()
+    w = threading.Thread(target=writer)
+    w.start()
+    w.join()
+    stop.set()
+    for t in readers:
+        t.join()
+
+    assert store.version == 100
+    assert seen_lengths and all(50 <= n <= 100 for n in seen_lengths)
+
+def test_append_many_rolls_back_on_conflict(store):
+    store.append(purchase())
+    batch = [purchase(name=f"Item{i}") for i in range(3)]
+    store.append_many(batch, expected_version=1)
+    assert store.version == 4
+
+    bad_batch = [purchase(expected_version=4), purchase(expected_version=4)]
+    with pytest.raises(ConcurrencyError):
+        store.append_many(bad_batch)
+    assert store.version == 4
+    assert store.snapshot()[1:] == batch
@@ -54,3 +54,22 @@ def test_ledger_immutability():
 
     # Store should still have the event
     assert len(list(store.get_stream())) == 1
+
+def test_ledger_stream_slices():
+    store = InMemoryLedgerStore()
+    events = []
+    for name in ["Apple", "Banana", "Cherry"]:
+        event = PurchaseEvent(
+            actor="tester",
+            payload=PurchasePayload(
+                item=ItemIdentity(name=name),
+                quantity=Quantity(value=1.0, unit=Unit.PIECE),
+                source=MutationSource.USER_MANUAL,
+                explanation=Explanation(reason="Init", source_fact="test", confidence=1.0)
+            )
+        )
+        store.append(event)
+        events.append(event)
+
+    assert list(store.get_stream(from_version=1)) == events[1:]
+    assert list(store.get_stream(from_version=1, to_version=2)) == events[1:2]
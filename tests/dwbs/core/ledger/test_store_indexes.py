@@ -0,0 +1,189 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from dwbs.core.ledger.store.memory import InMemoryLedgerStore
+from dwbs.core.ledger.store.file import FileLedgerStore
+from dwbs.core.ledger.store.sqlite import SqliteLedgerStore
+from dwbs.core.ledger.events.types import LedgerEvent
+from dwbs.core.ledger.projection import InventoryProjector
+from dwbs.core.contracts.mutation import MutationType
+from dwbs.core.contracts.inventory import ItemIdentity, Quantity, Unit
+from dwbs.core.exceptions import DuplicateEventError
+from factories import purchase, consume
+
+APPLE = ItemIdentity(name="Apple")
+GREEN_APPLE = ItemIdentity(name="Apple", variant="Green")
+MILK = ItemIdentity(name="Milk")
+
+T0 = datetime(2024, 1, 1, 8, 0)
+
+@pytest.fixture(params=["memory", "file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryLedgerStore()
+    elif request.param == "file":
+        s = FileLedgerStore(tmp_path / "segments", sync=False)
+        yield s
+        s.close()
+    else:
+        s = SqliteLedgerStore(tmp_path / "ledger.db")
+        yield s
+        s.close()
+
+def test_item_stream_and_last_modified(store):
+    events = [
+        purchase(APPLE, 5),
+        purchase(MILK, 1),
+        LedgerEvent(actor="admin", mutation_type=MutationType.SNAPSHOT),
+        consume(APPLE, 2),
+        purchase(GREEN_APPLE, 3),
+    ]
+    store.append_many(events[:3])
+    store.append(events[3])
+    store.append(events[4])
+
+    assert list(store.get_item_stream(APPLE)) == [events[0], events[3]]
+    assert list(store.get_item_stream(GREEN_APPLE)) == [events[4]]
+    assert store.last_modified_version(APPLE) == 4
+    assert store.last_modified_version(MILK) == 2
+    assert store.last_modified_version(ItemIdentity(name="Bread")) is None
+    assert list(store.get_item_stream(ItemIdentity(name="Bread"))) == []
+
+def test_project_item_matches_full_projection(store):
+    store.append_many([purchase(APPLE, 5), purchase(MILK, 2), consume(APPLE, 2), consume(MILK, 1)])
+
+    full = InventoryProjector.project_state(store.snapshot())
+    assert InventoryProjector.project_item(store, APPLE) == full["Apple"]
+    assert InventoryProjector.project_item(store, MILK).value == Decimal(1)
+    assert InventoryProjector.project_item(store, ItemIdentity(name="Bread")) is None
+
+def test_file_index_rebuilt_on_open(tmp_path):
+    with FileLedgerStore(tmp_path, sync=False) as s:
+        s.append_many([purchase(APPLE, 1), purchase(MILK, 1), consume(APPLE, 1)])
+
+    with FileLedgerStore(tmp_path, sync=False) as reopened:
+        assert reopened.last_modified_version(APPLE) == 3
+        assert [e.mutation_type for e in reopened.get_item_stream(APPLE)] == [MutationType.PURCHASE, MutationType.CONSUME]
+
+def test_event_id_lookup(store):
+    events = [purchase(APPLE, 1), purchase(MILK, 1), consume(APPLE, 1)]
+    store.append(events[0])
+    store.append_many(events[1:])
+
+    for version, event in enumerate(events, start=1):
+        assert store.get_event(event.event_id) == event
+        assert store.get_event(str(event.event_id)) == event
+        assert store.get_event_version(event.event_id) == version
+
+    missing = purchase(APPLE, 1)
+    assert store.get_event(missing.event_id) is None
+    assert store.get_event_version(missing.event_id) is None
+    assert store.get_event("not-a-uuid") is None
+
+def test_file_event_index_rebuilt_on_open(tmp_path):
+    events = [purchase(APPLE, 1), purchase(MILK, 1)]
+    with FileLedgerStore(tmp_path, sync=False) as s:
+        s.append_many(events)
+
+    with FileLedgerStore(tmp_path, sync=False) as reopened:
+        assert reopened.get_event(events[1].event_id) == events[1]
+        assert reopened.get_event_version(events[0].event_id) == 1
+
+def test_version_at_timestamp(store):
+    store.append_many([purchase(APPLE, 5, timestamp=T0), purchase(MILK, 2, timestamp=T0 + timedelta(hours=1))])
+    # Out-of-order timestamp: the prefix ends before the first later event.
+    store.append_many([consume(APPLE, 1, timestamp=T0 + timedelta(hours=3)), consume(APPLE, 1, timestamp=T0 + timedelta(hours=2))])
+
+    assert store.version_at(T0 - timedelta(seconds=1)) == 0
+    assert store.version_at(T0) == 1
+    assert store.version_at(T0 + timedelta(minutes=90)) == 2
+    assert store.version_at(T0 + timedelta(hours=2)) == 2
+    assert store.version_at(T0 + timedelta(hours=3)) == 4
+
+def test_state_as_of_version_and_timestamp(store):
+    store.append_many([purchase(APPLE, 5, timestamp=T0), consume(APPLE, 2, timestamp=T0 + timedelta(hours=1)), purchase(MILK, 1, timestamp=T0 + timedelta(hours=2))])
+
+    assert InventoryProjector.state_as_of(store, version=0) == {}
+    assert InventoryProjector.state_as_of(store, version=2)["Apple"].value == Decimal(3)
+    as_of = InventoryProjector.state_as_of(store, timestamp=T0 + timedelta(minutes=30))
+    assert as_of == {"Apple": Quantity(value=Decimal(5), unit=Unit.GRAM)}
+    assert InventoryProjector.state_as_of(store, version=store.version) == InventoryProjector.project_state(store.snapshot())
+
+    with pytest.raises(ValueError):
+        InventoryProjector.state_as_of(store)
+
+def test_file_timestamp_index_rebuilt_on_open(tmp_path):
+    with FileLedgerStore(tmp_path, sync=False) as s:
+        s.append_many([purchase(APPLE, 1, timestamp=T0), purchase(MILK, 1, timestamp=T0 + timedelta(hours=1))])
+
+    with FileLedgerStore(tmp_path, sync=False) as reopened:
+        assert reopened.version_at(T0 + timedelta(minutes=1)) == 1
+
+def test_mixed_naive_and_aware_timestamps(store):
+    # Naive timestamps are local time; aware ones are compared in UTC.
+    aware = (T0 + timedelta(hours=1)).astimezone(timezone(timedelta(hours=-5)))
+    events = [purchase(APPLE, 5, timestamp=T0), purchase(MILK, 1, timestamp=aware), consume(APPLE, 1, timestamp=T0 + timedelta(hours=2))]
+    store.append(events[0])
+    store.append_many(events[1:])
+
+    assert store.version_at(T0 + timedelta(minutes=30)) == 1
+    assert store.version_at(aware + timedelta(minutes=30)) == 2
+    assert store.version_at(T0 + timedelta(hours=3)) == 3
+    if isinstance(store, SqliteLedgerStore):
+        assert list(store.query(since=aware, until=T0 + timedelta(hours=1, minutes=30))) == [events[1]]
+
+def test_file_mixed_timestamps_reopen(tmp_path):
+    aware = (T0 + timedelta(hours=1)).astimezone(timezone.utc)
+    events = [purchase(APPLE, 5, timestamp=T0), purchase(MILK, 1, timestamp=aware)]
+    with FileLedgerStore(tmp_path, sync=False) as s:
+        s.append_many(events)
+
+    with FileLedgerStore(tmp_path, sync=False) as reopened:
+        assert reopened.version_at(aware + timedelta(minutes=30)) == 2
+        assert reopened.snapshot() == events
+
+def test_duplicate_event_id_is_rejected(store):
+    first = purchase(APPLE, 1)
+    store.append(first)
+
+    with pytest.raises(DuplicateEventError):
+        store.append(first)
+    with pytest.raises(DuplicateEventError):
+        store.append_many([purchase(MILK, 1), first])
+    repeated = purchase(MILK, 2)
+    with pytest.raises(DuplicateEventError):
+        store.append_many([repeated, repeated])
+
+    assert store.version == 1
+    assert store.snapshot() == [first]
+
+def test_memory_failed_publish_leaves_indexes_untouched(monkeypatch):
+    store = InMemoryLedgerStore()
+    store.append(purchase(APPLE, 5, timestamp=T0))
+
+    def fail(event):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(store, "_item_id", fail)
+    with pytest.raises(RuntimeError):
+        store.append_many([purchase(MILK, 1, timestamp=T0 + timedelta(hours=1))])
+    monkeypatch.undo()
+
+    assert store.version == 1
+    assert store._max_timestamps == [T0.astimezone(timezone.utc).replace(tzinfo=None)]
+    store.append(purchase(MILK, 1, timestamp=T0 + timedelta(hours=2)))
+    assert store.version_at(T0 + timedelta(hours=1)) == 1
+    assert list(store.get_item_stream(MILK))[0].timestamp == T0 + timedelta(hours=2)
+
+def test_failing_listener_does_not_break_append(store, caplog):
+    seen = []
+    def broken(version):
+        raise RuntimeError("listener bug")
+    store.subscribe(broken)
+    store.subscribe(seen.append)
+
+    store.append(purchase(APPLE, 1))
+    store.append_many([purchase(MILK, 1), consume(APPLE, 1)])
+
+    assert seen == [1, 3]
+    assert store.version == 3
+    assert "listener bug" in caplog.text
@@ -0,0 +1,66 @@
+import pytest
+import random
+from decimal import Decimal
+from dwbs.core.ledger.store.memory import InMemoryLedgerStore
+from dwbs.core.ledger.events.types import CorrectionAddEvent, CorrectionPayload
+from dwbs.core.ledger.projection import InventoryProjector, IncrementalInventoryProjector
+from dwbs.core.ledger.checkpoint.service import CheckpointService, CheckpointPolicy
+from dwbs.core.contracts.mutation import MutationSource
+from dwbs.core.contracts.inventory import ItemIdentity, Quantity, Unit
+from factories import EXPLANATION, purchase, consume, waste
+
+pytest.importorskip("numpy")
+from dwbs.core.ledger.vectorized import VectorizedInventoryProjector, encode_events
+
+def assert_same(actual, expected):
+    assert list(actual) == list(expected)
+    for name, quantity in expected.items():
+        assert actual[name].value == quantity.value
+        assert actual[name].unit == quantity.unit
+        assert actual[name].approx == quantity.approx
+
+def test_matches_project_state_on_random_ledger():
+    random.seed(11)
+    items = {"Rice": Unit.KILOGRAM, "Milk": Unit.LITER, "Eggs": Unit.PIECE, "Salt": Unit.GRAM}
+    events = [purchase(name, 1000, unit) for name, unit in items.items()]
+    for _ in range(2000):
+        name = random.choice(list(items))
+        small = Unit.GRAM if items[name] == Unit.KILOGRAM else Unit.MILLILITER if items[name] == Unit.LITER else items[name]
+        action = random.choice([purchase, consume, waste])
+        events.append(action(name, Decimal(random.randint(1, 300)) / 100, small, approx=random.random() < 0.01))
+
+    assert_same(VectorizedInventoryProjector.project_state(events), InventoryProjector.project_state(events))
+
+def test_skips_corrections_like_project_state():
+    correction = CorrectionAddEvent(actor="t", payload=CorrectionPayload(
+        item=ItemIdentity(name="Rice"), quantity_delta=Quantity(value=Decimal(5), unit=Unit.GRAM),
+        source=MutationSource.USER_MANUAL, explanation=EXPLANATION))
+    events = [purchase("Rice", 10), correction, consume("Rice", "2.5")]
+    assert_same(VectorizedInventoryProjector.project_state(events), InventoryProjector.project_state(events))
+
+@pytest.mark.parametrize("events", [
+    [purchase("Rice", 10), consume("Rice", 11)],
+    [consume("Eggs", 1, Unit.PIECE), purchase("Eggs", 6, Unit.PIECE)],
+    [purchase("Rice", 10), purchase("Rice", 1, Unit.PIECE)],
+])
+def test_unprojectable_histories_raise_like_project_state(events):
+    with pytest.raises(ValueError):
+        InventoryProjector.project_state(events)
+    with pytest.raises(ValueError):
+        VectorizedInventoryProjector.project_state(events)
+
+def test_falls_back_for_sub_milli_amounts():
+    events = [purchase("Saffron", "0.0001"), purchase("Saffron", 1)]
+    assert encode_events(events) is None
+    assert_same(VectorizedInventoryProjector.project_state(events), InventoryProjector.project_state(events))
+
+def test_project_ledger_starts_from_checkpoint():
+    store = InMemoryLedgerStore()
+    projector = IncrementalInventoryProjector(store)
+    CheckpointService(store, projector, CheckpointPolicy(every_events=7))
+    store.append(purchase("Flour", 2, Unit.KILOGRAM, approx=True))
+    for _ in range(20):
+        store.append(consume("Flour", 15))
+
+    assert_same(VectorizedInventoryProjector.project_ledger(store), InventoryProjector.project_ledger(store))
+    assert VectorizedInventoryProjector.project_ledger(store)["Flour"].value == Decimal(1700)
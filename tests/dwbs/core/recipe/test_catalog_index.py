@@ -0,0 +1,58 @@
+import random
+from dwbs.core.recipe.domain.feasibility import FeasibilityChecker
+from dwbs.core.recipe.domain.recipe import Recipe
+from dwbs.core.recipe.domain.ingredient import IngredientRef
+from dwbs.core.recipe.graph.substitution import SubstitutionGraph
+from dwbs.core.recipe.index.catalog import RecipeCatalogIndex
+from dwbs.core.decision.scoring.scorer import RecipeScorer
+from dwbs.core.decision.explanation.generator import ExplanationGenerator
+from dwbs.core.decision.logic.recommender import ActionRecommender
+from dwbs.core.identity.registry import item_id
+from dwbs.core.contracts.inventory import InventoryState, InventoryItem, ItemIdentity, Quantity, Unit
+
+NAMES = [f"Ing{i}" for i in range(40)]
+
+def ref(name, grams=100):
+    return IngredientRef(item=ItemIdentity(name=name), quantity=Quantity(value=grams, unit=Unit.GRAM))
+
+def recipe(rid, *names):
+    return Recipe(id=rid, name=rid, ingredients=[ref(n) for n in names], instructions=[])
+
+def test_candidates_need_every_ingredient_reachable():
+    graph = SubstitutionGraph()
+    graph.add_substitution(ItemIdentity(name="Sour Cream"), ItemIdentity(name="Greek Yogurt"), 0.5)
+    catalog = [
+        recipe("dip", "Sour Cream", "Garlic"),
+        recipe("toast", "Bread", "Butter"),
+        recipe("water", ),
+    ]
+    index = RecipeCatalogIndex(catalog, graph)
+
+    in_stock = [item_id(ItemIdentity(name=n)) for n in ["Greek Yogurt", "Garlic", "Butter"]]
+    assert [r.id for r in index.candidates(in_stock)] == ["dip", "water"]
+    assert [r.id for r in index.candidates([])] == ["water"]
+
+def test_candidates_cover_every_feasible_recipe():
+    rng = random.Random(2)
+    graph = SubstitutionGraph()
+    for i in range(0, 38, 4):
+        graph.add_substitution(ItemIdentity(name=NAMES[i]), ItemIdentity(name=NAMES[i + 1]), 0.2)
+    catalog = [recipe(f"r{i}", *rng.sample(NAMES, rng.randint(1, 3))) for i in range(500)]
+    inventory = InventoryState(items=[
+        InventoryItem(item=ItemIdentity(name=n), quantity=Quantity(value=rng.choice([50, 500]), unit=Unit.GRAM))
+        for n in rng.sample(NAMES, 25)
+    ])
+
+    checker = FeasibilityChecker(substitution_graph=graph)
+    index = RecipeCatalogIndex(catalog, graph)
+    candidates = index.candidates(item_id(i.item) for i in inventory.items)
+    feasible = [r for r in catalog if checker.can_cook(r, inventory)]
+
+    assert set(r.id for r in feasible) <= set(r.id for r in candidates)
+    assert len(candidates) < len(catalog)
+
+    scorer = RecipeScorer(checker)
+    plain = ActionRecommender(scorer, ExplanationGenerator(scorer)).recommend(catalog, inventory)
+    indexed = ActionRecommender(scorer, ExplanationGenerator(scorer), catalog_index=index)
+    assert indexed.recommend(catalog, inventory) == plain
+    assert indexed.recommend(None, inventory) == plain
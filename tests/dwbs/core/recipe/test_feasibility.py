@@ -1,10 +1,11 @@
 import pytest
 from datetime import date, timedelta
-from dwbs.core.recipe.domain.feasibility import FeasibilityChecker
+from dwbs.core.recipe.domain.feasibility import FeasibilityChecker, InventoryIndex
 from dwbs.core.recipe.domain.recipe import Recipe
 from dwbs.core.recipe.domain.ingredient import IngredientRef
 from dwbs.core.recipe.graph.substitution import SubstitutionGraph
 from dwbs.core.contracts.inventory import InventoryState, InventoryItem, ItemIdentity, Quantity, Unit, StockStatus
+from dwbs.core.identity.registry import item_id
 
 # Helpers
 def make_item(name, qty_val, unit=Unit.GRAM, expiry_date=None, status=StockStatus.IN_STOCK):
@@ -92,3 +93,47 @@ def test_expired_item_ignored():
 
     checker = FeasibilityChecker()
     assert checker.can_cook(recipe, inventory) is False
+
+def test_reach_maps_required_items_to_stock():
+    # Sour Cream -> Greek Yogurt -> Skyr, Creme Fraiche -> Greek Yogurt
+    graph = SubstitutionGraph()
+    graph.add_substitution(ItemIdentity(name="Sour Cream"), ItemIdentity(name="Greek Yogurt"), 0.5)
+    graph.add_substitution(ItemIdentity(name="Greek Yogurt"), ItemIdentity(name="Skyr"), 0.2)
+    graph.add_substitution(ItemIdentity(name="Creme Fraiche"), ItemIdentity(name="Greek Yogurt"), 0.1)
+    graph.add_substitution(ItemIdentity(name="Sour Cream"), ItemIdentity(name="Skyr"), 0.4)
+
+    inventory = InventoryState(items=[make_item("Skyr", 50), make_item("Greek Yogurt", 300)])
+    index = InventoryIndex.build(inventory)
+    reach = index.reach(graph)
+    assert index.reach(graph) is reach
+
+    skyr, yogurt = item_id(ItemIdentity(name="Skyr")), item_id(ItemIdentity(name="Greek Yogurt"))
+    assert list(reach.fillers(item_id(ItemIdentity(name="Sour Cream")))) == [(skyr, 0.4), (yogurt, 0.5)]
+    assert list(reach.fillers(yogurt)) == [(yogurt, 0.0), (skyr, 0.2)]
+    assert reach.best_penalty(item_id(ItemIdentity(name="Creme Fraiche"))) == 0.1
+    assert item_id(ItemIdentity(name="Milk")) not in reach and len(reach) == 4
+
+    # The cheapest filler (Skyr) is too small; the next one covers it.
+    req = IngredientRef(item=ItemIdentity(name="Sour Cream"), quantity=Quantity(value=200, unit=Unit.GRAM))
+    checker = FeasibilityChecker(substitution_graph=graph)
+    assert checker.can_cook_indexed(make_recipe([req]), index) is True
+    req = IngredientRef(item=ItemIdentity(name="Creme Fraiche"), quantity=Quantity(value=400, unit=Unit.GRAM))
+    assert checker.can_cook_indexed(make_recipe([req]), index) is False
+
+def test_index_and_reach_are_kept_per_inventory_version():
+    graph = SubstitutionGraph()
+    graph.add_substitution(ItemIdentity(name="Butter"), ItemIdentity(name="Ghee"), 0.3)
+    checker = FeasibilityChecker(substitution_graph=graph)
+    recipe = make_recipe([IngredientRef(item=ItemIdentity(name="Butter"), quantity=Quantity(value=10, unit=Unit.GRAM))])
+
+    inventory = InventoryState(items=[make_item("Ghee", 50)], version=3)
+    assert checker.can_cook(recipe, inventory) is True
+    index = checker.index_for(inventory)
+    reach = index.reach(graph)
+    assert checker.can_cook(recipe, inventory) is True
+    assert checker.index_for(inventory) is index and index.reach(graph) is reach
+
+    # A new inventory version gets its own index.
+    newer = InventoryState(items=[make_item("Ghee", 5)], version=4)
+    assert checker.can_cook(recipe, newer) is False
+    assert checker.index_for(newer) is not index
@@ -0,0 +1,67 @@
+import pytest
+import random
+from decimal import Decimal
+from dwbs.core.recipe.domain.feasibility import FeasibilityChecker, InventoryIndex
+from dwbs.core.recipe.domain.recipe import Recipe
+from dwbs.core.recipe.domain.ingredient import IngredientRef
+from dwbs.core.recipe.graph.substitution import SubstitutionGraph
+from dwbs.core.contracts.inventory import InventoryState, InventoryItem, ItemIdentity, Quantity, Unit
+import factories
+
+pytest.importorskip("numpy")
+
+NAMES = [f"Mx{i}" for i in range(60)]
+UNITS = [Unit.GRAM, Unit.KILOGRAM, Unit.MILLILITER, Unit.PIECE]
+
+def make_catalog(count, rng):
+    return factories.make_catalog(count, NAMES, rng, sizes=(1, 5), id_format="m{}", name_format="M{}", quantity=lambda rng: Quantity(
+        value=Decimal(rng.randint(1, 800)) / 4, unit=rng.choice(UNITS)))
+
+def make_inventory(rng):
+    items = []
+    for name in rng.sample(NAMES, 45):
+        for _ in range(rng.randint(1, 2)):
+            items.append(InventoryItem(item=ItemIdentity(name=name), quantity=Quantity(value=rng.randint(0, 300), unit=rng.choice(UNITS))))
+    return InventoryState(items=items)
+
+def make_graph():
+    graph = SubstitutionGraph()
+    for i in range(0, 56, 5):
+        graph.add_substitution(ItemIdentity(name=NAMES[i]), ItemIdentity(name=NAMES[i + 1]), 0.1)
+        graph.add_substitution(ItemIdentity(name=NAMES[i + 1]), ItemIdentity(name=NAMES[i + 2]), 0.1)
+    return graph
+
+@pytest.mark.parametrize("with_graph", [False, True])
+def test_matches_can_cook(with_graph):
+    rng = random.Random(9)
+    checker = FeasibilityChecker(substitution_graph=make_graph() if with_graph else None)
+    catalog = make_catalog(1500, rng)
+    matrix = checker.compile_matrix(catalog)
+
+    for _ in range(3):
+        inventory = make_inventory(rng)
+        expected = [checker.can_cook(r, inventory) for r in catalog]
+        assert checker.can_cook_matrix(matrix, inventory) == expected
+        assert any(expected)
+
+def test_inexact_amounts_use_scalar_check():
+    checker = FeasibilityChecker()
+    pinch = Recipe(id="p", name="P", instructions=[], ingredients=[
+        IngredientRef(item=ItemIdentity(name="Saffron"), quantity=Quantity(value=Decimal("0.0005"), unit=Unit.GRAM))])
+    matrix = checker.compile_matrix([pinch])
+    assert matrix.inexact_rows == [0]
+
+    stocked = InventoryState(items=[InventoryItem(item=ItemIdentity(name="Saffron"), quantity=Quantity(value=Decimal("0.0007"), unit=Unit.GRAM))])
+    assert checker.can_cook_matrix(matrix, stocked) == [True]
+    assert checker.can_cook_matrix(matrix, InventoryState()) == [False]
+
+def test_large_catalog_matches_can_cook_indexed():
+    rng = random.Random(4)
+    checker = FeasibilityChecker(substitution_graph=make_graph())
+    catalog = make_catalog(5000, rng)
+    matrix = checker.compile_matrix(catalog)
+    index = InventoryIndex.build(make_inventory(rng))
+
+    expected = [checker.can_cook_indexed(r, index) for r in catalog]
+    assert checker.can_cook_matrix(matrix, index) == expected
+    assert any(expected) and not all(expected)
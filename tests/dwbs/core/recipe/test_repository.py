@@ -0,0 +1,128 @@
+import pytest
+from dwbs.core.recipe.store.repository import RecipeRepository
+from dwbs.core.recipe.domain.metadata import Difficulty
+from dwbs.core.recipe.tags.tags import RecipeTag
+from dwbs.core.recipe.graph.substitution import SubstitutionGraph
+from dwbs.core.recipe.index.catalog import RecipeCatalogIndex
+from dwbs.core.identity.registry import ITEM_REGISTRY
+from dwbs.core.contracts.inventory import ItemIdentity
+import factories
+
+NAMES = [f"Pantry{i}" for i in range(15)]
+
+def make_catalog(count, seed=25):
+    return factories.make_catalog(count, NAMES, seed, sizes=(0, 3), id_format="r{:03d}", extra=lambda rng: dict(
+        description="d" * 200,
+        instructions=[f"Step {n}" for n in range(5)],
+        tags=rng.sample(list(RecipeTag), rng.randint(0, 3)),
+        prep_time_minutes=rng.choice([None, 5, 10, 20]),
+        cook_time_minutes=rng.choice([None, 10, 30, 60]),
+        difficulty=rng.choice([None] + list(Difficulty)),
+    ))
+
+def total_minutes(recipe):
+    if recipe.prep_time_minutes is None and recipe.cook_time_minutes is None:
+        return None
+    return (recipe.prep_time_minutes or 0) + (recipe.cook_time_minutes or 0)
+
+def test_queries_match_a_scan_after_reopen(tmp_path):
+    recipes = make_catalog(300)
+    path = tmp_path / "recipes.jsonl"
+    repo = RecipeRepository(path)
+    repo.add_many(recipes)
+    repo.close()
+
+    repo = RecipeRepository(path)
+    assert len(repo) == 300 and repo.get("r042") == recipes[42] and repo.get("missing") is None
+
+    pantry = [ItemIdentity(name=name) for name in NAMES[:8]]
+    cases = [
+        (dict(tags=[RecipeTag.QUICK], exclude_tags=[RecipeTag.VEGAN]),
+         lambda r: RecipeTag.QUICK in r.tags and RecipeTag.VEGAN not in r.tags),
+        (dict(difficulty=[Difficulty.EASY, Difficulty.MEDIUM], max_total_minutes=30),
+         lambda r: r.difficulty in (Difficulty.EASY, Difficulty.MEDIUM) and total_minutes(r) is not None and total_minutes(r) <= 30),
+        (dict(uses=[ItemIdentity(name="Pantry3")], tags=[RecipeTag.DINNER]),
+         lambda r: RecipeTag.DINNER in r.tags and any(i.item.name == "Pantry3" for i in r.ingredients)),
+        (dict(within=pantry),
+         lambda r: all(i.item in pantry for i in r.ingredients)),
+        ({}, lambda r: True),
+    ]
+    for filters, predicate in cases:
+        expected = [r for r in recipes if predicate(r)]
+        page = repo.query(offset=2, limit=5, **filters)
+        assert (page.total, page.recipes) == (len(expected), expected[2:7])
+        assert list(repo.stream(batch_size=7, **filters)) == expected
+        assert [s.id for s in repo.summaries(**filters)] == [r.id for r in expected]
+
+def test_replacing_and_compacting(tmp_path):
+    path = tmp_path / "recipes.jsonl"
+    repo = RecipeRepository(path)
+    recipes = make_catalog(20)
+    repo.add_many(recipes)
+
+    renamed = recipes[3].model_copy(update={"name": "Renamed", "tags": [RecipeTag.ITALIAN]})
+    repo.add(renamed)
+    assert len(repo) == 20 and repo.get("r003").name == "Renamed"
+    assert repo.summary("r003").tags == [RecipeTag.ITALIAN]
+    italian = [r.id for r in recipes if RecipeTag.ITALIAN in r.tags and r.id != "r003"]
+    assert sorted(s.id for s in repo.summaries(tags=[RecipeTag.ITALIAN])) == sorted(italian + ["r003"])
+
+    size = path.stat().st_size
+    repo.compact()
+    assert path.stat().st_size < size
+    assert RecipeRepository(path).get("r003") == renamed
+    # The replacement line was appended last, so r003 now comes last.
+    assert [r.id for r in repo.stream()] == [r.id for r in recipes if r.id != "r003"] + ["r003"]
+
+    with pytest.raises(ValueError):
+        repo.query(offset=-1)
+
+def test_stream_survives_compaction(tmp_path):
+    repo = RecipeRepository(tmp_path / "recipes.jsonl")
+    recipes = make_catalog(10)
+    repo.add_many(recipes)
+    repo.add(recipes[0].model_copy(update={"name": "Renamed"}))
+
+    stream = repo.stream(batch_size=3)
+    streamed = [next(stream) for _ in range(3)]
+    repo.compact() # Moves every line
+    streamed.extend(stream)
+    assert [r.id for r in streamed] == [r.id for r in recipes[1:]] + ["r000"]
+    assert streamed == recipes[1:] + [repo.get("r000")]
+
+def test_torn_last_line_is_dropped_and_appends_stay_separate(tmp_path):
+    path = tmp_path / "recipes.jsonl"
+    recipes = make_catalog(6)
+    repo = RecipeRepository(path)
+    repo.add_many(recipes[:3])
+    repo.close()
+
+    data = path.read_bytes()
+    path.write_bytes(data[:-20]) # Crash while writing the last line
+    repo = RecipeRepository(path)
+    assert [r.id for r in repo.stream()] == ["r000", "r001"]
+    repo.add(recipes[3])
+    repo.close()
+
+    # A complete last line saved without its newline.
+    path.write_bytes(path.read_bytes().rstrip(b"\n"))
+    repo = RecipeRepository(path)
+    repo.add_many(recipes[4:])
+    repo.close()
+
+    reopened = RecipeRepository(path)
+    assert list(reopened.stream()) == [recipes[0], recipes[1], recipes[3], recipes[4], recipes[5]]
+
+def test_within_with_substitutions_matches_catalog_candidates(tmp_path):
+    recipes = make_catalog(200)
+    repo = RecipeRepository(tmp_path / "recipes.jsonl")
+    repo.add_many(recipes)
+    graph = SubstitutionGraph()
+    for i in range(0, 12, 3):
+        graph.add_substitution(ItemIdentity(name=NAMES[i]), ItemIdentity(name=NAMES[i + 1]), 0.2)
+        graph.add_substitution(ItemIdentity(name=NAMES[i + 1]), ItemIdentity(name=NAMES[14]), 0.4)
+
+    pantry = [ITEM_REGISTRY.intern(ItemIdentity(name=name)) for name in NAMES[1:14:2] + NAMES[14:]]
+    expected = RecipeCatalogIndex(recipes, graph).candidates(pantry)
+    assert list(repo.stream(within=pantry, substitution_graph=graph)) == expected
+    assert len(expected) > len(repo.summaries(within=pantry))
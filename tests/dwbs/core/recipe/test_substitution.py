@@ -0,0 +1,146 @@
+import pytest
+from dwbs.core.recipe.graph.substitution import SubstitutionGraph
+from dwbs.core.recipe.graph.compiled import CompiledSubstitutionGraph
+from dwbs.core.identity.registry import item_id
+from dwbs.core.contracts.inventory import ItemIdentity
+from dwbs.core.exceptions import SubstitutionCycleError
+
+def item(name):
+    return ItemIdentity(name=name)
+
+def names(substitutes):
+    return [(sub.name, penalty) for sub, penalty in substitutes]
+
+def test_transitive_substitutes_by_min_penalty():
+    graph = SubstitutionGraph()
+    graph.add_substitution(item("Butter"), item("Margarine"), 0.2)
+    graph.add_substitution(item("Margarine"), item("Oil"), 0.3)
+    graph.add_substitution(item("Butter"), item("Oil"), 0.9)
+
+    assert names(graph.get_substitutes(item("Butter"))) == [("Margarine", 0.2), ("Oil", 0.5)]
+    assert graph.get_substitutes(item("Unknown Item")) == []
+    with pytest.raises(ValueError):
+        graph.add_substitution(item("Oil"), item("Butter"), 0.1)
+
+def test_closure_is_memoized_and_invalidated_precisely():
+    graph = SubstitutionGraph()
+    graph.add_substitution(item("Cream"), item("Milk"), 0.4)
+    graph.add_substitution(item("Rice"), item("Quinoa"), 0.5)
+    cream, rice = item_id(item("Cream")), item_id(item("Rice"))
+
+    cream_subs = graph.get_substitute_ids(cream)
+    rice_subs = graph.get_substitute_ids(rice)
+    assert graph.get_substitute_ids(cream) is cream_subs
+
+    # Milk is reachable from Cream: only Cream's entry is rebuilt.
+    graph.add_substitution(item("Milk"), item("Oat Milk"), 0.1)
+    assert graph.get_substitute_ids(rice) is rice_subs
+    assert names(graph.get_substitutes(item("Cream"))) == [("Milk", 0.4), ("Oat Milk", 0.5)]
+
+    # Re-adding an edge with the same penalty changes nothing.
+    cream_subs = graph.get_substitute_ids(cream)
+    graph.add_substitution(item("Milk"), item("Oat Milk"), 0.1)
+    assert graph.get_substitute_ids(cream) is cream_subs
+
+    graph.add_substitution(item("Milk"), item("Oat Milk"), 0.05)
+    assert names(graph.get_substitutes(item("Cream")))[1] == ("Oat Milk", pytest.approx(0.45))
+    assert set(graph.closure()) == {cream, rice, item_id(item("Milk"))}
+
+def test_incremental_order_detects_cycles_after_reordering():
+    graph = SubstitutionGraph()
+    # Inserted against the initial order, forcing reorders.
+    graph.add_substitution(item("D"), item("E"), 0.1)
+    graph.add_substitution(item("C"), item("D"), 0.1)
+    graph.add_substitution(item("B"), item("C"), 0.1)
+    graph.add_substitution(item("E"), item("F"), 0.1)
+    graph.add_substitution(item("A"), item("B"), 0.1)
+
+    with pytest.raises(SubstitutionCycleError, match="Cycle detected"):
+        graph.add_substitution(item("F"), item("A"), 0.1)
+    with pytest.raises(ValueError):
+        graph.add_substitution(item("E"), item("C"), 0.1)
+
+    order = graph._order
+    for original, subs in graph._adj.items():
+        for sub, _ in subs:
+            assert order[original] < order[sub]
+    assert names(graph.get_substitutes(item("A")))[-1] == ("F", 0.5)
+
+def test_load_edges_reports_every_cycle_and_is_atomic():
+    graph = SubstitutionGraph()
+    graph.add_substitution(item("Ghee"), item("Butter"), 0.1)
+
+    edges = [
+        (item("Butter"), item("Ghee"), 0.2),          # closes a cycle with the existing edge
+        (item("Lime"), item("Lemon"), 0.1),
+        (item("Lemon"), item("Vinegar"), 0.3),
+        (item("Vinegar"), item("Lime"), 0.4),          # Lime -> Lemon -> Vinegar -> Lime
+        (item("Salt"), item("Soy Sauce"), 0.5),
+    ]
+    with pytest.raises(SubstitutionCycleError) as raised:
+        graph.load_edges(edges)
+    offending = {(o.name, s.name) for o, s, _ in raised.value.edges}
+    assert offending == {("Butter", "Ghee"), ("Lime", "Lemon"), ("Lemon", "Vinegar"), ("Vinegar", "Lime")}
+    assert graph.get_substitutes(item("Salt")) == []
+
+    assert graph.load_edges(edges[1:3] + edges[4:] + [(item("Lime"), item("Lemon"), 0.05)]) == 3
+    assert names(graph.get_substitutes(item("Lime"))) == [("Lemon", 0.05), ("Vinegar", 0.35)]
+
+    # The rebuilt order keeps working for single inserts.
+    graph.add_substitution(item("Vinegar"), item("Salt"), 0.1)
+    with pytest.raises(SubstitutionCycleError):
+        graph.add_substitution(item("Soy Sauce"), item("Lime"), 0.1)
+
+def test_compiled_graph_matches_and_round_trips(tmp_path):
+    graph = SubstitutionGraph()
+    graph.load_edges([
+        (item("Butter"), item("Margarine"), 0.2),
+        (item("Margarine"), item("Oil"), 0.3),
+        (item("Butter"), item("Oil"), 0.9),
+        (ItemIdentity(name="Yogurt", variant="Greek"), item("Sour Cream"), 0.4),
+    ])
+    compiled = graph.compile()
+    assert (len(compiled), compiled.edge_count) == (5, 4)
+    assert compiled.closure() == graph.closure()
+
+    path = str(tmp_path / "substitutions.bin")
+    compiled.save(path)
+    for use_mmap in (True, False):
+        loaded = CompiledSubstitutionGraph.load(path, use_mmap=use_mmap)
+        assert loaded.closure() == graph.closure()
+        assert names(loaded.get_substitutes(item("Butter"))) == [("Margarine", 0.2), ("Oil", 0.5)]
+        assert names(loaded.get_substitutes(ItemIdentity(name="Yogurt", variant="Greek"))) == [("Sour Cream", 0.4)]
+        assert loaded.get_substitutes(item("Oil")) == []
+        assert loaded.get_substitute_ids(item_id(item("Unknown Item"))) == ()
+
+def test_required_ids_reverse_the_closure():
+    graph = SubstitutionGraph()
+    graph.add_substitution(item("Butter"), item("Margarine"), 0.2)
+    graph.add_substitution(item("Margarine"), item("Oil"), 0.3)
+    graph.add_substitution(item("Lard"), item("Oil"), 0.6)
+    oil = item_id(item("Oil"))
+
+    expected = sorted((source, penalty) for source, subs in graph.closure().items() for sub, penalty in subs if sub == oil)
+    assert sorted(graph.get_required_ids(oil)) == expected == sorted([
+        (item_id(item("Margarine")), 0.3), (item_id(item("Butter")), 0.5), (item_id(item("Lard")), 0.6)
+    ])
+    assert sorted(graph.compile().get_required_ids(oil)) == expected
+    assert graph.get_required_ids(item_id(item("Butter"))) == ()
+
+def test_required_ids_are_memoized_and_invalidated_precisely():
+    graph = SubstitutionGraph()
+    graph.add_substitution(item("Cream"), item("Milk"), 0.4)
+    graph.add_substitution(item("Rice"), item("Quinoa"), 0.5)
+    milk, quinoa = item_id(item("Milk")), item_id(item("Quinoa"))
+
+    milk_required = graph.get_required_ids(milk)
+    quinoa_required = graph.get_required_ids(quinoa)
+    assert graph.get_required_ids(milk) is milk_required
+
+    # Only walks that reach Cream (Milk's) see the new edge into it.
+    graph.add_substitution(item("Half and Half"), item("Cream"), 0.1)
+    assert graph.get_required_ids(quinoa) is quinoa_required
+    assert sorted(graph.get_required_ids(milk)) == sorted([(item_id(item("Cream")), 0.4), (item_id(item("Half and Half")), pytest.approx(0.5))])
+
+    compiled = graph.compile()
+    assert compiled.get_required_ids(milk) is compiled.get_required_ids(milk)
@@ -0,0 +1,59 @@
+import random
+import pytest
+from unittest.mock import patch
+from dwbs.core.recipe.domain.recipe import Recipe
+from dwbs.core.recipe.tags.tags import RecipeTag
+from dwbs.core.recipe.tags.filter import filter_recipes
+from dwbs.core.recipe.index.tags import TagIndex
+import factories
+
+def make_catalog(count, seed=24):
+    tags = list(RecipeTag)
+    return factories.make_catalog(count, (), seed, extra=lambda rng: dict(tags=rng.sample(tags, rng.randint(0, 4))))
+
+def scan(recipes, required, excluded):
+    return [
+        r for r in recipes
+        if all(t in r.tags for t in required) and not any(t in r.tags for t in excluded)
+    ]
+
+def test_tag_queries_match_a_linear_scan():
+    recipes = make_catalog(500)
+    index = TagIndex(recipes)
+    rng = random.Random(1)
+    for _ in range(50):
+        required = rng.sample(list(RecipeTag), rng.randint(0, 2))
+        excluded = rng.sample(list(RecipeTag), rng.randint(0, 2))
+        expected = scan(recipes, required, excluded)
+        assert index.select(required, excluded) == expected
+        assert index.count(required, excluded) == len(expected)
+        assert filter_recipes(recipes, required, excluded, index=index) == expected
+        assert filter_recipes(recipes, required, excluded) == expected
+
+def test_masks_and_edge_cases():
+    recipes = [
+        Recipe(id="a", name="Dal", ingredients=[], instructions=[], tags=[RecipeTag.INDIAN, RecipeTag.VEGAN, RecipeTag.INDIAN]),
+        Recipe(id="b", name="Toast", ingredients=[], instructions=[], tags=[]),
+    ]
+    index = TagIndex(recipes)
+    assert index.masks == [index.mask([RecipeTag.INDIAN, RecipeTag.VEGAN]), 0]
+    assert index.positions() == [0, 1]
+    assert index.positions([RecipeTag.ITALIAN]) == []
+    assert index.select(exclude_tags=[RecipeTag.VEGAN]) == [recipes[1]]
+    assert filter_recipes(recipes) is recipes
+    assert TagIndex([]).select([RecipeTag.QUICK]) == []
+
+def test_filter_recipes_uses_and_checks_a_given_index():
+    recipes = make_catalog(100)
+    index = TagIndex(recipes)
+    with patch("dwbs.core.recipe.tags.filter.TagIndex", wraps=TagIndex) as build:
+        assert filter_recipes(recipes, [RecipeTag.QUICK], index=index) == filter_recipes(recipes, [RecipeTag.QUICK])
+        filter_recipes(recipes, [RecipeTag.VEGAN], [RecipeTag.QUICK], index=index)
+        assert build.call_count == 1 # Only the call without an index built one
+
+    recipes.append(Recipe(id="new", name="New", ingredients=[], instructions=[], tags=[RecipeTag.QUICK]))
+    assert filter_recipes(recipes, [RecipeTag.QUICK])[-1].id == "new"
+    with pytest.raises(ValueError):
+        filter_recipes(recipes, [RecipeTag.QUICK], index=index)
+    with pytest.raises(ValueError):
+        filter_recipes(recipes[:50], [RecipeTag.QUICK], index=TagIndex(recipes))
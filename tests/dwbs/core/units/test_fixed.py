@@ -0,0 +1,51 @@
+import pytest
+import random
+from decimal import Decimal
+from dwbs.core.units.converter import Quantity, Unit
+from dwbs.core.units.fixed import FixedQuantity
+
+def test_round_trip_in_base_unit():
+    fixed = FixedQuantity.from_quantity(Quantity(value=Decimal("1.5"), unit=Unit.KILOGRAM, approx=True))
+    assert fixed.unit == Unit.GRAM
+    assert fixed.milli == 1_500_000
+    assert fixed.is_exact
+
+    quantity = fixed.to_quantity()
+    assert quantity == Quantity(value=Decimal("1500"), unit=Unit.GRAM)
+    assert quantity.approx is True
+    assert fixed.to_quantity(Unit.KILOGRAM).value == Decimal("1.5")
+    with pytest.raises(ValueError):
+        fixed.to_quantity(Unit.LITER)
+
+def test_matches_decimal_arithmetic():
+    random.seed(3)
+    units = [Unit.GRAM, Unit.KILOGRAM]
+    for _ in range(500):
+        a = Quantity(value=Decimal(random.randint(0, 10**6)) / 1000, unit=random.choice(units), approx=random.random() < 0.5)
+        b = Quantity(value=Decimal(random.randint(0, 10**6)) / 1000, unit=random.choice(units))
+        fa, fb = FixedQuantity.from_quantity(a), FixedQuantity.from_quantity(b)
+
+        total = (fa + fb).to_quantity()
+        assert total == a + b
+        assert total.approx == (a + b).approx
+        assert (fa < fb) == (a < b)
+        assert (fa == fb) == (a == b)
+        if not a < b:
+            assert (fa - fb).to_quantity() == a - b
+
+def test_sub_milli_amounts_stay_exact():
+    tiny = FixedQuantity.from_quantity(Quantity(value=Decimal("0.0001"), unit=Unit.GRAM))
+    assert not tiny.is_exact
+    total = tiny + FixedQuantity.from_quantity(Quantity(value=Decimal("2"), unit=Unit.GRAM))
+    assert total.to_quantity().value == Decimal("2.0001")
+
+def test_scaled_and_unit_mismatch():
+    grams = FixedQuantity.from_quantity(Quantity(value=Decimal("100"), unit=Unit.GRAM))
+    assert grams.scaled(Decimal("0.333")).to_quantity().value == Decimal("33.3")
+    assert grams.scaled(Decimal("0.5")).is_exact
+
+    pieces = FixedQuantity.from_quantity(Quantity(value=Decimal("2"), unit=Unit.PIECE))
+    with pytest.raises(ValueError):
+        grams + pieces
+    with pytest.raises(ValueError):
+        grams < pieces
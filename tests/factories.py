@@ -0,0 +1,77 @@
+"""
+Builders shared by the test modules: ledger events and random recipe catalogs.
+"""
+import random
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+from dwbs.core.ledger.events.types import PurchaseEvent, PurchasePayload, ConsumeEvent, ConsumePayload, WasteEvent, WastePayload
+from dwbs.core.ledger.waste.reasons import WasteReason
+from dwbs.core.recipe.domain.recipe import Recipe
+from dwbs.core.recipe.domain.ingredient import IngredientRef
+from dwbs.core.contracts.mutation import MutationSource
+from dwbs.core.contracts.explanation import Explanation
+from dwbs.core.contracts.inventory import ItemIdentity, Quantity, Unit
+
+EXPLANATION = Explanation(reason="test", source_fact="test", confidence=1.0)
+
+Item = Union[str, ItemIdentity]
+
+def _item(item: Item) -> ItemIdentity:
+    return item if isinstance(item, ItemIdentity) else ItemIdentity(name=item)
+
+def _event_fields(actor: str, timestamp: Optional[datetime], expected_version: Optional[int]) -> dict:
+    fields = dict(actor=actor, expected_version=expected_version)
+    if timestamp is not None:
+        fields["timestamp"] = timestamp
+    return fields
+
+def purchase(name: Item = "Apple", value=1, unit: Unit = Unit.GRAM, approx: bool = False, *, actor: str = "t", timestamp: Optional[datetime] = None, expected_version: Optional[int] = None) -> PurchaseEvent:
+    return PurchaseEvent(**_event_fields(actor, timestamp, expected_version), payload=PurchasePayload(
+        item=_item(name), quantity=Quantity(value=Decimal(value), unit=unit, approx=approx),
+        source=MutationSource.USER_MANUAL, explanation=EXPLANATION))
+
+def consume(name: Item = "Apple", value=1, unit: Unit = Unit.GRAM, approx: bool = False, *, actor: str = "t", timestamp: Optional[datetime] = None, expected_version: Optional[int] = None) -> ConsumeEvent:
+    return ConsumeEvent(**_event_fields(actor, timestamp, expected_version), payload=ConsumePayload(
+        item=_item(name), quantity=Quantity(value=Decimal(value), unit=unit, approx=approx),
+        source=MutationSource.USER_MANUAL, explanation=EXPLANATION))
+
+def waste(name: Item = "Apple", value=1, unit: Unit = Unit.GRAM, approx: bool = False, *, reason: WasteReason = WasteReason.OTHER, actor: str = "t", timestamp: Optional[datetime] = None) -> WasteEvent:
+    return WasteEvent(**_event_fields(actor, timestamp, None), payload=WastePayload(
+        item=_item(name), quantity=Quantity(value=Decimal(value), unit=unit, approx=approx),
+        reason=reason, source=MutationSource.USER_MANUAL, explanation=EXPLANATION))
+
+def grams(high: int) -> Callable[[random.Random], Quantity]:
+    """Quantity builder for make_catalog: 1..high grams."""
+    return lambda rng: Quantity(value=rng.randint(1, high), unit=Unit.GRAM)
+
+def make_catalog(
+    count: int,
+    names: Sequence[str],
+    rng: Union[int, random.Random] = 0,
+    sizes: Tuple[int, int] = (1, 3),
+    quantity: Callable[[random.Random], Quantity] = grams(300),
+    id_format: str = "r{}",
+    name_format: str = "Recipe {}",
+    extra: Optional[Callable[[random.Random], dict]] = None,
+) -> List[Recipe]:
+    """
+    Random recipes using between sizes[0] and sizes[1] of `names` each (none when
+    `names` is empty). `rng` is a seed or a Random to draw from; `extra(rng)` adds
+    fields, drawn after the ingredients.
+    """
+    if not isinstance(rng, random.Random):
+        rng = random.Random(rng)
+    recipes = []
+    for i in range(count):
+        chosen = rng.sample(list(names), rng.randint(*sizes)) if names else []
+        fields = dict(
+            id=id_format.format(i),
+            name=name_format.format(i),
+            instructions=[],
+            ingredients=[IngredientRef(item=ItemIdentity(name=name), quantity=quantity(rng)) for name in chosen],
+        )
+        if extra is not None:
+            fields.update(extra(rng))
+        recipes.append(Recipe(**fields))
+    return recipes